@@ -1,12 +1,17 @@
 # app.py
 import sys
+import threading
 from PySide6.QtWidgets import QApplication, QMessageBox, QFileDialog
-from core.db import init_db
+from core.db import init_db, close_all
 from core.paths import APP_DIR
 from core.style import apply_style
 from main_window import MainWindow
 import core.config_manager as config_manager
 import core.paths as paths
+from services.metadata import backfill_durations
+from services.store import adopt_library
+from services.archive import run_daily as archive_old_recordings
+from services.integrity import scan_library
 
 # Fix for PyInstaller noconsole mode where stdout/stderr are None
 class NullWriter:
@@ -49,6 +54,11 @@ def main():
 
     # 3. Init DB
     init_db()
+    app.aboutToQuit.connect(close_all)
+    # Fill durations of recordings saved before they were recorded
+    threading.Thread(target=backfill_durations, daemon=True).start()
+    # One after the other: adopting and archiving move files, which a scan would report as missing mid-way
+    threading.Thread(target=lambda: (adopt_library(), archive_old_recordings(), scan_library()), daemon=True).start()
 
     win = MainWindow()
     win.show()
@@ -0,0 +1,338 @@
+# cli.py
+"""
+Headless entry point for scripted and nightly bulk work: no Qt anywhere on its import path,
+so it runs on a server without a display. Uses the same config, database and video
+library as the app. Every command streams one JSON object per line on stdout and ends
+with a {"event": "summary", ...} line; the exit status is 1 if anything failed.
+
+    python cli.py ingest PATH... [--manifest CSV] [--pattern P] [--battery-name N] [--operator O]
+                                 [--workers N] [--progress]
+    python cli.py watch [FOLDER] [--pattern P] [--battery-name N] [--operator O] [--workers N]
+    python cli.py search [TEXT] [--column operator_name] [--sort datetime] [--limit N]
+    python cli.py export ID... --out DIR [--burn] [--workers N]
+    python cli.py reencode (ID... | --all) --profile archive|review|preview [--workers N]
+    python cli.py analyze (ID... | --all) [--force] [--workers N]
+    python cli.py verify [ID...] [--hash] [--decode] [--force] [--workers N]
+
+PATH is a folder of videos or single video files. ingest queues through the same jobs
+table as the app, so the encodes also show up (and resume) there. verify records each
+result as the recording's file health (shown in the app's list) and skips files that
+have not changed since they were last checked.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+import core.paths as paths
+from core.config_manager import get_data_path
+from core.db import init_db, query, execute, close_all
+from models.recording import Recording
+from services.search import RECORDING_COLUMNS, SORT_KEYS, RecordingQuery, fetch_page
+
+_out_lock = threading.Lock()
+SETTLE_POLL_S = 5
+
+def emit(**obj):
+    with _out_lock:
+        sys.stdout.write(json.dumps(obj, default=str) + "\n")
+        sys.stdout.flush()
+
+def _recordings(ids: list[int] | None = None) -> list[Recording]:
+    sql = f"SELECT {RECORDING_COLUMNS} FROM recordings"
+    if ids:
+        sql += f" WHERE id IN ({','.join('?' * len(ids))})"
+    return [Recording(*r) for r in query(sql + " ORDER BY id", ids or ())]
+
+def _default_workers() -> int:
+    return os.cpu_count() or 4
+
+# ---------------- ingest ----------------
+def cmd_ingest(args) -> bool:
+    from services import batch_import, jobs
+    manifest = batch_import.read_manifest(args.manifest) if args.manifest else None
+    defaults = {"battery_name": args.battery_name, "operator_name": args.operator}
+    items, invalid = [], 0
+    for p in map(Path, args.paths):
+        if p.is_dir():
+            items += batch_import.plan(p, manifest, args.pattern, defaults)
+        elif not p.is_file() or p.suffix.lower() not in batch_import.VIDEO_SUFFIXES:
+            emit(event="failed", file=str(p), error="No such file" if not p.exists() else "Not a video file")
+            invalid += 1
+        else:
+            items += batch_import.plan_files([p], manifest, args.pattern, defaults)
+    for item in items:
+        if item.error: emit(event="skipped", file=str(item.path), error=item.error)
+    queued = batch_import.enqueue(items)
+    pending = {job_id: (item, rec_id) for item, rec_id, job_id in queued}
+    counts = {jobs.DONE: 0, jobs.FAILED: 0, jobs.CANCELLED: 0}
+    all_done = threading.Event()
+    lock = threading.Lock()
+    for item, rec_id, job_id in queued:
+        emit(event="queued", job=job_id, recording=rec_id, file=str(item.path))
+    if not pending:
+        emit(event="summary", queued=0, skipped=len(items), invalid=invalid)
+        return not items and not invalid
+
+    def on_progress(job_id, percent, eta, **stats):
+        if args.progress and job_id in pending:
+            emit(event="progress", job=job_id, percent=percent, eta=eta, speed=stats.get("speed"))
+
+    settled = set()
+    def settle(job_id, state, message):
+        with lock:
+            if job_id in settled: return
+            settled.add(job_id); counts[state] += 1
+        item, rec_id = pending[job_id]
+        row = query("SELECT video_path, duration_ms FROM recordings WHERE id=?", (rec_id,))
+        emit(event=state, job=job_id, recording=rec_id, file=str(item.path), error=message or None,
+             video_path=row[0][0] if row else None, duration_ms=row[0][1] if row else None)
+        if len(settled) == len(pending): all_done.set()
+
+    def on_state(job_id, state, message):
+        if job_id not in pending or (state not in counts and state != jobs.RUNNING):
+            return
+        if state == jobs.RUNNING:
+            emit(event="started", job=job_id, file=str(pending[job_id][0].path)); return
+        settle(job_id, state, message)
+
+    pool = jobs.JobPool(args.workers or jobs.worker_count(), on_progress, on_state)
+    start = time.monotonic()
+    pool.start(); pool.notify()
+    try:
+        # The app (or another cli run) shares the queue and may take some of these jobs: settle those from the DB
+        while not all_done.wait(SETTLE_POLL_S):
+            ids = [i for i in pending if i not in settled] or [-1]
+            for job_id, state, error in query(f"SELECT id, state, error FROM jobs WHERE id IN ({','.join('?' * len(ids))})", ids):
+                if state in counts: settle(job_id, state, error)
+    finally:
+        pool.stop(timeout=10)    # unfinished jobs are picked up again by the next run or the app
+    emit(event="summary", queued=len(pending), skipped=sum(1 for i in items if i.error), invalid=invalid,
+         **counts, seconds=round(time.monotonic() - start, 1))
+    return counts[jobs.DONE] == len(pending) and not any(i.error for i in items) and not invalid
+
+# ---------------- watch ----------------
+def cmd_watch(args) -> bool:
+    from services import batch_import, jobs, watch_folder
+    defaults = {k: v for k, v in (("battery_name", args.battery_name), ("operator_name", args.operator)) if v}
+    if not (args.folder or watch_folder.settings()[0]):
+        emit(event="failed", error="Pass a folder or set one in the app (Settings > Watch Folder)"); return False
+
+    def on_state(job_id, state, message):
+        if state in (jobs.DONE, jobs.FAILED):
+            emit(event=state, job=job_id, error=message or None)
+
+    pool = jobs.JobPool(args.workers or jobs.worker_count(), on_state=on_state)
+    def enqueue(items):
+        queued = batch_import.enqueue(items); pool.notify(); return queued
+    watcher = watch_folder.Watcher(enqueue, lambda event, path, detail: emit(event=event, file=path, detail=detail or None),
+                                   args.folder, args.pattern, defaults or None)
+    pool.start(); pool.notify(); watcher.start()
+    try:
+        while True: time.sleep(3600)    # until Ctrl+C
+    finally:
+        watcher.stop(timeout=10); pool.stop(timeout=10)
+
+# ---------------- search ----------------
+def cmd_search(args) -> bool:
+    q = RecordingQuery(filter=args.text or "", filter_column=args.column, sort=args.sort)
+    n, cursor = 0, None
+    while n < args.limit:
+        rows, cursor = fetch_page(q, cursor, min(500, args.limit - n))
+        for r in rows:
+            emit(event="recording", **asdict(Recording(*r)))
+        n += len(rows)
+        if cursor is None: break
+    emit(event="summary", matches=n)
+    return True
+
+# ---------------- export ----------------
+def _export_one(rec: Recording, out_dir: Path, burn: bool) -> dict:
+    if not rec.video_path or not Path(rec.video_path).exists():
+        raise FileNotFoundError(f"Video file not found: {rec.video_path or '(none)'}")
+    out = out_dir / f"{rec.battery_code or 'recording'}_{rec.battery_no or ''}_{rec.id}.mp4".replace("/", "-")
+    if burn and not rec.overlay_burned:
+        from services.video_processor import process_and_save_video
+        process_and_save_video(rec.video_path, str(out), (rec.battery_code, rec.battery_no, rec.operator_name))
+    else:
+        shutil.copy2(rec.video_path, out)
+    return {"out": str(out), "bytes": out.stat().st_size}
+
+def cmd_export(args) -> bool:
+    out_dir = Path(args.out); out_dir.mkdir(parents=True, exist_ok=True)
+    recs = _recordings(args.ids)
+    for missing in sorted(set(args.ids) - {r.id for r in recs}):
+        emit(event="failed", id=missing, error="No such recording")
+    ok = failed = 0
+    with ThreadPoolExecutor(args.workers or _default_workers()) as pool:
+        futures = {pool.submit(_export_one, rec, out_dir, args.burn): rec for rec in recs}
+        for f in as_completed(futures):
+            rec = futures[f]
+            try:
+                emit(event="exported", id=rec.id, **f.result()); ok += 1
+            except Exception as e:
+                emit(event="failed", id=rec.id, error=str(e)); failed += 1
+    failed += len(set(args.ids) - {r.id for r in recs})
+    emit(event="summary", exported=ok, failed=failed)
+    return failed == 0
+
+# ---------------- reencode ----------------
+def _reencode_one(video_path: str, old_hash: str | None, rec_ids: list[int], profile) -> dict:
+    from services import store
+    from services.video_processor import transcode
+    src = Path(video_path)
+    if not src.exists():
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    tmp = paths.get_videos_dir() / f"reencode_{rec_ids[0]}_{os.getpid()}.mp4"
+    start = time.monotonic()
+    try:
+        meta = transcode(str(src), str(tmp), profile)
+        before = src.stat().st_size
+        marks = ",".join("?" * len(rec_ids))
+        h, dst = store.put(tmp, move=True, claim=lambda h, p: execute(
+            f"UPDATE recordings SET video_path=?, video_hash=?, duration_ms=? WHERE id IN ({marks})",
+            (str(p), h, meta.duration_ms, *rec_ids)))
+    finally:
+        tmp.unlink(missing_ok=True)
+    if old_hash != h:
+        store.release(old_hash)
+    return {"video_path": str(dst), "video_hash": h, "bytes_before": before, "bytes_after": dst.stat().st_size,
+            "seconds": round(time.monotonic() - start, 1)}
+
+def cmd_reencode(args) -> bool:
+    from services import jobs, profiles
+    if not args.ids and not args.all:
+        emit(event="failed", error="Pass recording ids or --all"); return False
+    if args.profile not in profiles.PROFILES:
+        emit(event="failed", error=f"Unknown profile {args.profile}"); return False
+    profile = profiles.get(args.profile)
+    # One encode per stored file, however many recordings share it
+    groups: dict[tuple, list[int]] = {}
+    recs = _recordings(None if args.all else args.ids)
+    for rec in recs:
+        if rec.video_path:
+            groups.setdefault((rec.video_hash or rec.video_path, rec.video_path, rec.video_hash), []).append(rec.id)
+    missing = [] if args.all else sorted(set(args.ids) - {r.id for r in recs})
+    for rec_id in missing:
+        emit(event="failed", id=rec_id, error="No such recording")
+    ok, failed = 0, len(missing)
+    with ThreadPoolExecutor(args.workers or jobs.worker_count()) as pool:
+        futures = {pool.submit(_reencode_one, path, h, ids, profile): ids for (_, path, h), ids in groups.items()}
+        for f in as_completed(futures):
+            ids = futures[f]
+            try:
+                emit(event="reencoded", ids=ids, profile=profile.name, **f.result()); ok += 1
+            except Exception as e:
+                emit(event="failed", ids=ids, error=str(e)); failed += 1
+    emit(event="summary", reencoded=ok, failed=failed)
+    return failed == 0
+
+# ---------------- analyze ----------------
+def cmd_analyze(args) -> bool:
+    from services import activity
+    if not args.ids and not args.all:
+        emit(event="failed", error="Pass recording ids or --all"); return False
+    done = {r[0] for r in query("SELECT recording_id FROM recording_activity WHERE timeline IS NOT NULL")}
+    recs = [r for r in _recordings(None if args.all else args.ids) if r.video_path and (args.force or r.id not in done)]
+    ok = failed = 0
+    with ThreadPoolExecutor(args.workers or _default_workers()) as pool:
+        futures = {pool.submit(activity.analyze_recording, r.id, r.video_path): r for r in recs}
+        for f in as_completed(futures):
+            rec = futures[f]
+            try:
+                f.result()
+                idle = activity.idle_for(rec.id)
+                emit(event="analyzed", id=rec.id, idle_spans=idle, idle_seconds=sum(b - a for a, b in idle) / 1000); ok += 1
+            except Exception as e:
+                emit(event="failed", id=rec.id, error=str(e)); failed += 1
+    emit(event="summary", analyzed=ok, failed=failed)
+    return failed == 0
+
+# ---------------- verify ----------------
+def cmd_verify(args) -> bool:
+    from services import integrity
+    missing = sorted(set(args.ids) - {r.id for r in _recordings(args.ids)}) if args.ids else []
+    for rec_id in missing:
+        emit(event="failed", id=rec_id, error="No such recording")
+    counts = integrity.scan(args.ids or None, decode=args.decode, verify_hash=args.hash, force=args.force,
+                            workers=args.workers,
+                            on_result=lambda rec_id, path, status, detail: emit(
+                                event="checked", id=rec_id, status=status, detail=detail, video_path=path))
+    examined = counts.pop("examined")
+    emit(event="summary", checked=sum(counts.values()), examined=examined, **counts)
+    return not missing and set(counts) <= {integrity.OK, integrity.NO_VIDEO}
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    workers = argparse.ArgumentParser(add_help=False)
+    workers.add_argument("--workers", type=int, help="parallel workers (default: encode_workers or CPU count)")
+
+    p = sub.add_parser("ingest", parents=[workers], help="encode videos into the library")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--manifest", help="CSV with a file column plus battery fields")
+    p.add_argument("--pattern", help="file name pattern, e.g. {battery_code}_{battery_no}")
+    p.add_argument("--battery-name", default="")
+    p.add_argument("--operator", default="")
+    p.add_argument("--progress", action="store_true", help="also stream progress events")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("watch", parents=[workers], help="ingest videos as they appear in a folder, until Ctrl+C")
+    p.add_argument("folder", nargs="?", help="default: the app's watch folder")
+    p.add_argument("--pattern", help="file name pattern (default: the app's)")
+    p.add_argument("--battery-name", default="")
+    p.add_argument("--operator", default="")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("search", help="list recordings matching text (all when empty)")
+    p.add_argument("text", nargs="?")
+    p.add_argument("--column", choices=["battery_name", "battery_code", "log_id", "battery_no", "operator_name", "remarks"])
+    p.add_argument("--sort", choices=sorted(SORT_KEYS))
+    p.add_argument("--limit", type=int, default=1000)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("export", parents=[workers], help="copy recordings' videos to a folder")
+    p.add_argument("ids", nargs="+", type=int)
+    p.add_argument("--out", required=True)
+    p.add_argument("--burn", action="store_true", help="burn the overlay into stream-copied videos")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("reencode", parents=[workers], help="re-encode stored videos with a profile")
+    p.add_argument("ids", nargs="*", type=int)
+    p.add_argument("--all", action="store_true")
+    p.add_argument("--profile", required=True)
+    p.set_defaults(func=cmd_reencode)
+
+    p = sub.add_parser("analyze", parents=[workers], help="find idle stretches and the seek bar's activity timeline")
+    p.add_argument("ids", nargs="*", type=int)
+    p.add_argument("--all", action="store_true", help="every recording not analysed yet")
+    p.add_argument("--force", action="store_true", help="also redo recordings analysed before")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("verify", parents=[workers], help="check that recordings' videos are present and readable")
+    p.add_argument("ids", nargs="*", type=int)
+    p.add_argument("--hash", action="store_true", help="also compare file contents with the store hash")
+    p.add_argument("--decode", action="store_true", help="also decode every frame")
+    p.add_argument("--force", action="store_true", help="re-open files that have not changed since the last check")
+    p.set_defaults(func=cmd_verify)
+
+    args = ap.parse_args(argv)
+    if not get_data_path():
+        emit(event="failed", error="No data folder configured; start the app once to choose one")
+        return 1
+    paths.get_videos_dir().mkdir(parents=True, exist_ok=True)
+    init_db()
+    try:
+        return 0 if args.func(args) else 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        close_all()
+
+if __name__ == "__main__":
+    sys.exit(main())
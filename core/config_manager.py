@@ -4,25 +4,38 @@ from pathlib import Path
 from typing import Optional
 
 APP_NAME = "RES Stack Assembly Recorder"
-CONFIG_DIR = Path(os.getenv('APPDATA')) / APP_NAME
+# APPDATA is Windows-only; headless Linux servers (cli.py) use the XDG config folder
+CONFIG_DIR = Path(os.getenv('APPDATA') or os.getenv('XDG_CONFIG_HOME') or Path.home() / ".config") / APP_NAME
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
 def _ensure_config_dir():
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
+# Parsed config keyed by file mtime, so hot paths (DB/video paths) skip the JSON parse
+_cache: tuple[int, dict] | None = None
+
 def load_config() -> dict:
-    if not CONFIG_FILE.exists():
+    global _cache
+    try:
+        mtime = CONFIG_FILE.stat().st_mtime_ns
+    except OSError:
         return {}
+    if _cache and _cache[0] == mtime:
+        return dict(_cache[1])
     try:
         with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+            config = json.load(f)
     except Exception:
         return {}
+    _cache = (mtime, config)
+    return dict(config)
 
 def save_config(config: dict):
+    global _cache
     _ensure_config_dir()
     with open(CONFIG_FILE, 'w') as f:
         json.dump(config, f, indent=4)
+    _cache = None
 
 def get_data_path() -> Optional[Path]:
     config = load_config()
@@ -1,13 +1,371 @@
 # core/db.py
 import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Iterable, Any
 from . import paths
+from .config_manager import load_config
 
-def get_conn():
-    return sqlite3.connect(paths.get_db_path())
+# One long-lived connection per thread. Opening a connection (and resolving the
+# DB path through config.json) on every query is expensive on network shares.
+STATEMENT_CACHE_SIZE = 256          # prepared statements kept per connection
+CACHE_SIZE_KB = 16 * 1024           # page cache per connection
+MMAP_SIZE = 256 * 1024 * 1024       # memory-mapped I/O window
+JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST"}
+
+_local = threading.local()
+_lock = threading.Lock()
+_conns: list[sqlite3.Connection] = []
+_generation = 0                     # bumped by close_all() to invalidate thread-local handles
+_db_path: Path | None = None
+
+def get_db_path() -> Path:
+    """Resolved DB path, cached for the process lifetime (see reset())."""
+    global _db_path
+    if _db_path is None:
+        _db_path = paths.get_db_path()
+    return _db_path
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # check_same_thread=False only so close_all() can run at shutdown;
+    # each connection is still used by the thread that created it.
+    con = sqlite3.connect(path, timeout=30, cached_statements=STATEMENT_CACHE_SIZE,
+                          check_same_thread=False)
+    # WAL needs shared memory between readers; sites sharing one DB between
+    # several PCs over SMB can set "db_journal_mode": "DELETE" in config.json.
+    journal = str(load_config().get("db_journal_mode", "WAL")).upper()
+    if journal not in JOURNAL_MODES:
+        journal = "WAL"
+    con.execute(f"PRAGMA journal_mode={journal}")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    con.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    con.execute("PRAGMA temp_store=MEMORY")
+    return con
+
+def get_conn() -> sqlite3.Connection:
+    con = getattr(_local, "con", None)
+    if con is None or _local.generation != _generation:
+        con = _connect(get_db_path())
+        _local.con, _local.generation = con, _generation
+        with _lock:
+            _conns.append(con)
+    return con
+
+def close_conn():
+    """Close the calling thread's connection (call at the end of worker threads)."""
+    con = getattr(_local, "con", None)
+    if con is None:
+        return
+    _local.con = None
+    with _lock:
+        if con in _conns:
+            _conns.remove(con)
+    con.close()
+
+def close_all():
+    """Close every pooled connection (app shutdown)."""
+    global _generation
+    _local.con = None
+    with _lock:
+        _generation += 1
+        conns = list(_conns)
+        _conns.clear()
+    for con in conns:
+        try:
+            con.close()
+        except sqlite3.Error:
+            pass
+
+def reset():
+    """Drop pooled connections and the cached path, e.g. after the data folder changes."""
+    global _db_path
+    close_all()
+    _db_path = None
+
+def _fts_index(con):
+    """FTS5 index over the searchable text columns, kept in sync by triggers."""
+    cols = "battery_name, battery_code, log_id, battery_no, operator_name, remarks"
+    new = ", ".join(f"new.{c}" for c in cols.split(", "))
+    old = ", ".join(f"old.{c}" for c in cols.split(", "))
+    con.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS recordings_fts USING fts5(
+            {cols},
+            content='recordings', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    con.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recordings_fts_ai AFTER INSERT ON recordings BEGIN
+            INSERT INTO recordings_fts(rowid, {cols}) VALUES (new.id, {new});
+        END
+    """)
+    con.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recordings_fts_ad AFTER DELETE ON recordings BEGIN
+            INSERT INTO recordings_fts(recordings_fts, rowid, {cols}) VALUES ('delete', old.id, {old});
+        END
+    """)
+    con.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recordings_fts_au AFTER UPDATE OF {cols} ON recordings BEGIN
+            INSERT INTO recordings_fts(recordings_fts, rowid, {cols}) VALUES ('delete', old.id, {old});
+            INSERT INTO recordings_fts(rowid, {cols}) VALUES (new.id, {new});
+        END
+    """)
+    # Backfill rows that existed before the index
+    con.execute("INSERT INTO recordings_fts(recordings_fts) VALUES ('rebuild')")
+
+def _sort_indexes(con):
+    # Keyset pagination indexes; expressions must match services.search.SORT_KEYS
+    con.execute("CREATE INDEX IF NOT EXISTS idx_recordings_created ON recordings(ifnull(created_at,''), id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_recordings_datetime ON recordings(ifnull(datetime,''), id)")
+
+def _jobs_table(con):
+    # Persistent background work queue (services.jobs); state: pending | running | done | failed
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS jobs(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL DEFAULT 'encode',
+            state TEXT NOT NULL DEFAULT 'pending',
+            recording_id INTEGER,
+            src_path TEXT,
+            dst_path TEXT,
+            payload TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            started_at TEXT,
+            finished_at TEXT
+        )
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, id)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_jobs_recording ON jobs(recording_id)")
+
+def _overlay_burned(con):
+    # 0 = stream-copied source; the player draws the battery overlay itself
+    con.execute("ALTER TABLE recordings ADD COLUMN overlay_burned INTEGER NOT NULL DEFAULT 1")
+
+def _job_throughput(con):
+    # Measured encode speed per job, for sizing encode hardware from real numbers
+    for col in ("encoder TEXT", "fps REAL", "speed REAL", "bitrate_kbps REAL", "media_seconds REAL", "wall_seconds REAL"):
+        con.execute(f"ALTER TABLE jobs ADD COLUMN {col}")
+
+def _blob_store(con):
+    # Content-addressed videos (services.store); refcount follows recordings.video_hash via triggers
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS blobs(
+            hash TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            source_key TEXT,
+            created_at TEXT
+        )
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_blobs_source ON blobs(source_key)")
+    con.execute("ALTER TABLE recordings ADD COLUMN video_hash TEXT")
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_blob_ai AFTER INSERT ON recordings WHEN new.video_hash IS NOT NULL BEGIN
+            UPDATE blobs SET refcount = refcount + 1 WHERE hash = new.video_hash;
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_blob_ad AFTER DELETE ON recordings WHEN old.video_hash IS NOT NULL BEGIN
+            UPDATE blobs SET refcount = refcount - 1 WHERE hash = old.video_hash;
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_blob_au AFTER UPDATE OF video_hash ON recordings
+        WHEN old.video_hash IS NOT new.video_hash BEGIN
+            UPDATE blobs SET refcount = refcount - 1 WHERE hash = old.video_hash;
+            UPDATE blobs SET refcount = refcount + 1 WHERE hash = new.video_hash;
+        END
+    """)
+
+def _archive_tier(con):
+    # Cold-storage tier for blobs (services.archive); path moves, hash stays the identity
+    for col in ("tier TEXT NOT NULL DEFAULT 'hot'", "archived_at TEXT", "restored_at TEXT", "archive_codec TEXT"):
+        con.execute(f"ALTER TABLE blobs ADD COLUMN {col}")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_blobs_tier ON blobs(tier)")
+
+def _stats_delta(sign: str, r: str) -> str:
+    """Trigger statements adding (sign '+') or removing ('-') row r (new/old) from the stats tables."""
+    return f"""
+        UPDATE stats SET total = total {sign} 1,
+                         with_video = with_video {sign} (ifnull({r}.video_path, '') != ''),
+                         footage_ms = footage_ms {sign} ifnull({r}.duration_ms, 0),
+                         version = version + 1
+        WHERE id = 1;
+        INSERT INTO stats_operator (operator, recordings, footage_ms)
+        VALUES (ifnull({r}.operator_name, ''), {sign}1, {sign}ifnull({r}.duration_ms, 0))
+        ON CONFLICT(operator) DO UPDATE SET recordings = recordings + excluded.recordings,
+                                            footage_ms = footage_ms + excluded.footage_ms;
+        INSERT INTO stats_day (day, recordings, footage_ms)
+        VALUES (substr(ifnull({r}.datetime, ''), 1, 10), {sign}1, {sign}ifnull({r}.duration_ms, 0))
+        ON CONFLICT(day) DO UPDATE SET recordings = recordings + excluded.recordings,
+                                       footage_ms = footage_ms + excluded.footage_ms;
+    """
+
+_STATS_ADD_LATEST = "UPDATE stats SET latest = max(ifnull(latest, ''), ifnull(new.datetime, '')) WHERE id = 1;"
+_STATS_DROP = """
+    UPDATE stats SET latest = (SELECT datetime FROM recordings ORDER BY ifnull(datetime, '') DESC, id DESC LIMIT 1)
+    WHERE id = 1 AND ifnull(old.datetime, '') >= ifnull(latest, '');
+    DELETE FROM stats_operator WHERE recordings <= 0;
+    DELETE FROM stats_day WHERE recordings <= 0;
+"""
+
+def _stats_tables(con):
+    # Dashboard aggregates kept current by triggers, so reading them is O(1)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS stats(
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL DEFAULT 0,
+            with_video INTEGER NOT NULL DEFAULT 0,
+            footage_ms INTEGER NOT NULL DEFAULT 0,
+            latest TEXT,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    con.execute("CREATE TABLE IF NOT EXISTS stats_operator(operator TEXT PRIMARY KEY, recordings INTEGER, footage_ms INTEGER)")
+    con.execute("CREATE TABLE IF NOT EXISTS stats_day(day TEXT PRIMARY KEY, recordings INTEGER, footage_ms INTEGER)")
+    con.execute("""
+        INSERT OR REPLACE INTO stats (id, total, with_video, footage_ms, latest)
+        SELECT 1, COUNT(*), ifnull(SUM(ifnull(video_path, '') != ''), 0), ifnull(SUM(duration_ms), 0), MAX(datetime)
+        FROM recordings
+    """)
+    con.execute("""
+        INSERT OR REPLACE INTO stats_operator
+        SELECT ifnull(operator_name, ''), COUNT(*), ifnull(SUM(duration_ms), 0) FROM recordings GROUP BY 1
+    """)
+    con.execute("""
+        INSERT OR REPLACE INTO stats_day
+        SELECT substr(ifnull(datetime, ''), 1, 10), COUNT(*), ifnull(SUM(duration_ms), 0) FROM recordings GROUP BY 1
+    """)
+    con.execute(f"CREATE TRIGGER IF NOT EXISTS recordings_stats_ai AFTER INSERT ON recordings BEGIN "
+                f"{_stats_delta('+', 'new')} {_STATS_ADD_LATEST} END")
+    con.execute(f"CREATE TRIGGER IF NOT EXISTS recordings_stats_ad AFTER DELETE ON recordings BEGIN "
+                f"{_stats_delta('-', 'old')} {_STATS_DROP} END")
+    con.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS recordings_stats_au
+        AFTER UPDATE OF datetime, operator_name, video_path, duration_ms ON recordings BEGIN
+            {_stats_delta('-', 'old')} {_STATS_DROP} {_stats_delta('+', 'new')} {_STATS_ADD_LATEST}
+        END
+    """)
+
+def _recording_health(con):
+    # Last integrity scan per recording (services.integrity); size/mtime make rescans incremental
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS recording_health(
+            recording_id INTEGER PRIMARY KEY,
+            status TEXT NOT NULL,
+            detail TEXT,
+            path TEXT,
+            size INTEGER,
+            mtime_ns INTEGER,
+            decoded INTEGER NOT NULL DEFAULT 0,
+            checked_at TEXT
+        )
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_health_status ON recording_health(status)")
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_health_ad AFTER DELETE ON recordings BEGIN
+            DELETE FROM recording_health WHERE recording_id = old.id;
+        END
+    """)
+
+def _watch_ingest(con):
+    # Sources taken from the watch folder (services.watch_folder), keyed by content so a re-scan never re-ingests
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS watch_ingest(
+            source_hash TEXT PRIMARY KEY,
+            src_path TEXT NOT NULL,
+            recording_id INTEGER,
+            job_id INTEGER,
+            created_at TEXT,
+            done_at TEXT
+        )
+    """)
+
+def _recording_activity(con):
+    # Motion analysis per recording (services.activity); a new video makes it stale
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS recording_activity(
+            recording_id INTEGER PRIMARY KEY,
+            idle_spans TEXT,
+            trimmed_ms INTEGER NOT NULL DEFAULT 0,
+            analyzed_at TEXT
+        )
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_activity_ad AFTER DELETE ON recordings BEGIN
+            DELETE FROM recording_activity WHERE recording_id = old.id;
+        END
+    """)
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_activity_au AFTER UPDATE OF video_hash ON recordings
+        WHEN old.video_hash IS NOT NULL AND old.video_hash IS NOT new.video_hash BEGIN
+            DELETE FROM recording_activity WHERE recording_id = old.id;
+        END
+    """)
+
+def _activity_timeline(con):
+    # Per-second activity (float16 blob) behind the player's seek bar
+    con.execute("ALTER TABLE recording_activity ADD COLUMN timeline BLOB")
+
+def _watch_claims(con):
+    # Files in the watch folder's .ingesting/ being probed and hashed, with a heartbeat so only a dead watcher's are swept
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS watch_claims(
+            src_path TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            heartbeat TEXT NOT NULL
+        )
+    """)
+
+def _job_owner(con):
+    # Which process runs a job, and when it last said so: only a dead one's jobs are requeued
+    con.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+    con.execute("ALTER TABLE jobs ADD COLUMN heartbeat TEXT")
+
+def _stats_version_any_update(con):
+    # The dashboard's recent table shows more columns than the stats triggers watch: any edit makes it stale
+    con.execute("""
+        CREATE TRIGGER IF NOT EXISTS recordings_stats_version_au AFTER UPDATE ON recordings BEGIN
+            UPDATE stats SET version = version + 1 WHERE id = 1;
+        END
+    """)
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Append only: a DB at version N has had MIGRATIONS[:N] applied.
+MIGRATIONS = [
+    _fts_index,
+    _sort_indexes,
+    _jobs_table,
+    _overlay_burned,
+    _job_throughput,
+    _blob_store,
+    _archive_tier,
+    _stats_tables,
+    _recording_health,
+    _watch_ingest,
+    _recording_activity,
+    _activity_timeline,
+    _watch_claims,
+    _job_owner,
+    _stats_version_any_update,
+]
+
+def _migrate(con):
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    for n, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        with con:
+            con.execute("BEGIN")
+            step(con)
+            con.execute(f"PRAGMA user_version={n}")
 
 def init_db():
-    with get_conn() as con:
+    con = get_conn()
+    with con:
         con.execute("""
             CREATE TABLE IF NOT EXISTS recordings(
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -24,14 +382,22 @@ def init_db():
                 updated_at TEXT
             )
         """)
-        con.commit()
+    # Later columns (overlay_burned, ...) are added by MIGRATIONS so old and new DBs converge
+    _migrate(con)
+
+@contextmanager
+def transaction():
+    """Write transaction on this thread's connection; commits on success, rolls back on error."""
+    con = get_conn()
+    with con:
+        con.execute("BEGIN IMMEDIATE")
+        yield con
 
 def query(sql: str, params: Iterable[Any] = ()):
-    with get_conn() as con:
-        return con.execute(sql, params).fetchall()
+    return get_conn().execute(sql, params).fetchall()
 
 def execute(sql: str, params: Iterable[Any] = ()):
-    with get_conn() as con:
+    con = get_conn()
+    with con:
         cur = con.execute(sql, params)
-        con.commit()
-        return cur.lastrowid
+    return cur.lastrowid
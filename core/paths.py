@@ -29,5 +29,11 @@ def get_snap_dir() -> Path:
         return data_path / "snapshots"
     return APP_DIR / "snapshots"
 
+def get_thumb_dir() -> Path:
+    data_path = get_data_path()
+    if data_path:
+        return data_path / "thumbnails"
+    return APP_DIR / "thumbnails"
+
 # Ensure assets dir exists (others are ensured by main or usage)
 ASSETS_DIR.mkdir(parents=True, exist_ok=True)
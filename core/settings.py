@@ -1,12 +1,12 @@
 # core/settings.py
 from pathlib import Path
-from PySide6.QtCore import QSettings
 
 ORG = "RES"
 APP = "StackAssemblyDashboard"
 VERSION = "1.0.10"
 
 def _s():
+    from PySide6.QtCore import QSettings  # keeps services.media importable without Qt (cli.py)
     st = QSettings(ORG, APP)
     st.sync()
     return st
@@ -1,5 +1,3 @@
-import requests
-import webbrowser
 from packaging import version
 from PySide6.QtCore import QThread, Signal
 
@@ -16,6 +14,7 @@ class UpdateChecker(QThread):
 
     def run(self):
         try:
+            import requests  # ~100 ms to import; loaded on the checker thread, not at startup
             response = requests.get(RELEASES_API, timeout=5)
             if response.status_code == 200:
                 data = response.json()
@@ -53,6 +52,7 @@ class UpdateDownloader(QThread):
 
     def run(self):
         try:
+            import requests
             r = requests.get(self.url, stream=True)
             total = int(r.headers.get('content-length', 0))
             downloaded = 0
@@ -74,4 +74,5 @@ class UpdateDownloader(QThread):
         self._is_running = False
 
 def open_update_url(url):
+    import webbrowser
     webbrowser.open(url)
@@ -1,10 +1,12 @@
 # main_window.py
 from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QStackedWidget, QFrame
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QCoreApplication
 from widgets.topbar import TopBar
 from views.dashboard import DashboardView
-from views.record_new import RecordNewView
-from views.record_list import RecordListView
+from views.jobs_panel import JobQueue
+from services import jobs, watch_folder
+
+DASHBOARD, NEW, LIST, SETTINGS = range(4)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -15,18 +17,19 @@ class MainWindow(QMainWindow):
         self.topbar = TopBar()
         self.stack = QStackedWidget()
 
-        # Views
-        self.dashboard = DashboardView()
-        self.recordNew = RecordNewView(on_saved=self._after_save)
-        self.recordList = RecordListView()
-
-        from views.settings import SettingsView # Local import
-        self.settingsView = SettingsView(self._show_update_dialog)
+        # Background encode queue (resumes jobs left over from the last session)
+        self.jobQueue = JobQueue(self)
+        self.jobQueue.stateChanged.connect(self._on_job_state)
+        # Camera drop folder (Settings > Watch Folder); idles while none is set
+        self.watcher = watch_folder.Watcher(self.jobQueue.submit_batch)
+        self.watcher.start()
+        QCoreApplication.instance().aboutToQuit.connect(lambda: self.watcher.stop(timeout=1))
 
-        self.stack.addWidget(self.dashboard)   # 0
-        self.stack.addWidget(self.recordNew)   # 1
-        self.stack.addWidget(self.recordList)  # 2
-        self.stack.addWidget(self.settingsView) # 3
+        # Views are built on first visit (the list view pulls in QtMultimedia);
+        # only the dashboard is needed to show the window
+        self._views: dict[int, QWidget] = {}
+        for _ in range(4): self.stack.addWidget(QWidget())
+        self._view(DASHBOARD)
 
         # Left rail
         rail = QFrame(); rail.setObjectName("Card")
@@ -68,15 +71,49 @@ class MainWindow(QMainWindow):
         # Global search routes to list
         self.topbar.searchEdit.textChanged.connect(self._global_search)
 
-        # Check for updates
+        # Check for updates once the window is up
+        QTimer.singleShot(0, self._check_updates)
+
+    def _check_updates(self):
         from core.settings import VERSION
-        from core.updater import UpdateChecker, open_update_url
-        from PySide6.QtWidgets import QMessageBox
+        from core.updater import UpdateChecker
 
         self.updater = UpdateChecker(VERSION)
         self.updater.update_available.connect(lambda v, url: self._show_update_dialog(v, url))
         self.updater.start()
 
+    def _view(self, idx: int) -> QWidget:
+        view = self._views.get(idx)
+        if view is None:
+            if idx == DASHBOARD:
+                view = DashboardView()
+            elif idx == NEW:
+                from views.record_new import RecordNewView
+                view = RecordNewView(self.jobQueue, on_saved=self._after_save)
+            elif idx == LIST:
+                from views.record_list import RecordListView
+                view = RecordListView()
+            else:
+                from views.settings import SettingsView
+                view = SettingsView(self._show_update_dialog)
+            # Removing the current page moves the stack elsewhere: put it back on the same index
+            current = self.stack.currentIndex()
+            placeholder = self.stack.widget(idx)
+            self.stack.removeWidget(placeholder); placeholder.deleteLater()
+            self.stack.insertWidget(idx, view)
+            self.stack.setCurrentIndex(current)
+            self._views[idx] = view
+        return view
+
+    @property
+    def dashboard(self): return self._view(DASHBOARD)
+    @property
+    def recordNew(self): return self._view(NEW)
+    @property
+    def recordList(self): return self._view(LIST)
+    @property
+    def settingsView(self): return self._view(SETTINGS)
+
     def _show_update_dialog(self, version, url):
         from PySide6.QtWidgets import QMessageBox, QProgressDialog
         from PySide6.QtCore import QUrl
@@ -132,7 +169,9 @@ class MainWindow(QMainWindow):
             self.progress.canceled.connect(self.downloader.stop)
             self.downloader.start()
 
-    def _switch(self, idx: int):
+    def _switch(self, idx: int, refresh: bool = True):
+        refresh = refresh and idx in self._views     # a view just built has loaded its data already
+        self._view(idx)
         self.stack.setCurrentIndex(idx)
         
         # Update nav buttons state
@@ -141,14 +180,22 @@ class MainWindow(QMainWindow):
         self.btnList.setChecked(idx == 2)
         self.btnSettings.setChecked(idx == 3)
 
+        if not refresh:
+            return
         if idx == 0:
             self.dashboard.refresh()
         elif idx == 2:
             self.recordList.refresh()
 
     def _after_save(self):
-        self._switch(2)
+        # Stay on the form so the next assembly can be filed; just show the new row
+        if LIST in self._views: self.recordList.requery()
+
+    def _on_job_state(self, job_id: int, state: str, message: str):
+        if state in (jobs.DONE, jobs.FAILED, jobs.CANCELLED) and LIST in self._views:
+            self.recordList.requery()
 
     def _global_search(self, text: str):
-        self._switch(2)
-        self.recordList.refresh(text)
+        if self.stack.currentIndex() != LIST:
+            self._switch(LIST, refresh=False)
+        self.recordList.search(text)
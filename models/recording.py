@@ -15,3 +15,5 @@ class Recording:
     duration_ms: int | None
     created_at: str
     updated_at: str | None = None
+    overlay_burned: bool = True     # False: stream-copied, overlay drawn by the player
+    video_hash: str | None = None   # services.store blob, None for files outside the store
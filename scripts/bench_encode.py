@@ -0,0 +1,231 @@
+"""
+Encoding benchmark: generates synthetic sources with the bundled ffmpeg and runs
+services.video_processor.process_and_save_video over every combination of source,
+encoder, preset and thread count. Reports, as JSON, wall time, encode fps and speed,
+peak RSS of the ffmpeg process, output size and bitrate, and PSNR/SSIM against the source.
+
+    python scripts/bench_encode.py [--resolutions 1280x720,1920x1080,3840x2160] [--durations 10]
+                                   [--codecs h264,hevc] [--encoders libx264,h264_nvenc]
+                                   [--presets veryfast,medium] [--threads 0,4] [--repeat 1]
+                                   [--no-quality] [--out results.json]
+
+Each trial runs in a fresh interpreter with a throwaway config/data folder, so peak RSS
+is per trial and the real database and encoder cache are never touched. The burned-in
+overlay is not in the source, so it costs every trial the same PSNR/SSIM: compare the
+numbers between trials rather than reading them as absolute quality.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+APP_NAME = "RES Stack Assembly Recorder"   # core.config_manager.APP_NAME
+
+SOURCE_CODECS = {
+    "h264": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18"],
+    "hevc": ["-c:v", "libx265", "-preset", "ultrafast", "-crf", "18", "-tag:v", "hvc1"],
+    "mpeg4": ["-c:v", "mpeg4", "-q:v", "2"],
+}
+OVERLAY_DATA = ("BENCH-001", "0001", "Benchmark")
+
+def _ffmpeg() -> str:
+    from imageio_ffmpeg import get_ffmpeg_exe
+    return get_ffmpeg_exe()
+
+def make_source(folder: Path, codec: str, width: int, height: int, duration: float, fps: int = 30) -> Path:
+    """Moving test pattern plus a tone; detailed and animated enough to keep the encoder busy."""
+    out = folder / f"src_{codec}_{width}x{height}_{duration:g}s.mp4"
+    if not out.exists():
+        cmd = [_ffmpeg(), "-hide_banner", "-v", "error", "-y",
+               "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+               "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+               "-pix_fmt", "yuv420p", *SOURCE_CODECS[codec], "-c:a", "aac", "-shortest", str(out)]
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding="utf-8", errors="replace")
+        if res.returncode != 0:
+            raise RuntimeError(f"Could not create {out.name}: {res.stderr.strip()[-500:]}")
+    return out
+
+def quality(output: Path, source: Path) -> dict:
+    """PSNR (dB, all planes) and SSIM of output against the source scaled to the output size."""
+    from services.metadata import probe
+    meta = probe(str(output))
+    lavfi = (f"[0:v]split[a][b];[1:v]scale={meta.width}:{meta.height}:flags=bicubic,split[r1][r2];"
+             "[a][r1]psnr;[b][r2]ssim")
+    res = subprocess.run([_ffmpeg(), "-hide_banner", "-nostats", "-i", str(output), "-i", str(source),
+                          "-lavfi", lavfi, "-f", "null", "-"],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding="utf-8", errors="replace")
+    psnr = re.search(r"PSNR .*average:(inf|[\d.]+)", res.stderr)
+    ssim = re.search(r"SSIM .*All:([\d.]+)", res.stderr)
+    return {"psnr_db": float(psnr.group(1)) if psnr else None, "ssim": float(ssim.group(1)) if ssim else None}
+
+class _RssSampler(threading.Thread):
+    """Windows fallback for peak RSS: polls child processes with psutil, if it is installed."""
+    def __init__(self):
+        super().__init__(daemon=True)
+        import psutil
+        self.me = psutil.Process()
+        self.peak = 0
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(0.05):
+            for child in self.me.children(recursive=True):
+                try:
+                    self.peak = max(self.peak, child.memory_info().rss)
+                except Exception:
+                    pass
+
+def trial(spec: dict) -> dict:
+    """One encode, in this (child) process. Returns the measurements for the report."""
+    from services.encoders import ENCODERS, with_options
+    from services.video_processor import process_and_save_video
+    enc = with_options(ENCODERS[spec["encoder"]], spec.get("preset"), spec.get("threads"))
+    stats = {}
+    def on_progress(percent, eta, **kw):
+        stats.update({k: v for k, v in kw.items() if v is not None})
+
+    sampler = None
+    if os.name == "nt":
+        try:
+            sampler = _RssSampler(); sampler.start()
+        except ImportError:
+            sampler = None
+    output = Path(spec["output"])
+    start = time.perf_counter()
+    meta = process_and_save_video(spec["source"], str(output), OVERLAY_DATA, on_progress, encoder=enc)
+    wall = time.perf_counter() - start
+
+    if sampler:
+        sampler.done.set(); sampler.join(); peak = sampler.peak
+    elif os.name == "nt":
+        peak = None
+    else:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024   # bytes on macOS, KiB elsewhere
+    media = meta.duration_ms / 1000 if meta.duration_ms else stats.get("media_seconds")
+    result = {
+        "wall_s": round(wall, 3),
+        # ffmpeg's own fps reads 0 for the first second, so count frames over wall time
+        "fps": round(media * meta.fps / wall, 1) if media and meta.fps else stats.get("fps"),
+        "speed": stats.get("speed"),
+        "realtime_x": round(media / wall, 2) if media else None,
+        "peak_rss_mb": round(peak / 2**20, 1) if peak else None,
+        "output_bytes": output.stat().st_size,
+        "bitrate_kbps": round(output.stat().st_size * 8 / 1000 / media, 1) if media else None,
+        "width": meta.width, "height": meta.height,
+    }
+    if spec.get("quality", True):
+        result.update(quality(output, Path(spec["source"])))
+    return result
+
+def run_trial(spec: dict, env: dict) -> dict:
+    proc = subprocess.run([sys.executable, str(Path(__file__).resolve()), "--trial", json.dumps(spec)],
+                          cwd=str(PROJECT_DIR), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          encoding="utf-8", errors="replace")
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    return {"error": (proc.stderr.strip().splitlines() or ["trial failed"])[-1]}
+
+def _csv(value: str, cast=str) -> list:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+def _size(value: str) -> tuple[int, int]:
+    w, h = value.lower().split("x")
+    return int(w), int(h)
+
+def _summary(trials: list[dict]) -> list[dict]:
+    """Per source: fastest trial, and the fastest one within 0.5 dB PSNR of the best quality."""
+    out = []
+    for source in dict.fromkeys(t["source"] for t in trials):
+        ok = [t for t in trials if t["source"] == source and "error" not in t]
+        if not ok: continue
+        fastest = min(ok, key=lambda t: t["wall_s"])
+        entry = {"source": source, "fastest": {k: fastest[k] for k in ("encoder", "preset", "threads", "wall_s")}}
+        rated = [t for t in ok if t.get("psnr_db") is not None]
+        if rated:
+            best = max(t["psnr_db"] for t in rated)
+            pick = min((t for t in rated if t["psnr_db"] >= best - 0.5), key=lambda t: t["wall_s"])
+            entry["balanced"] = {k: pick[k] for k in ("encoder", "preset", "threads", "wall_s", "psnr_db")}
+        out.append(entry)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--resolutions", type=lambda v: _csv(v, _size), default=[(1280, 720), (1920, 1080), (3840, 2160)])
+    ap.add_argument("--durations", type=lambda v: _csv(v, float), default=[10.0])
+    ap.add_argument("--codecs", type=_csv, default=["h264", "hevc"], help=", ".join(SOURCE_CODECS))
+    ap.add_argument("--encoders", type=_csv, default=None, help="default: every encoder that works here")
+    ap.add_argument("--presets", type=_csv, default=[None], help="default: each encoder's own")
+    ap.add_argument("--threads", type=lambda v: _csv(v, int), default=[None], help="0 = ffmpeg decides")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per combination; the median wall time is kept")
+    ap.add_argument("--no-quality", action="store_true", help="skip PSNR/SSIM")
+    ap.add_argument("--out", help="also write the report to this file")
+    ap.add_argument("--trial", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.trial:
+        print("RESULT " + json.dumps(trial(json.loads(args.trial))), flush=True)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        config_dir = tmp / APP_NAME
+        config_dir.mkdir()
+        (config_dir / "config.json").write_text(json.dumps({"data_path": str(tmp / "data")}))
+        env = {**os.environ, "APPDATA": str(tmp)}
+        os.environ["APPDATA"] = str(tmp)    # encoder probing below caches into the throwaway folder
+
+        from services.encoders import ENCODERS, available_encoders
+        working = available_encoders(_ffmpeg())
+        encoders = [e for e in (args.encoders or working) if e in ENCODERS and e in working]
+        skipped = [e for e in (args.encoders or []) if e not in working]
+
+        trials = []
+        for codec in args.codecs:
+            for width, height in args.resolutions:
+                for duration in args.durations:
+                    source = make_source(tmp, codec, width, height, duration)
+                    for enc in encoders:
+                        for preset in args.presets:
+                            for threads in args.threads:
+                                spec = {"source": str(source), "output": str(tmp / "out.mp4"), "encoder": enc,
+                                        "preset": preset, "threads": threads, "quality": not args.no_quality}
+                                runs = [run_trial(spec, env) for _ in range(max(1, args.repeat))]
+                                good = [r for r in runs if "error" not in r]
+                                result = (sorted(good, key=lambda r: r["wall_s"])[len(good) // 2] if good else runs[-1])
+                                if len(good) > 1:
+                                    result["wall_s_runs"] = [r["wall_s"] for r in good]
+                                row = {"source": source.name, "codec": codec, "resolution": f"{width}x{height}",
+                                       "duration_s": duration, "encoder": enc, "preset": preset, "threads": threads,
+                                       **result}
+                                trials.append(row)
+                                print(json.dumps(row), file=sys.stderr, flush=True)
+                                Path(spec["output"]).unlink(missing_ok=True)
+
+    report = {
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "encoders_available": working,
+        "encoders_skipped": skipped,
+        "trials": trials,
+        "summary": _summary(trials),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+    print(text)
+    sys.exit(1 if any("error" in t for t in trials) else 0)
+
+if __name__ == "__main__":
+    main()
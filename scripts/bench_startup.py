@@ -0,0 +1,112 @@
+"""
+Cold-start benchmark: launches the app in fresh interpreters and reports, as JSON,
+the time from process spawn until the main window has shown and the event loop runs.
+
+    python scripts/bench_startup.py [--runs 5] [--budget-ms 1000] [--imports]
+
+Each run uses a throwaway config/data folder, so the real database is never touched.
+Exits non-zero when the median exceeds the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+APP_NAME = "RES Stack Assembly Recorder"   # core.config_manager.APP_NAME
+
+# Mirrors app.main() without the first-run dialogs. Phases are printed relative to
+# the child's own first statement; the parent adds interpreter startup on top.
+CHILD = r"""
+import time; t0 = time.perf_counter()
+import os, sys, json
+phases = {}
+def mark(name): phases[name] = round((time.perf_counter() - t0) * 1000, 1)
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+mark("qt_import")
+import app, core.paths as paths
+from core.db import init_db
+from core.style import apply_style
+mark("app_import")
+qapp = QApplication(sys.argv); apply_style(qapp)
+paths.get_videos_dir().mkdir(parents=True, exist_ok=True)
+init_db()
+mark("db_init")
+from main_window import MainWindow
+win = MainWindow(); win.show()
+mark("window_built")
+def ready():
+    mark("event_loop")
+    print("READY " + json.dumps(phases), flush=True)
+    os._exit(0)   # skip teardown (update checker thread, job workers)
+QTimer.singleShot(0, ready)
+qapp.exec()
+"""
+
+def run_once(env: dict, importtime: bool = False) -> tuple[float, dict, str]:
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CHILD]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=str(PROJECT_DIR), env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, encoding="utf-8", errors="replace")
+    phases = None
+    for line in proc.stdout:
+        if line.startswith("READY "):
+            wall = (time.perf_counter() - start) * 1000
+            phases = json.loads(line[6:])
+            break
+    _, stderr = proc.communicate()
+    if phases is None:
+        raise RuntimeError(f"App did not start:\n{stderr[-2000:]}")
+    return wall, phases, stderr
+
+def slowest_imports(importtime_log: str, top: int = 15) -> list[dict]:
+    """Parses `-X importtime` output into the modules with the largest cumulative time."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            rows.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    return sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:top]
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=1000)
+    ap.add_argument("--imports", action="store_true", help="also report the slowest imports")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = Path(tmp) / APP_NAME
+        config_dir.mkdir()
+        (config_dir / "config.json").write_text(json.dumps({"data_path": str(Path(tmp) / "data")}))
+        env = {**os.environ, "APPDATA": tmp}
+
+        run_once(env)   # warm the OS file cache once, like a second launch on the same PC
+        walls, phases = [], []
+        for _ in range(args.runs):
+            wall, ph, _ = run_once(env)
+            walls.append(wall); phases.append(ph)
+        report = {
+            "runs": args.runs,
+            "median_ms": round(statistics.median(walls), 1),
+            "min_ms": round(min(walls), 1),
+            "max_ms": round(max(walls), 1),
+            "budget_ms": args.budget_ms,
+            "phases_ms": {k: round(statistics.median(p[k] for p in phases), 1) for k in phases[0]},
+        }
+        if args.imports:
+            report["slowest_imports"] = slowest_imports(run_once(env, importtime=True)[2])
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["median_ms"] <= args.budget_ms else 1)
+
+if __name__ == "__main__":
+    main()
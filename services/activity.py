@@ -0,0 +1,134 @@
+# services/activity.py
+import datetime
+import json
+import subprocess
+import threading
+import numpy as np
+from core.config_manager import load_config
+from core.db import query, execute
+
+# Motion analysis on a tiny grayscale copy of the video decoded by the bundled ffmpeg.
+# A sample's score is the share of pixels that changed by more than PIXEL_DELTA since
+# the previous sample (0..1): area downscaling averages sensor noise away, so a still
+# bench scores ~0 and a hand moving through the frame scores well above IDLE_THRESHOLD.
+SAMPLE_FPS = 4
+SAMPLE_SIZE = (64, 36)          # w, h
+PIXEL_DELTA = 8                 # of 255
+IDLE_THRESHOLD = 0.005
+MIN_IDLE_SECONDS = 10
+IDLE_PAD_SECONDS = 1            # kept on both sides of a cut or skip, so steps don't start mid-motion
+CHUNK_FRAMES = 1024
+EVENT_QUIET_SECONDS = 3         # activity after this much stillness starts a new step
+SCENE_THRESHOLD = 0.5           # half the picture changed at once: a cut, a camera bump, lights
+
+# config "idle_segments": what happens to idle stretches of new recordings
+OFF, MARK, CUT = "off", "mark", "cut"
+
+def idle_mode() -> str:
+    mode = load_config().get("idle_segments", OFF)
+    return mode if mode in (MARK, CUT) else OFF
+
+def _threshold() -> float:
+    try:
+        return float(load_config().get("idle_threshold", IDLE_THRESHOLD))
+    except (TypeError, ValueError):
+        return IDLE_THRESHOLD
+
+def frame_scores(path: str, duration: float | None = None, progress_callback=None,
+                 cancel_event: threading.Event | None = None, fps: int = SAMPLE_FPS) -> np.ndarray:
+    """
+    One score per sample (sample i at i/fps seconds; the first is 0). progress_callback(percent)
+    needs duration. Raises with ffmpeg's error text if the video cannot be decoded.
+    """
+    from imageio_ffmpeg import get_ffmpeg_exe
+    from services.video_processor import EncodeCancelled, kill_process_tree
+    w, h = SAMPLE_SIZE
+    cmd = [get_ffmpeg_exe(), "-hide_banner", "-nostats", "-v", "error", "-i", str(path), "-an", "-sn",
+           "-vf", f"fps={fps},scale={w}:{h}:flags=area,format=gray", "-f", "rawvideo", "-"]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    errors = []
+    threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True).start()
+    frame_bytes = w * h
+    scores, prev, n = [], None, 0
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                kill_process_tree(process); raise EncodeCancelled()
+            buf = process.stdout.read(frame_bytes * CHUNK_FRAMES)
+            frames = np.frombuffer(buf[:len(buf) - len(buf) % frame_bytes], np.uint8).reshape(-1, frame_bytes)
+            if len(frames):
+                # Vectorised over the chunk; the previous chunk's last frame seeds the first difference
+                stack = np.vstack([prev if prev is not None else frames[:1], frames]).astype(np.int16)
+                scores.append((np.abs(np.diff(stack, axis=0)) > PIXEL_DELTA).mean(axis=1))
+                prev, n = frames[-1:], n + len(frames)
+                if progress_callback and duration:
+                    progress_callback(min(99, int(n / (duration * fps) * 100)))
+            if len(buf) < frame_bytes * CHUNK_FRAMES:
+                break
+    finally:
+        process.stdout.close()
+    if process.wait() != 0 and not n:
+        message = b"".join(errors).decode("utf-8", "replace").strip()
+        raise RuntimeError(message[-500:] or f"ffmpeg exited with {process.returncode}")
+    return np.concatenate(scores).astype(np.float32) if scores else np.zeros(0, np.float32)
+
+def idle_spans(scores: np.ndarray, fps: int = SAMPLE_FPS, threshold: float | None = None,
+               min_seconds: float = MIN_IDLE_SECONDS, pad: float = IDLE_PAD_SECONDS) -> list[tuple[int, int]]:
+    """[(start_ms, end_ms)] of stretches scoring below threshold for at least min_seconds, shrunk by pad."""
+    idle = np.asarray(scores) < (_threshold() if threshold is None else threshold)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], idle.astype(np.int8), [0]))))
+    starts, ends = edges[::2] / fps, edges[1::2] / fps     # idle over [start, end) seconds
+    keep = ends - starts >= min_seconds
+    return [(int((s + pad) * 1000), int((e - pad) * 1000)) for s, e in zip(starts[keep], ends[keep]) if e - s > 2 * pad]
+
+def per_second(scores: np.ndarray, fps: int = SAMPLE_FPS) -> np.ndarray:
+    """Timeline for the seek bar: the busiest sample of each second, as float16 (2 bytes a second)."""
+    n = -(-len(scores) // fps)
+    padded = np.zeros(n * fps, np.float32); padded[:len(scores)] = scores
+    return padded.reshape(n, fps).max(axis=1).astype(np.float16)
+
+def events(timeline: np.ndarray, threshold: float | None = None) -> list[int]:
+    """Jump targets (ms): where activity resumes after EVENT_QUIET_SECONDS of stillness, and scene changes."""
+    t = np.asarray(timeline, np.float32)
+    quiet = t < (_threshold() if threshold is None else threshold)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], quiet.astype(np.int8), [0]))))
+    starts, ends = edges[::2], edges[1::2]
+    onsets = ends[(ends - starts >= EVENT_QUIET_SECONDS) & (ends < len(t))]
+    scene = t >= SCENE_THRESHOLD
+    cuts = np.flatnonzero(scene & ~np.concatenate(([False], scene[:-1])))
+    return sorted({int(i) * 1000 for i in np.concatenate((onsets, cuts))})
+
+def select_expr(spans: list[tuple[int, int]]) -> str:
+    """ffmpeg select/aselect expression keeping everything outside spans."""
+    return "not(" + "+".join(f"between(t,{a / 1000:.3f},{b / 1000:.3f})" for a, b in spans) + ")"
+
+def save(recording_id: int, idle: list[tuple[int, int]], trimmed_ms: int | None = None,
+         timeline: np.ndarray | None = None):
+    """trimmed_ms: footage cut at encode; None keeps what was recorded before (re-analysis)."""
+    blob = timeline.astype(np.float16).tobytes() if timeline is not None else None
+    execute("""
+        INSERT INTO recording_activity (recording_id, idle_spans, trimmed_ms, timeline, analyzed_at)
+        VALUES (?, ?, ifnull(?, 0), ?, ?)
+        ON CONFLICT(recording_id) DO UPDATE SET idle_spans=excluded.idle_spans, timeline=excluded.timeline,
+            analyzed_at=excluded.analyzed_at, trimmed_ms=ifnull(?, trimmed_ms)
+    """, (recording_id, json.dumps(idle), trimmed_ms, blob, datetime.datetime.now().isoformat(timespec='seconds'),
+          trimmed_ms))
+
+def idle_for(recording_id: int) -> list[tuple[int, int]]:
+    """Skippable stretches of a recording's video, [] when not analysed (or cut at encode)."""
+    row = query("SELECT idle_spans FROM recording_activity WHERE recording_id=?", (recording_id,))
+    return [tuple(s) for s in json.loads(row[0][0] or "[]")] if row else []
+
+def timeline_for(recording_id: int) -> np.ndarray | None:
+    """Per-second activity of a recording's video, None until it has been analysed."""
+    row = query("SELECT timeline FROM recording_activity WHERE recording_id=?", (recording_id,))
+    return np.frombuffer(row[0][0], np.float16) if row and row[0][0] is not None else None
+
+def analyze_recording(recording_id: int, video_path: str, cancel_event: threading.Event | None = None):
+    """Idle stretches and timeline of an already stored video; decodes its playback proxy when there is one."""
+    from services import store
+    h = query("SELECT video_hash FROM recordings WHERE id=?", (recording_id,))
+    proxy = store.proxy_path(h[0][0]) if h and h[0][0] else None
+    scores = frame_scores(str(proxy) if proxy and proxy.exists() else video_path, cancel_event=cancel_event)
+    save(recording_id, idle_spans(scores), timeline=per_second(scores))
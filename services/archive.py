@@ -0,0 +1,170 @@
+# services/archive.py
+import datetime
+import os
+import shutil
+import threading
+from pathlib import Path
+from core.config_manager import load_config, save_config
+from core.db import query, close_conn
+from services import store
+from services.encoders import Encoder
+
+# Store blobs whose recordings are all older than config "archive_after_days" move to
+# config "archive_dir" (cold storage), optionally re-encoded to a denser codec. The
+# blob hash stays their identity; blobs.path/tier and recordings.video_path follow.
+# Playback copies an archived video back to the hot tier (restore()).
+HOT, COLD = "hot", "cold"
+ARCHIVE_CODECS = {
+    # Few threads: archiving runs in the background next to recording sessions
+    "hevc": Encoder("libx265", ("-c:v", "libx265", "-preset", "medium", "-crf", "28", "-tag:v", "hvc1",
+                                "-x265-params", "log-level=error:pools=2")),
+    "av1": Encoder("libaom-av1", ("-c:v", "libaom-av1", "-crf", "34", "-b:v", "0", "-cpu-used", "6",
+                                  "-row-mt", "1", "-threads", "2")),
+}
+DURATION_TOLERANCE_MS = 1000
+
+_run_lock = threading.Lock()    # one archive pass at a time
+
+def settings() -> tuple[int, Path | None, str]:
+    """(after_days, archive_dir, codec); after_days 0 or no dir means archiving is off."""
+    config = load_config()
+    try:
+        days = max(0, int(config.get("archive_after_days", 0)))
+    except (TypeError, ValueError):
+        days = 0
+    folder = config.get("archive_dir")
+    codec = config.get("archive_codec", "copy")
+    return days, Path(folder) if folder else None, codec if codec in ARCHIVE_CODECS else "copy"
+
+def candidates(after_days: int) -> list[tuple[str, str]]:
+    """(hash, path) of hot blobs not used by any recording newer than the cutoff, nor restored since."""
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=after_days)).isoformat(timespec='seconds')
+    return query("""
+        SELECT b.hash, b.path FROM blobs b
+        WHERE b.tier=? AND b.refcount > 0 AND ifnull(b.restored_at, '') < ?
+          AND NOT EXISTS (SELECT 1 FROM recordings r WHERE r.video_hash=b.hash AND ifnull(r.created_at, '') >= ?)
+        ORDER BY b.created_at
+    """, (HOT, cutoff, cutoff))
+
+def _tmp(dst: Path) -> Path:
+    # Unique per process and thread: another archiver may be staging the same blob
+    return dst.with_name(f"{dst.name}.{os.getpid()}.{threading.get_ident()}.part")
+
+def _reencode(src: Path, dst: Path, enc: Encoder, cancel_event=None) -> Path | None:
+    """Re-encodes into a temp file next to dst and returns it; None (nothing kept) if it is not smaller or does not match."""
+    from imageio_ffmpeg import get_ffmpeg_exe
+    from services.metadata import probe
+    from services.video_processor import run_ffmpeg_progress
+    tmp = _tmp(dst)
+    meta = probe(str(src))
+    cmd = [get_ffmpeg_exe(), "-y", "-i", str(src), "-map", "0:v:0", "-map", "0:a:0?",
+           *enc.args, "-c:a", "copy", "-movflags", "+faststart", "-map_metadata", "0", "-f", "mp4", str(tmp)]
+    try:
+        run_ffmpeg_progress(cmd, meta.duration, None, cancel_event, encoder=enc.name)
+        out = probe(str(tmp))
+        if (tmp.stat().st_size >= src.stat().st_size or meta.duration_ms is None or out.duration_ms is None
+                or abs(out.duration_ms - meta.duration_ms) > DURATION_TOLERANCE_MS):
+            tmp.unlink(missing_ok=True)
+            return None
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+def _copy(src: Path, dst: Path) -> Path:
+    # Copy to a temp file, never a cross-device move: store.relocate renames it onto dst once complete
+    tmp = _tmp(dst)
+    try:
+        shutil.copy2(src, tmp)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+def _commit(h: str, src: Path, dst: Path, staged: Path, **columns) -> bool:
+    """Moves the blob row (and staged onto dst) in one transaction; the loser only drops its own temp file."""
+    try:
+        if store.relocate(h, src, dst, staged=staged, **columns):
+            _drop(src)
+            return True
+    finally:
+        _drop(staged)
+    return False
+
+def _drop(path: Path):
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass   # still open by the player (Windows); an orphan only costs space
+
+def archive_blob(h: str, src: str | Path, archive_dir: Path, codec: str = "copy", cancel_event=None) -> str | None:
+    """Moves one blob to cold storage. Returns the codec it was stored with, or None if it vanished meanwhile."""
+    src = Path(src)
+    if not src.exists():
+        return None
+    dst = archive_dir / h[:2] / f"{h}.mp4"
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    # A restored blob that was re-encoded before goes back as is: a second lossy pass only costs quality
+    row = query("SELECT archive_codec FROM blobs WHERE hash=?", (h,))
+    previous = row[0][0] if row else None
+    if previous in ARCHIVE_CODECS:
+        codec = "copy"
+    staged = _reencode(src, dst, ARCHIVE_CODECS[codec], cancel_event) if codec != "copy" else None
+    stored = codec if staged else previous if previous in ARCHIVE_CODECS else "copy"
+    staged = staged or _copy(src, dst)
+    now = datetime.datetime.now().isoformat(timespec='seconds')
+    return stored if _commit(h, src, dst, staged, tier=COLD, archived_at=now, archive_codec=stored) else None
+
+def restore(h: str) -> Path | None:
+    """Copies an archived blob back to the library folder and points its recordings there."""
+    row = query("SELECT path FROM blobs WHERE hash=? AND tier=?", (h, COLD))
+    if not row:
+        return None
+    src = Path(row[0][0])
+    dst = store.blob_path(h)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    staged = _copy(src, dst)
+    now = datetime.datetime.now().isoformat(timespec='seconds')
+    return dst if _commit(h, src, dst, staged, tier=HOT, restored_at=now) else None
+
+def is_archived(h: str | None) -> bool:
+    return bool(h) and bool(query("SELECT 1 FROM blobs WHERE hash=? AND tier=?", (h, COLD)))
+
+def run(progress_callback=None, cancel_event: threading.Event | None = None) -> dict:
+    """
+    One archive pass with the configured policy. progress_callback(done, total) after each
+    blob. Returns {"archived": n, "bytes_freed": n, "failed": n}; errors skip that blob.
+    """
+    days, folder, codec = settings()
+    summary = {"archived": 0, "bytes_freed": 0, "failed": 0}
+    if not days or folder is None or not _run_lock.acquire(blocking=False):
+        return summary
+    try:
+        todo = candidates(days)
+        for n, (h, path) in enumerate(todo, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            try:
+                size = Path(path).stat().st_size
+                if archive_blob(h, path, folder, codec, cancel_event):
+                    summary["archived"] += 1; summary["bytes_freed"] += size
+            except Exception as e:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                print(f"Archiving {path} failed: {e}")
+                summary["failed"] += 1
+            if progress_callback: progress_callback(n, len(todo))
+    finally:
+        _run_lock.release()
+    return summary
+
+def run_daily():
+    """Startup hook (background thread): one pass per day at most."""
+    try:
+        today = datetime.date.today().isoformat()
+        if load_config().get("archive_last_run") == today or not settings()[0]:
+            return
+        run()
+        config = load_config(); config["archive_last_run"] = today; save_config(config)
+    finally:
+        close_conn()
@@ -0,0 +1,107 @@
+# services/batch_import.py
+import csv
+import datetime
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+import core.paths as paths
+from services import jobs
+
+VIDEO_SUFFIXES = {".mp4", ".mov", ".avi", ".mkv", ".m4v"}
+# recordings columns a manifest or filename pattern can fill, in enqueue order
+FIELDS = ("battery_name", "battery_code", "log_id", "battery_no", "operator_name", "datetime", "remarks")
+FILE_COLUMNS = ("file", "filename", "video", "video_file")
+DEFAULT_PATTERN = "{battery_code}_{battery_no}"
+ALIASES = {"operator": "operator_name", "battery_number": "battery_no", "date": "datetime",
+           "date_time": "datetime", "log": "log_id", "notes": "remarks"}
+
+@dataclass
+class BatchItem:
+    path: Path
+    fields: dict = field(default_factory=dict)
+    error: str | None = None
+
+def _column(name: str) -> str:
+    # "Battery No." / "battery-no" / "Operator" -> battery_no / battery_no / operator_name
+    key = re.sub(r"[^a-z0-9]+", "_", name.strip().lower()).strip("_")
+    return ALIASES.get(key, key)
+
+def read_manifest(csv_path: str | Path) -> dict[str, dict]:
+    """CSV with a file/filename column plus any of FIELDS; returns {file name (lower case): fields}."""
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = {c: _column(c) for c in reader.fieldnames or []}
+        file_col = next((c for c, k in columns.items() if k in FILE_COLUMNS), None)
+        if file_col is None:
+            raise ValueError(f"{Path(csv_path).name}: needs a 'file' column naming each video")
+        manifest = {}
+        for row in reader:
+            name = (row.get(file_col) or "").strip()
+            if name:
+                manifest[Path(name).name.lower()] = fields_from({c: v for c, v in row.items() if c in columns})
+    return manifest
+
+def fields_from(row: dict) -> dict:
+    """Any {column: value} mapping (CSV row, sidecar JSON) -> the non-empty FIELDS it names."""
+    out = {}
+    for c, v in row.items():
+        key, value = _column(str(c)), str(v if v is not None else "").strip()
+        if key in FIELDS and value:
+            out[key] = value
+    return out
+
+def pattern_regex(pattern: str) -> re.Pattern:
+    """'{battery_code}_{battery_no}' -> regex matching a whole file stem with one group per field."""
+    parts = re.split(r"\{(\w+)\}", pattern)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            out.append(re.escape(part))
+        elif part not in FIELDS:
+            raise ValueError(f"Unknown field {{{part}}} in pattern; use {', '.join(FIELDS)}")
+        else:
+            out.append(f"(?P<{part}>.+?)")
+    return re.compile("".join(out) + r"$")
+
+def plan(folder: str | Path, manifest: dict | None = None, pattern: str | None = None,
+         defaults: dict | None = None) -> list[BatchItem]:
+    """
+    One item per video in folder. Fields come from defaults, then the filename
+    pattern, then the manifest row (later wins). datetime falls back to the file's mtime.
+    """
+    return plan_files(sorted(Path(folder).iterdir()), manifest, pattern, defaults)
+
+def plan_files(files, manifest: dict | None = None, pattern: str | None = None,
+               defaults: dict | None = None) -> list[BatchItem]:
+    """plan() for an explicit list of files; anything that is not a video file is skipped."""
+    regex = pattern_regex(pattern) if pattern else None
+    items = []
+    for path in map(Path, files):
+        if path.suffix.lower() not in VIDEO_SUFFIXES or not path.is_file():
+            continue
+        fields = {k: v for k, v in (defaults or {}).items() if v}
+        m = regex.match(path.stem) if regex else None
+        if m: fields.update({k: v.strip() for k, v in m.groupdict().items() if v.strip()})
+        row = (manifest or {}).get(path.name.lower())
+        if row: fields.update(row)
+        fields.setdefault("datetime", datetime.datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S"))
+        item = BatchItem(path, fields)
+        if not fields.get("battery_name"):
+            item.error = "Battery name missing"
+        elif regex and not m and not row:
+            item.error = "File name does not match the pattern"
+        items.append(item)
+    return items
+
+def enqueue(items: list[BatchItem]) -> list[tuple[BatchItem, int, int]]:
+    """Queues every valid item: all recordings and encode jobs inserted in one transaction."""
+    ok = [i for i in items if not i.error]
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    created = datetime.datetime.now().isoformat(timespec='seconds')
+    entries = []
+    for n, item in enumerate(ok):
+        f = item.fields
+        values = (*(f.get(k, "") for k in FIELDS), created)
+        dst = paths.get_videos_dir() / f"{ts}_{n:03d}_{item.path.stem}.mp4"
+        entries.append((values, str(item.path), str(dst), (f.get("battery_code", ""), f.get("battery_no", ""), f.get("operator_name", ""))))
+    return [(item, rec_id, job_id) for item, (rec_id, job_id) in zip(ok, jobs.enqueue_many(entries))]
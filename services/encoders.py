@@ -0,0 +1,138 @@
+# services/encoders.py
+import json
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from core.config_manager import get_app_data_dir, load_config
+
+@dataclass(frozen=True)
+class Encoder:
+    name: str
+    args: tuple[str, ...]               # codec args placed before the output path
+    input_args: tuple[str, ...] = ()    # global args placed before the first -i
+    filter_suffix: str = ""             # appended to the video filter chain
+
+    @property
+    def is_hardware(self) -> bool:
+        return self.name != "libx264"
+
+VAAPI_DEVICE = "/dev/dri/renderD128"
+
+# Preference order: first working hardware encoder wins, libx264 is the fallback.
+ENCODERS = {
+    "h264_nvenc": Encoder("h264_nvenc", ("-c:v", "h264_nvenc", "-preset", "p4", "-rc:v", "vbr", "-cq:v", "28")),
+    "h264_qsv": Encoder("h264_qsv", ("-c:v", "h264_qsv", "-preset", "veryfast", "-global_quality", "28")),
+    "h264_amf": Encoder("h264_amf", ("-c:v", "h264_amf", "-quality", "speed", "-rc", "cqp", "-qp_i", "28", "-qp_p", "28")),
+    "h264_vaapi": Encoder("h264_vaapi", ("-c:v", "h264_vaapi", "-qp", "28"),
+                          input_args=("-vaapi_device", VAAPI_DEVICE), filter_suffix="format=nv12,hwupload"),
+    "libx264": Encoder("libx264", ("-c:v", "libx264", "-preset", "veryfast", "-crf", "28",
+                                   "-threads", str(os.cpu_count() or 4))),
+}
+CPU_ENCODER = ENCODERS["libx264"]
+
+def _set_arg(args: tuple, flag: str, value: str) -> tuple:
+    if flag in args:
+        i = args.index(flag)
+        return (*args[:i + 1], value, *args[i + 2:])
+    return (*args, flag, value)
+
+def with_options(enc: Encoder, preset: str | None = None, threads: int | None = None) -> Encoder:
+    """A copy of enc with another -preset and/or -threads (benchmark sweeps). None keeps the default."""
+    args = enc.args
+    if preset is not None: args = _set_arg(args, "-preset", preset)
+    if threads is not None: args = _set_arg(args, "-threads", str(threads))
+    return replace(enc, args=args)
+
+# How a profile's speed ("fast" | "medium" | "slow") and CRF-like quality (lower is
+# better) map onto each encoder's own options
+SPEED_ARGS = {
+    "libx264": ("-preset", {"fast": "veryfast", "medium": "medium", "slow": "slow"}),
+    "h264_nvenc": ("-preset", {"fast": "p2", "medium": "p4", "slow": "p6"}),
+    "h264_qsv": ("-preset", {"fast": "veryfast", "medium": "medium", "slow": "slow"}),
+    "h264_amf": ("-quality", {"fast": "speed", "medium": "balanced", "slow": "quality"}),
+}
+QUALITY_ARGS = {"libx264": ("-crf",), "h264_nvenc": ("-cq:v",), "h264_qsv": ("-global_quality",),
+                "h264_amf": ("-qp_i", "-qp_p"), "h264_vaapi": ("-qp",)}
+
+def tuned(enc: Encoder, quality: int | None = None, speed: str | None = None) -> Encoder:
+    """A copy of enc at an encoding profile's quality and speed."""
+    args = enc.args
+    if quality is not None:
+        for flag in QUALITY_ARGS.get(enc.name, ()):
+            args = _set_arg(args, flag, str(quality))
+    if speed is not None and enc.name in SPEED_ARGS:
+        flag, values = SPEED_ARGS[enc.name]
+        args = _set_arg(args, flag, values.get(speed, values["medium"]))
+    return replace(enc, args=args)
+
+CACHE_FILE = get_app_data_dir() / "encoders.json"
+PROBE_TIMEOUT_S = 20
+
+_lock = threading.Lock()
+_memo: dict[str, list[str]] = {}
+
+def _cache_key(ffmpeg_exe: str) -> str:
+    st = Path(ffmpeg_exe).stat()
+    return f"{Path(ffmpeg_exe).resolve()}|{st.st_size}|{st.st_mtime_ns}"
+
+def _load_cache() -> dict:
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache: dict):
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(cache, indent=4))
+    except OSError:
+        pass  # probing again next run is only slower, never wrong
+
+def probe_encoder(ffmpeg_exe: str, enc: Encoder) -> bool:
+    """Tiny synthetic encode (a few frames of black) to prove the encoder really works here."""
+    vf = "format=yuv420p" + (f",{enc.filter_suffix}" if enc.filter_suffix else "")
+    cmd = [ffmpeg_exe, "-hide_banner", "-v", "error", *enc.input_args,
+           "-f", "lavfi", "-i", "color=c=black:s=256x144:r=25:d=0.2",
+           "-vf", vf, "-frames:v", "3", *enc.args, "-f", "null", "-"]
+    try:
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                             timeout=PROBE_TIMEOUT_S, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        return res.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+def available_encoders(ffmpeg_exe: str, refresh: bool = False) -> list[str]:
+    """
+    Working encoders for this ffmpeg binary, in preference order.
+    Probed once per binary (path + size + mtime) and persisted in encoders.json.
+    """
+    key = _cache_key(ffmpeg_exe)
+    with _lock:
+        if not refresh and key in _memo:
+            return list(_memo[key])
+        cache = _load_cache()
+        if refresh or key not in cache:
+            names = [n for n, e in ENCODERS.items() if not e.is_hardware or probe_encoder(ffmpeg_exe, e)]
+            cache[key] = names
+            _save_cache(cache)
+        _memo[key] = cache[key]
+        return list(_memo[key])
+
+def select_encoder(ffmpeg_exe: str) -> Encoder:
+    """Encoder for the next job: config "video_encoder" if it works here, else the best available."""
+    names = available_encoders(ffmpeg_exe)
+    wanted = load_config().get("video_encoder", "auto")
+    if wanted in names:
+        return ENCODERS[wanted]
+    return ENCODERS[names[0]] if names else CPU_ENCODER
+
+def forget(ffmpeg_exe: str):
+    """Drop cached probe results, e.g. after a probed encoder failed on a real job (driver change)."""
+    key = _cache_key(ffmpeg_exe)
+    with _lock:
+        _memo.pop(key, None)
+        cache = _load_cache()
+        if cache.pop(key, None) is not None:
+            _save_cache(cache)
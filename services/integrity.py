@@ -0,0 +1,143 @@
+# services/integrity.py
+import datetime
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from core.db import query, execute, transaction
+from services import store
+from services.metadata import probe
+
+OK, NO_VIDEO, MISSING, UNREADABLE, HASH_MISMATCH, CORRUPT = (
+    "ok", "no_video", "missing", "unreadable", "hash_mismatch", "corrupt")
+
+BAD = (MISSING, UNREADABLE, HASH_MISMATCH, CORRUPT)
+STAT_WORKERS = 16       # stat/open on a network share waits on latency, not CPU
+
+def check(video_path: str | None, video_hash: str | None = None, verify_hash: bool = False,
+          decode: bool = False) -> tuple[str, str]:
+    """
+    (status, detail) for one library video, cheapest test first: exists, header parses,
+    then optionally bytes still match the store hash and every frame decodes.
+    """
+    if not video_path:
+        return NO_VIDEO, ""
+    if not Path(video_path).exists():
+        return MISSING, str(video_path)
+    return _examine(video_path, video_hash, verify_hash, decode)
+
+def _examine(video_path: str, video_hash: str | None, verify_hash: bool, decode: bool) -> tuple[str, str]:
+    path = Path(video_path)
+    try:
+        meta = probe(path)
+    except Exception as e:
+        return UNREADABLE, str(e)
+    if verify_hash and video_hash and _hash_is_content(video_hash) and store.hash_file(path) != video_hash:
+        return HASH_MISMATCH, f"expected {video_hash}"
+    if decode:
+        error = decode_errors(path)
+        if error:
+            return CORRUPT, error
+    return OK, f"{meta.width}x{meta.height} {meta.codec} {meta.duration_ms or 0} ms"
+
+def scan(ids: list[int] | None = None, decode: bool = False, verify_hash: bool = False, force: bool = False,
+         workers: int | None = None, progress_callback=None, on_result=None,
+         cancel_event: threading.Event | None = None) -> dict:
+    """
+    Checks every recording's video in parallel and stores the outcome in recording_health.
+    A file whose path, size and mtime match the last scan keeps its status without being
+    opened again (unless force, or decode is asked for and it was never decoded).
+    progress_callback(done, total); on_result(recording_id, video_path, status, detail).
+    Returns counts per status plus "examined" (files actually opened).
+    """
+    sql = """
+        SELECT r.id, r.video_path, r.video_hash, h.path, h.size, h.mtime_ns, h.decoded, h.status, h.detail
+        FROM recordings r LEFT JOIN recording_health h ON h.recording_id = r.id
+    """
+    rows = query(sql + (f" WHERE r.id IN ({','.join('?' * len(ids))})" if ids else "") + " ORDER BY r.id", ids or ())
+
+    def one(row):
+        rec_id, video_path, video_hash, last_path, last_size, last_mtime, decoded, status, detail = row
+        if not video_path:
+            return rec_id, video_path, NO_VIDEO, "", None, None, 0, False
+        try:
+            st = os.stat(video_path)
+        except OSError:
+            return rec_id, video_path, MISSING, video_path, None, None, 0, False
+        unchanged = (last_path, last_size, last_mtime) == (video_path, st.st_size, st.st_mtime_ns)
+        # A hash mismatch on bytes that have not changed since stays a mismatch, whatever this pass tests
+        if not force and unchanged and (status == HASH_MISMATCH or (
+                status in (OK, UNREADABLE, CORRUPT) and not verify_hash and (decoded or not decode))):
+            return rec_id, video_path, status, detail, st.st_size, st.st_mtime_ns, decoded, False
+        status, detail = _examine(video_path, video_hash, verify_hash, decode)
+        return rec_id, video_path, status, detail, st.st_size, st.st_mtime_ns, int(decode), True
+
+    counts = {"examined": 0}
+    results = []
+    with ThreadPoolExecutor(workers or ((os.cpu_count() or 4) if decode else STAT_WORKERS)) as pool:
+        futures = [pool.submit(one, row) for row in rows]
+        for n, f in enumerate(as_completed(futures), start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                for other in futures: other.cancel()
+                break
+            rec_id, video_path, status, detail, size, mtime, decoded, examined = f.result()
+            counts[status] = counts.get(status, 0) + 1
+            counts["examined"] += examined
+            results.append((rec_id, status, detail, video_path, size, mtime, decoded))
+            if on_result: on_result(rec_id, video_path, status, detail)
+            if progress_callback: progress_callback(n, len(rows))
+    now = datetime.datetime.now().isoformat(timespec='seconds')
+    with transaction() as con:
+        con.executemany("""
+            INSERT INTO recording_health (recording_id, status, detail, path, size, mtime_ns, decoded, checked_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(recording_id) DO UPDATE SET status=excluded.status, detail=excluded.detail, path=excluded.path,
+                size=excluded.size, mtime_ns=excluded.mtime_ns, decoded=excluded.decoded, checked_at=excluded.checked_at
+        """, [(*r, now) for r in results])
+    return counts
+
+def scan_library():
+    """Startup hook (background thread): quick pass, so files gone since last time show up in the list."""
+    from core.db import close_conn
+    try:
+        scan()
+    except Exception as e:
+        print(f"Library check failed: {e}")
+    finally:
+        close_conn()
+
+def problems(ids: list[int]) -> dict[int, tuple[str, str, str]]:
+    """{recording_id: (status, detail, checked_at)} for the given recordings that failed their last scan."""
+    if not ids:
+        return {}
+    rows = query(f"""
+        SELECT recording_id, status, detail, checked_at FROM recording_health
+        WHERE recording_id IN ({','.join('?' * len(ids))}) AND status IN ({','.join('?' * len(BAD))})
+    """, (*ids, *BAD))
+    return {r[0]: tuple(r[1:]) for r in rows}
+
+def mark(recording_id: int, video_path: str, status: str, detail: str = ""):
+    """Records a problem found outside a scan (e.g. the player could not find the file)."""
+    execute("""
+        INSERT INTO recording_health (recording_id, status, detail, path, checked_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(recording_id) DO UPDATE SET status=excluded.status, detail=excluded.detail,
+            path=excluded.path, size=NULL, mtime_ns=NULL, decoded=0, checked_at=excluded.checked_at
+    """, (recording_id, status, detail, video_path, datetime.datetime.now().isoformat(timespec='seconds')))
+
+def _hash_is_content(video_hash: str) -> bool:
+    # Archived re-encodes keep the hash of the bytes they replaced (services.archive)
+    row = query("SELECT ifnull(archive_codec, 'copy') FROM blobs WHERE hash=?", (video_hash,))
+    return not row or row[0][0] == "copy"
+
+def decode_errors(path: str | Path) -> str:
+    """Decodes every frame (no output); returns ffmpeg's complaints, empty when clean."""
+    from imageio_ffmpeg import get_ffmpeg_exe
+    res = subprocess.run([get_ffmpeg_exe(), "-hide_banner", "-nostats", "-v", "error", "-i", str(path),
+                          "-map", "0", "-f", "null", "-"],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding="utf-8", errors="replace",
+                         creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    text = res.stderr.strip()
+    if res.returncode != 0 and not text:
+        text = f"ffmpeg exited with {res.returncode}"
+    return text[-500:]
@@ -0,0 +1,381 @@
+# services/jobs.py
+import datetime
+import json
+import os
+import socket
+import threading
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from core.config_manager import load_config
+from core.db import query, execute, transaction, close_conn
+from services import profiles, store
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+PROXY_SHARE = 0.8   # progress bar share of the master encode when a proxy follows
+ANALYSIS_SHARE = 0.1    # share of the idle-segment analysis pass, when it runs
+HEARTBEAT_SECONDS = 30
+LEASE_SECONDS = 120     # a running job without a heartbeat for this long was left by a dead process
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    state: str
+    recording_id: int | None
+    src_path: str
+    dst_path: str
+    payload: dict
+    error: str | None
+    attempts: int
+
+JOB_COLUMNS = "id,kind,state,recording_id,src_path,dst_path,payload,error,attempts"
+
+def _job(row) -> Job:
+    *head, payload, error, attempts = row
+    return Job(*head, json.loads(payload or "{}"), error, attempts)
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+# ---------------- queue operations ----------------
+def enqueue_encode(recording_values: tuple, src: str, dst: str, data: tuple) -> tuple[int, int]:
+    """
+    Inserts the recording (video_path left empty until the encode lands) and its
+    encode job in one transaction. recording_values are the INSERT columns of
+    record_new without video_path/duration_ms. Returns (recording_id, job_id).
+    """
+    return enqueue_many([(recording_values, src, dst, data)])[0]
+
+def enqueue_many(entries: list[tuple]) -> list[tuple[int, int]]:
+    """enqueue_encode for many (recording_values, src, dst, data) at once, all in one transaction."""
+    ids = []
+    now = _now()
+    with transaction() as con:
+        for recording_values, src, dst, data in entries:
+            rec_id = con.execute("""
+                INSERT INTO recordings (battery_name, battery_code, log_id, battery_no, operator_name,
+                                        datetime, remarks, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, recording_values).lastrowid
+            job_id = con.execute("""
+                INSERT INTO jobs (kind, state, recording_id, src_path, dst_path, payload, created_at)
+                VALUES ('encode', ?, ?, ?, ?, ?, ?)
+            """, (PENDING, rec_id, str(src), str(dst), json.dumps({"overlay": list(data)}), now)).lastrowid
+            ids.append((rec_id, job_id))
+    return ids
+
+def claim_next() -> Job | None:
+    """Atomically moves the oldest pending job to running and returns it."""
+    with transaction() as con:
+        row = con.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE state=? ORDER BY id LIMIT 1",
+                          (PENDING,)).fetchone()
+        if row is None:
+            return None
+        now = _now()
+        con.execute("UPDATE jobs SET state=?, started_at=?, owner=?, heartbeat=?, attempts=attempts+1, error=NULL "
+                    "WHERE id=?", (RUNNING, now, OWNER, now, row[0]))
+    job = _job(row)
+    job.state, job.attempts = RUNNING, job.attempts + 1
+    return job
+
+THROUGHPUT_COLUMNS = ("encoder", "fps", "speed", "bitrate_kbps", "media_seconds", "wall_seconds")
+
+def complete(job: Job, duration_ms: int | None, overlay_burned: bool = True, stats: dict | None = None,
+             video_path: str | None = None, video_hash: str | None = None):
+    """Raises EncodeCancelled (nothing written) if the job is no longer running, e.g. cancelled meanwhile."""
+    stats = stats or {}
+    with transaction() as con:
+        if con.execute(f"UPDATE jobs SET state=?, finished_at=?, {', '.join(c + '=?' for c in THROUGHPUT_COLUMNS)} "
+                       "WHERE id=? AND state=?",
+                       (DONE, _now(), *(stats.get(c) for c in THROUGHPUT_COLUMNS), job.id, RUNNING)).rowcount == 0:
+            from services.video_processor import EncodeCancelled
+            raise EncodeCancelled()
+        if job.recording_id is not None:
+            con.execute("UPDATE recordings SET video_path=?, video_hash=?, duration_ms=?, overlay_burned=? WHERE id=?",
+                        (str(video_path or job.dst_path), video_hash, duration_ms, int(overlay_burned), job.recording_id))
+
+def fail(job: Job, error: str):
+    execute("UPDATE jobs SET state=?, error=?, finished_at=? WHERE id=?", (FAILED, error, _now(), job.id))
+
+def cancelled(job_id: int, states: tuple = (PENDING, RUNNING)):
+    """Marks the job cancelled if it is in one of states and drops its recording, which never got a video."""
+    with transaction() as con:
+        row = con.execute(f"SELECT recording_id FROM jobs WHERE id=? AND state IN ({','.join('?' * len(states))})",
+                          (job_id, *states)).fetchone()
+        if row is None:
+            return False
+        con.execute("UPDATE jobs SET state=?, finished_at=? WHERE id=?", (CANCELLED, _now(), job_id))
+        if row[0] is not None:
+            con.execute("DELETE FROM recordings WHERE id=? AND ifnull(video_path,'')=''", (row[0],))
+    return True
+
+def retry(job_id: int):
+    execute("UPDATE jobs SET state=?, error=NULL, finished_at=NULL WHERE id=? AND state=?",
+            (PENDING, job_id, FAILED))
+
+def heartbeat():
+    """Renews the lease on every job this process is running."""
+    execute("UPDATE jobs SET heartbeat=? WHERE state=? AND owner=?", (_now(), RUNNING, OWNER))
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)     # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5               # access denied: exists, someone else's
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code)); kernel32.CloseHandle(handle)
+        return code.value == 259                              # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _dead_local_owners(con) -> list[str]:
+    """Owners of running jobs that were processes on this host and have exited (crash and restart)."""
+    host = OWNER.rsplit(":", 1)[0]
+    dead = []
+    for (owner,) in con.execute("SELECT DISTINCT owner FROM jobs WHERE state=? AND owner IS NOT NULL", (RUNNING,)):
+        owner_host, _, pid = owner.rpartition(":")
+        if owner != OWNER and owner_host == host and pid.isdigit() and not _pid_alive(int(pid)):
+            dead.append(owner)
+    return dead
+
+def requeue_interrupted(own: bool = False) -> int:
+    """
+    Jobs left running by a dead session (crash, app closed mid-encode) go back to pending:
+    right away if that process ran on this host and is gone, else once their lease has run
+    out; own=True also this process's (its pool has stopped). Jobs of another live process are kept.
+    """
+    stale = (datetime.datetime.now() - datetime.timedelta(seconds=LEASE_SECONDS)).isoformat(timespec='seconds')
+    with transaction() as con:
+        dead = _dead_local_owners(con)
+        return con.execute(f"""
+            UPDATE jobs SET state=?, started_at=NULL, owner=NULL, heartbeat=NULL
+            WHERE state=? AND (owner IS NULL OR owner=? OR ifnull(heartbeat, '') < ?
+                               OR owner IN ({','.join('?' * len(dead)) or 'NULL'}))
+        """, (PENDING, RUNNING, OWNER if own else None, stale, *dead)).rowcount
+
+def recent_jobs(limit: int = 20) -> list[Job]:
+    """Unfinished jobs first, then the most recently created."""
+    rows = query(f"""
+        SELECT {JOB_COLUMNS} FROM jobs
+        ORDER BY CASE state WHEN '{RUNNING}' THEN 0 WHEN '{PENDING}' THEN 1 ELSE 2 END, id DESC
+        LIMIT ?
+    """, (limit,))
+    return [_job(r) for r in rows]
+
+def job_for_recording(recording_id: int) -> Job | None:
+    row = query(f"SELECT {JOB_COLUMNS} FROM jobs WHERE recording_id=? ORDER BY id DESC LIMIT 1", (recording_id,))
+    return _job(row[0]) if row else None
+
+def encoder_throughput() -> list[tuple]:
+    """Measured speed per encoder over finished jobs: (encoder, jobs, avg fps, avg speed x, media hours per wall hour)."""
+    return query("""
+        SELECT encoder, COUNT(*), AVG(fps), AVG(speed), SUM(media_seconds) / SUM(wall_seconds)
+        FROM jobs WHERE state=? AND encoder IS NOT NULL AND wall_seconds > 0
+        GROUP BY encoder ORDER BY COUNT(*) DESC
+    """, (DONE,))
+
+# ---------------- execution ----------------
+def run_job(job: Job, progress_callback=None, cancel_event: threading.Event | None = None):
+    if job.kind != "encode":
+        raise ValueError(f"Unknown job kind: {job.kind}")
+    if not Path(job.src_path).exists():
+        raise FileNotFoundError(f"Source video no longer available: {job.src_path}")
+    from services import activity
+    from services.metadata import probe
+    from services.video_processor import ingest_video, will_stream_copy, needs_proxy, encode_proxy, EncodeCancelled
+    overlay = tuple(job.payload.get("overlay", ()))
+    source = probe(job.src_path)
+    profile = profiles.for_video(source.duration)
+    # Idle stretches: found on a tiny decode of the source, then cut out or kept as skip marks
+    mode, idle, timeline, base = activity.idle_mode(), [], None, 0.0
+    if mode != activity.OFF:
+        base = ANALYSIS_SHARE
+        def on_analysis(percent):
+            if progress_callback: progress_callback(int(percent * base), "")
+        scores = activity.frame_scores(job.src_path, source.duration, on_analysis, cancel_event)
+        idle, timeline = activity.idle_spans(scores), activity.per_second(scores)
+    cut = idle if mode == activity.CUT else None
+    def save_activity():
+        # A cut video's timeline no longer matches the source's; the player analyses it when first opened
+        if job.recording_id is not None and mode != activity.OFF:
+            activity.save(job.recording_id, [] if cut else idle, sum(b - a for a, b in cut or ()),
+                          None if cut else timeline)
+    # Same source bytes + same overlay/settings as an earlier job: reuse its output, skip the encode
+    key = store.ingest_key(store.hash_file(job.src_path), *overlay, load_config().get("ingest_mode", "auto"), profile.key,
+                           *((activity.CUT, idle) if cut else ()))
+    reused = store.reuse(key, lambda h, path: (complete(job, probe(path).duration_ms, bool(cut) or not will_stream_copy(job.src_path, profile),
+                                                        video_path=path, video_hash=h), save_activity()))
+    if reused:
+        if progress_callback: progress_callback(100, "0s")
+        return
+    Path(job.dst_path).parent.mkdir(parents=True, exist_ok=True)
+    proxy = profiles.get("preview") if profiles.proxy_enabled() else None
+    share = (PROXY_SHARE if proxy else 1.0) * (1 - base)   # of the progress bar spent on the master
+    stats = {}
+    def on_progress(percent, eta, **kw):
+        stats.update(kw)
+        if progress_callback: progress_callback(int(100 * base + percent * share), eta, **kw)
+    meta, burned = ingest_video(job.src_path, job.dst_path, overlay, on_progress, cancel_event, profile, cut)
+    proxy_tmp = None
+    if proxy and needs_proxy(meta, proxy):
+        proxy_tmp = Path(job.dst_path).with_suffix(".proxy.mp4")
+        def on_proxy_progress(percent, eta, **kw):
+            if progress_callback: progress_callback(int(100 * (base + share) + percent * (1 - base - share)), eta, **{**stats, **kw})
+        try:
+            encode_proxy(job.dst_path, str(proxy_tmp), proxy, on_proxy_progress, cancel_event)
+        except BaseException:
+            Path(job.dst_path).unlink(missing_ok=True)   # the job is all or nothing
+            raise
+    stored = []
+    def claim(h, path):
+        stored.append(h)
+        complete(job, meta.duration_ms, burned, stats, video_path=path, video_hash=h)
+        save_activity()
+        if proxy_tmp: store.put_proxy(h, proxy_tmp)
+    try:
+        store.put(job.dst_path, move=True, source_key=key, claim=claim)
+    except EncodeCancelled:
+        if stored: store.release(stored[0])    # cancelled while finishing: no recording points at the blob
+        raise
+    finally:
+        if proxy_tmp: proxy_tmp.unlink(missing_ok=True)
+
+def worker_count() -> int:
+    try:
+        return max(1, int(load_config().get("encode_workers", 1)))
+    except (TypeError, ValueError):
+        return 1
+
+class JobPool:
+    """
+    Worker threads draining the jobs table. Callbacks run on the worker threads:
+      on_progress(job_id, percent, eta, **stats)
+      on_state(job_id, state, message)
+    """
+    IDLE_POLL_S = 5.0
+
+    def __init__(self, workers: int | None = None, on_progress=None, on_state=None):
+        self.workers = workers or worker_count()
+        self.on_progress = on_progress
+        self.on_state = on_state
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._running: dict[int, threading.Event] = {}   # job_id -> cancel event
+        self._running_lock = threading.Lock()
+        self._live = 0      # workers not yet told to retire; a surplus one retires and decrements it
+        self._live_lock = threading.Lock()
+        self._spawned = 0
+
+    def start(self):
+        requeue_interrupted()
+        self._spawn()
+        threading.Thread(target=self._beat, name="encode-heartbeat", daemon=True).start()
+
+    def _beat(self):
+        # Keeps this process's jobs leased, and picks up those of a process that died meanwhile
+        try:
+            while not self._stop.wait(HEARTBEAT_SECONDS):
+                heartbeat()
+                if requeue_interrupted(): self.notify()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            close_conn()
+
+    def _spawn(self):
+        with self._live_lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while self._live < self.workers:
+                t = threading.Thread(target=self._loop, name=f"encode-worker-{self._spawned}", daemon=True)
+                self._live += 1; self._spawned += 1
+                t.start(); self._threads.append(t)
+
+    def _retire(self) -> bool:
+        """True (and no longer counted) if the calling worker is surplus after a resize."""
+        with self._live_lock:
+            if self._live > self.workers:
+                self._live -= 1
+                return True
+        return False
+
+    def resize(self, workers: int):
+        """Change concurrency on the fly; surplus workers exit after their current job."""
+        self.workers = max(1, workers)
+        self._spawn(); self.notify()
+
+    def notify(self):
+        """Wake idle workers (call after enqueueing)."""
+        with self._wake:
+            self._wake.notify_all()
+
+    def cancel(self, job_id: int):
+        """Cancels a queued job, or kills the encode of a running one (its worker reports CANCELLED)."""
+        # Under the lock workers claim with, so a job is either still pending or has its event
+        with self._running_lock:
+            event = self._running.get(job_id)
+            if event is None and not cancelled(job_id, (PENDING,)):
+                return
+        if event is not None:
+            event.set()
+        else:
+            self._emit_state(job_id, CANCELLED)
+
+    def stop(self, timeout: float | None = None):
+        # Running encodes are killed and go back to pending
+        self._stop.set(); self.notify()
+        with self._running_lock:
+            for event in self._running.values(): event.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads.clear()
+        requeue_interrupted(own=True)
+
+    def _emit_state(self, job_id, state, message=""):
+        if self.on_state: self.on_state(job_id, state, message)
+
+    def _loop(self):
+        from services.video_processor import EncodeCancelled  # worker thread: keeps encoding imports off startup
+        retired = False
+        try:
+            while not self._stop.is_set() and not (retired := self._retire()):
+                event = threading.Event()
+                with self._running_lock:
+                    job = claim_next()
+                    if job is not None:
+                        self._running[job.id] = event
+                if job is None:
+                    # Polling as well covers jobs queued by another process
+                    with self._wake:
+                        self._wake.wait(self.IDLE_POLL_S)
+                    continue
+                self._emit_state(job.id, RUNNING)
+                cb = (lambda p, eta, **kw: self.on_progress(job.id, p, eta, **kw)) if self.on_progress else None
+                try:
+                    run_job(job, cb, event)
+                except EncodeCancelled:
+                    if not self._stop.is_set():
+                        cancelled(job.id)
+                        self._emit_state(job.id, CANCELLED)
+                except Exception as e:
+                    traceback.print_exc()
+                    fail(job, str(e))
+                    self._emit_state(job.id, FAILED, str(e))
+                else:
+                    self._emit_state(job.id, DONE)
+                finally:
+                    with self._running_lock:
+                        self._running.pop(job.id, None)
+        finally:
+            if not retired:
+                with self._live_lock: self._live -= 1
+            close_conn()
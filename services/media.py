@@ -1,14 +1,13 @@
 # services/media.py
-import shutil, datetime
+import datetime
 from pathlib import Path
 import core.paths as paths
 from core.settings import get_snapshot_dir
 
 def copy_video_into_library(src: Path) -> Path:
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    dst = paths.get_videos_dir() / f"{ts}_{src.name}"
-    shutil.copy2(src, dst)
-    return dst
+    # Content-addressed: copying the same file twice stores it once
+    from services import store
+    return store.put(src, move=False)[1]
 
 def _snapshot_base_dir() -> Path:
     # operator-chosen dir (QSettings) or fallback to app snapshots
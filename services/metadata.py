@@ -0,0 +1,213 @@
+# services/metadata.py
+import math
+import os
+import re
+import struct
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+@dataclass(frozen=True)
+class VideoMetadata:
+    width: int              # coded size of the video stream
+    height: int
+    duration: float         # seconds
+    fps: float
+    codec: str              # ffmpeg codec name: h264, hevc, mpeg4, ...
+    rotation: int = 0       # clockwise degrees a player applies: 0/90/180/270
+    bitrate: int = 0        # overall bits per second
+    has_audio: bool = False
+
+    @property
+    def duration_ms(self) -> int:
+        return int(round(self.duration * 1000))
+
+    @property
+    def display_size(self) -> tuple[int, int]:
+        """Frame size after rotation, i.e. what ffmpeg filters see (autorotate is on)."""
+        return (self.height, self.width) if self.rotation in (90, 270) else (self.width, self.height)
+
+# ---------------- MP4 / MOV box parser ----------------
+# Reads only the moov box, so it costs a few small reads even for multi-GB files.
+MP4_SUFFIXES = {".mp4", ".mov", ".m4v", ".3gp"}
+SAMPLE_CODECS = {
+    b"avc1": "h264", b"avc3": "h264", b"hvc1": "hevc", b"hev1": "hevc", b"mp4v": "mpeg4",
+    b"av01": "av1", b"vp09": "vp9", b"mjpa": "mjpeg", b"jpeg": "mjpeg", b"apcn": "prores",
+    b"apch": "prores", b"apcs": "prores", b"apco": "prores", b"ap4h": "prores",
+}
+CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+def _boxes(buf: bytes, start: int = 0, end: int | None = None):
+    end = len(buf) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", buf, pos + 8)[0]; header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, min(pos + size, end)
+        pos += size
+
+def _read_moov(f) -> bytes | None:
+    f.seek(0, os.SEEK_END); file_size = f.tell(); pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        head = f.read(16)
+        size, kind = struct.unpack_from(">I4s", head)
+        if size == 1:
+            size = struct.unpack_from(">Q", head, 8)[0]
+        elif size == 0:
+            size = file_size - pos
+        if size < 8:
+            return None
+        if kind == b"moov":
+            f.seek(pos)
+            return f.read(size)
+        pos += size
+    return None
+
+def _parse_trak(buf, start, end) -> dict:
+    t = {}
+    for kind, s, e in _boxes(buf, start, end):
+        if kind == b"tkhd":
+            # display matrix (16.16 fixed point) follows the fixed-size header fields
+            a, b = struct.unpack_from(">ii", buf, s + (52 if buf[s] == 1 else 40))
+            t["rotation"] = int(round(math.degrees(math.atan2(b, a)))) % 360
+        elif kind == b"mdhd":
+            version = buf[s]
+            if version == 1:
+                timescale, duration = struct.unpack_from(">IQ", buf, s + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", buf, s + 12)
+            t["timescale"], t["duration"] = timescale, duration
+        elif kind == b"hdlr":
+            t["handler"] = buf[s + 8:s + 12]
+        elif kind == b"stsd":
+            # first sample entry: size(4) type(4) ... visual entries carry width/height at +32
+            entry = s + 8
+            t["format"] = buf[entry + 4:entry + 8]
+            if entry + 36 <= e:
+                t["width"], t["height"] = struct.unpack_from(">HH", buf, entry + 32)
+        elif kind == b"stts":
+            count = struct.unpack_from(">I", buf, s + 4)[0]
+            t["samples"] = sum(struct.unpack_from(">I", buf, s + 8 + i * 8)[0] for i in range(count))
+        elif kind in CONTAINERS:
+            t.update(_parse_trak(buf, s, e))
+    return t
+
+def _probe_mp4(path: Path) -> VideoMetadata | None:
+    with open(path, "rb") as f:
+        moov = _read_moov(f)
+        file_size = os.fstat(f.fileno()).st_size
+    if not moov:
+        return None
+    movie_duration = 0.0
+    tracks = []
+    for kind, s, e in _boxes(moov, 8):
+        if kind == b"mvhd":
+            version = moov[s]
+            if version == 1:
+                timescale, duration = struct.unpack_from(">IQ", moov, s + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", moov, s + 12)
+            movie_duration = duration / timescale if timescale else 0.0
+        elif kind == b"trak":
+            tracks.append(_parse_trak(moov, s, e))
+    video = next((t for t in tracks if t.get("handler") == b"vide" and "width" in t), None)
+    if video is None:
+        return None
+    track_duration = video["duration"] / video["timescale"] if video.get("timescale") else 0.0
+    duration = movie_duration or track_duration
+    fps = video.get("samples", 0) / track_duration if track_duration else 0.0
+    return VideoMetadata(
+        width=video["width"], height=video["height"], duration=duration,
+        fps=round(fps, 3), codec=SAMPLE_CODECS.get(video.get("format"), video.get("format", b"").decode("latin-1").strip()),
+        rotation=video.get("rotation", 0),
+        bitrate=int(file_size * 8 / duration) if duration else 0,
+        has_audio=any(t.get("handler") == b"soun" for t in tracks),
+    )
+
+# ---------------- ffmpeg fallback (AVI, MKV, odd MP4s) ----------------
+def _probe_ffmpeg(path: Path) -> VideoMetadata:
+    from imageio_ffmpeg import get_ffmpeg_exe
+    # Without an output ffmpeg prints the stream info and exits; nothing is decoded
+    res = subprocess.run([get_ffmpeg_exe(), "-hide_banner", "-i", str(path)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding="utf-8", errors="replace",
+                         creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    info = res.stderr
+    video = re.search(r"Stream #\S+.*?: Video: (\w+)[^\n]*?, (\d{2,5})x(\d{2,5})[^\n]*", info)
+    if not video:
+        raise ValueError(f"No video stream found in {path}")
+    duration = 0.0
+    m = re.search(r"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)", info)
+    if m:
+        duration = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+    fps = 0.0
+    m = re.search(r"([\d.]+)(k?) (?:fps|tbr)", video.group(0))
+    if m:
+        fps = float(m.group(1)) * (1000 if m.group(2) else 1)
+    bitrate = 0
+    m = re.search(r"bitrate: (\d+) kb/s", info)
+    if m:
+        bitrate = int(m.group(1)) * 1000
+    rotation = 0
+    m = re.search(r"displaymatrix: rotation of (-?[\d.]+) degrees", info)
+    if m:
+        rotation = int(round(-float(m.group(1)))) % 360   # displaymatrix is counter-clockwise
+    return VideoMetadata(
+        width=int(video.group(2)), height=int(video.group(3)), duration=duration,
+        fps=round(fps, 3), codec=video.group(1), rotation=rotation, bitrate=bitrate,
+        has_audio=bool(re.search(r"Stream #\S+.*?: Audio:", info)),
+    )
+
+# ---------------- cached entry point ----------------
+CACHE_SIZE = 512
+_cache: "OrderedDict[tuple, VideoMetadata]" = OrderedDict()
+_lock = threading.Lock()
+
+def probe(path: str | Path) -> VideoMetadata:
+    """
+    Stream info for a video file. Parses the MP4/MOV header directly when it can,
+    otherwise asks ffmpeg once. Results are cached by (path, mtime, size).
+    """
+    path = Path(path)
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    meta = None
+    if path.suffix.lower() in MP4_SUFFIXES:
+        try:
+            meta = _probe_mp4(path)
+        except (struct.error, IndexError, ValueError):
+            meta = None
+    if meta is None:
+        meta = _probe_ffmpeg(path)
+    with _lock:
+        _cache[key] = meta
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return meta
+
+def backfill_durations():
+    """Fill duration_ms for recordings saved before it was recorded. Safe to run in a background thread."""
+    from core.db import query, execute, close_conn
+    try:
+        for rec_id, video_path in query("SELECT id, video_path FROM recordings WHERE duration_ms IS NULL"):
+            if not video_path or not Path(video_path).exists():
+                continue
+            try:
+                duration_ms = probe(video_path).duration_ms
+            except (OSError, ValueError):
+                continue
+            execute("UPDATE recordings SET duration_ms=? WHERE id=?", (duration_ms, rec_id))
+    finally:
+        close_conn()
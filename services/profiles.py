@@ -0,0 +1,44 @@
+# services/profiles.py
+from dataclasses import dataclass, replace, fields
+from core.config_manager import load_config
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    max_width: int      # wider sources are scaled down, never up
+    quality: int        # CRF-like, lower is better (see encoders.QUALITY_ARGS)
+    speed: str          # "fast" | "medium" | "slow"
+    audio_kbps: int = 128
+
+    @property
+    def key(self) -> str:
+        """Everything that changes the output, for store.ingest_key."""
+        return f"{self.name}:{self.max_width}:{self.quality}:{self.speed}:{self.audio_kbps}"
+
+# Long assembly recordings are archived small; short ones (close-ups) keep detail.
+# preview is the proxy: small, quick to decode, played in the list for scrubbing.
+PROFILES = {
+    "archive": Profile("archive", 1280, 30, "medium", 96),
+    "review": Profile("review", 1920, 23, "fast", 128),
+    "preview": Profile("preview", 640, 32, "fast", 64),
+}
+ARCHIVE_AFTER_MIN = 15      # "auto" picks archive for recordings at least this long
+
+def get(name: str) -> Profile:
+    """A profile with any config "encode_profiles": {name: {field: value}} overrides applied."""
+    base = PROFILES.get(name) or PROFILES["review"]
+    overrides = (load_config().get("encode_profiles") or {}).get(base.name) or {}
+    known = {f.name for f in fields(Profile)} - {"name"}
+    return replace(base, **{k: v for k, v in overrides.items() if k in known})
+
+def for_video(duration_s: float | None) -> Profile:
+    """config "encode_profile": "auto" (default) picks archive or review by length, else that profile."""
+    config = load_config()
+    name = config.get("encode_profile", "auto")
+    if name == "auto":
+        limit = float(config.get("archive_after_min", ARCHIVE_AFTER_MIN)) * 60
+        name = "archive" if (duration_s or 0) >= limit else "review"
+    return get(name)
+
+def proxy_enabled() -> bool:
+    return bool(load_config().get("make_proxy", False))
@@ -0,0 +1,99 @@
+# services/search.py
+import re
+from dataclasses import dataclass
+from core.db import query
+
+RECORDING_COLUMNS = ("id,battery_name,battery_code,log_id,battery_no,operator_name,"
+                     "datetime,remarks,video_path,duration_ms,created_at,updated_at,overlay_burned,video_hash")
+
+# FTS column order: battery_name, battery_code, log_id, battery_no, operator_name, remarks.
+# Identifiers weigh more than free-text remarks when ranking.
+BM25_WEIGHTS = (4.0, 8.0, 8.0, 6.0, 3.0, 1.0)
+
+# Sort keys by column. NULLs are folded to a sentinel so (key, id) keyset
+# comparisons never drop rows. created_at/datetime keys are indexed (core.db).
+SORT_KEYS = {
+    "id": "r.id",
+    "battery_name": "ifnull(lower(r.battery_name),'')",
+    "battery_code": "ifnull(lower(r.battery_code),'')",
+    "log_id": "ifnull(lower(r.log_id),'')",
+    "battery_no": "ifnull(lower(r.battery_no),'')",
+    "operator_name": "ifnull(lower(r.operator_name),'')",
+    "datetime": "ifnull(r.datetime,'')",
+    "remarks": "ifnull(lower(r.remarks),'')",
+    "video_path": "ifnull(r.video_path,'')",
+    "duration_ms": "ifnull(r.duration_ms,-1)",
+    "created_at": "ifnull(r.created_at,'')",
+}
+
+PAGE_SIZE = 200
+
+@dataclass(frozen=True)
+class RecordingQuery:
+    """What the Recordings list shows: global search + quick filter + sort."""
+    search: str = ""
+    filter: str = ""
+    filter_column: str | None = None    # FTS column the quick filter applies to; None = all
+    sort: str | None = None             # SORT_KEYS name; None = best match / newest first
+    descending: bool = True
+
+def match_expression(text: str, column: str | None = None) -> str | None:
+    """
+    Turns free text into an FTS5 MATCH expression: every word becomes a quoted
+    prefix term ("p"* "2025"*), all of which must match. Returns None when the
+    text has nothing searchable. `column` restricts the match to one FTS column.
+    """
+    tokens = re.findall(r"\w+", text.lower())
+    if not tokens:
+        return None
+    expr = " ".join(f'"{t}"*' for t in tokens)
+    return f"{column} : ({expr})" if column else expr
+
+def bm25_rank() -> str:
+    return f"bm25(recordings_fts, {', '.join(map(str, BM25_WEIGHTS))})"
+
+def _match(q: RecordingQuery) -> str | None:
+    parts = [e for e in (match_expression(q.search),
+                         match_expression(q.filter, q.filter_column)) if e]
+    return " AND ".join(f"({p})" for p in parts) or None
+
+def fetch_page(q: RecordingQuery, after: tuple | None = None, limit: int | None = PAGE_SIZE):
+    """
+    One window of recordings for `q` using keyset pagination on (sort key, id).
+    Returns (rows, cursor); pass cursor back as `after` for the next window.
+    cursor is None once the result set is exhausted.
+    """
+    expr = _match(q)
+    cols = ",".join(f"r.{c}" for c in RECORDING_COLUMNS.split(","))
+    if q.sort:
+        key, desc = SORT_KEYS[q.sort], q.descending
+    elif expr:
+        key, desc = f"-{bm25_rank()}", True     # best match first
+    else:
+        key, desc = SORT_KEYS["created_at"], True
+
+    where, params = [], []
+    if expr:
+        source = "recordings_fts JOIN recordings r ON r.id = recordings_fts.rowid"
+        where.append("recordings_fts MATCH ?"); params.append(expr)
+    else:
+        source = "recordings r"
+    if after is not None:
+        # The plain bound lets SQLite seek the expression index; the row value breaks ties
+        op = "<" if desc else ">"
+        where.append(f"{key} {op}= ? AND ({key}, r.id) {op} (?, ?)"); params.extend((after[0], *after))
+    direction = "DESC" if desc else "ASC"
+    sql = f"SELECT {cols}, {key} FROM {source}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {key} {direction}, r.id {direction}"
+    if limit:
+        sql += " LIMIT ?"; params.append(limit)
+
+    rows = query(sql, params)
+    cursor = (rows[-1][-1], rows[-1][0]) if rows and limit and len(rows) == limit else None
+    return [r[:-1] for r in rows], cursor
+
+def search_recordings(text: str, column: str | None = None):
+    """All recording rows matching `text`, best match first (newest first on ties)."""
+    return fetch_page(RecordingQuery(filter=text, filter_column=column), limit=None)[0]
@@ -0,0 +1,56 @@
+# services/snapshots.py
+import math
+import subprocess
+from pathlib import Path
+from services.metadata import probe
+
+# Frames come straight from the file at native resolution (rotation applied),
+# not from the video widget, so they are never black or covered by UI.
+
+def frame_time(video_path: str, position_ms: int) -> float:
+    """
+    Start time of the frame a player shows at position_ms. ffmpeg's accurate seek
+    returns the first frame at or after the target, so snap back to the frame start.
+    """
+    t = max(0, position_ms) / 1000
+    fps = probe(video_path).fps
+    return math.floor(t * fps + 1e-6) / fps if fps else t
+
+def _run(args: list):
+    from imageio_ffmpeg import get_ffmpeg_exe
+    res = subprocess.run([get_ffmpeg_exe(), "-hide_banner", "-v", "error", "-y", *args],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding="utf-8", errors="replace",
+                         creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    if res.returncode != 0:
+        raise Exception(f"FFmpeg failed: {res.stderr.strip()[-500:]}")
+
+def extract_frame(video_path: str, position_ms: int, out: Path) -> Path:
+    """Decodes the single frame shown at position_ms into out (PNG)."""
+    # -ss before -i seeks to the previous keyframe, then decodes and drops up to the exact time
+    _run(["-ss", f"{frame_time(video_path, position_ms):.6f}", "-i", str(video_path),
+          "-an", "-sn", "-frames:v", "1", str(out)])
+    if not out.exists():
+        raise Exception("No frame at this position")
+    return out
+
+def extract_burst(video_path: str, position_ms: int, count: int, out: Path) -> list[Path]:
+    """
+    count consecutive frames centred on position_ms, decoded in one pass.
+    Files are named out.stem_01.png, out.stem_02.png, ...
+    """
+    if count <= 1:
+        return [extract_frame(video_path, position_ms, out)]
+    fps = probe(video_path).fps or 25.0
+    start = max(0.0, frame_time(video_path, position_ms) - (count // 2) / fps)
+    pattern = out.with_name(f"{out.stem}_%02d{out.suffix}")
+    _run(["-ss", f"{start:.6f}", "-i", str(video_path), "-an", "-sn", "-frames:v", str(count), str(pattern)])
+    frames = [out.with_name(f"{out.stem}_{i:02d}{out.suffix}") for i in range(1, count + 1)]
+    return [f for f in frames if f.exists()]
+
+def export_snapshots(items: list[tuple[str, int, Path]], count: int = 1) -> list[Path]:
+    """Batch export: (video_path, position_ms, out) per snapshot, count frames each."""
+    saved = []
+    for video_path, position_ms, out in items:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        saved.extend(extract_burst(video_path, position_ms, count, out))
+    return saved
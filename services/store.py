@@ -0,0 +1,137 @@
+# services/store.py
+import datetime
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+import core.paths as paths
+from core.db import query, execute, transaction, close_conn
+
+# Library videos live at videos/<h[:2]>/<h>.mp4, keyed by a streaming blake2b of
+# their bytes. blobs.refcount counts recordings.video_hash references (DB triggers),
+# so identical uploads share one file and the last delete reclaims it.
+CHUNK_SIZE = 1024 * 1024
+DIGEST_SIZE = 16    # 128-bit digest, 32 hex chars
+
+_lock = threading.Lock()   # put() and release() are exclusive within the process
+
+def hash_file(path: str | Path) -> str:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    buf = bytearray(CHUNK_SIZE); view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            h.update(view[:n])
+    return h.hexdigest()
+
+def ingest_key(source_hash: str, *variant) -> str:
+    """Identifies "this source ingested with these settings", to reuse an earlier result."""
+    return hashlib.blake2b("|".join([source_hash, *map(str, variant)]).encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+def blob_path(h: str, suffix: str = ".mp4") -> Path:
+    return paths.get_videos_dir() / h[:2] / f"{h}{suffix}"
+
+def proxy_path(h: str) -> Path:
+    """Playback proxy of a blob (services.profiles "preview"); lives and dies with the blob."""
+    return blob_path(h, ".proxy.mp4")
+
+def put_proxy(h: str, src: str | Path) -> Path:
+    """Moves a freshly encoded proxy next to its blob; an existing proxy wins and src is dropped."""
+    dst = proxy_path(h)
+    if dst.exists():
+        Path(src).unlink(missing_ok=True)
+    else:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(src, dst)
+    return dst
+
+def reuse(key: str, claim) -> bool:
+    """If the output of an earlier ingest with this key is still stored, claim(hash, path) it and return True."""
+    with _lock:
+        row = query("SELECT hash, path FROM blobs WHERE source_key=? LIMIT 1", (key,))
+        if not row or not Path(row[0][1]).exists():
+            return False
+        claim(row[0][0], Path(row[0][1]))
+    return True
+
+def put(src: str | Path, move: bool = True, source_key: str | None = None, claim=None) -> tuple[str, Path]:
+    """
+    Adds a file to the store and returns (hash, stored path). If identical bytes are
+    already stored the existing file is reused (and a moved src is dropped).
+    The blob starts unreferenced: claim(hash, path), called under the store lock,
+    should point a recording at it so a concurrent release() cannot reclaim it first.
+    """
+    src = Path(src)
+    h = hash_file(src)
+    with _lock:
+        row = query("SELECT path FROM blobs WHERE hash=?", (h,))
+        dst = Path(row[0][0]) if row else blob_path(h, src.suffix.lower() or ".mp4")
+        if row and dst.exists():
+            if move and src.resolve() != dst.resolve():
+                src.unlink()
+        else:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if move: shutil.move(src, dst)
+            else: shutil.copy2(src, dst)
+        execute("""
+            INSERT INTO blobs (hash, path, size, source_key, created_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(hash) DO UPDATE SET path=excluded.path, source_key=ifnull(blobs.source_key, excluded.source_key)
+        """, (h, str(dst), dst.stat().st_size, source_key, datetime.datetime.now().isoformat(timespec='seconds')))
+        if claim: claim(h, dst)
+    return h, dst
+
+def relocate(h: str, old_path: str | Path, new_path: str | Path, staged: str | Path | None = None,
+             **columns) -> bool:
+    """
+    Points a blob (and every recording using it) at new_path in one transaction, e.g.
+    after services.archive copied it to another tier. A staged file is renamed onto
+    new_path inside that transaction, so new_path is only ever replaced by whoever wins
+    the row. Extra blobs columns go in `columns`. False if the blob was released or
+    moved meanwhile; the caller cleans up (staged is left where it is).
+    """
+    sets = "".join(f", {c}=?" for c in columns)
+    with _lock:
+        with transaction() as con:
+            if con.execute(f"UPDATE blobs SET path=?{sets} WHERE hash=? AND path=?",
+                           (str(new_path), *columns.values(), h, str(old_path))).rowcount == 0:
+                return False
+            con.execute("UPDATE recordings SET video_path=? WHERE video_hash=?", (str(new_path), h))
+            if staged is not None:
+                os.replace(staged, new_path)    # raising rolls the row back
+    return True
+
+def release(h: str | None) -> bool:
+    """Deletes the blob file once no recording references it. Returns True if space was reclaimed."""
+    if not h:
+        return False
+    with _lock:
+        with transaction() as con:
+            row = con.execute("SELECT path FROM blobs WHERE hash=? AND refcount<=0", (h,)).fetchone()
+            if row is None:
+                return False
+            con.execute("DELETE FROM blobs WHERE hash=?", (h,))
+        try:
+            proxy_path(h).unlink(missing_ok=True)
+            Path(row[0]).unlink(missing_ok=True)
+        except OSError:
+            return False   # still open elsewhere (Windows); the orphan is harmless
+    return True
+
+def adopt_library():
+    """
+    Moves videos saved before the store existed (timestamp-named files in videos/)
+    into it, collapsing byte-identical copies. Safe to run in a background thread.
+    """
+    videos_dir = paths.get_videos_dir().resolve()
+    try:
+        for rec_id, video_path in query("SELECT id, video_path FROM recordings WHERE video_hash IS NULL AND ifnull(video_path,'')!=''"):
+            src = Path(video_path)
+            if not src.exists() or videos_dir not in src.resolve().parents:
+                continue   # external files stay where the user keeps them
+            try:
+                put(src, move=True, claim=lambda h, p, rec_id=rec_id: execute(
+                    "UPDATE recordings SET video_path=?, video_hash=? WHERE id=?", (str(p), h, rec_id)))
+            except OSError:
+                continue   # locked by another process; retried next start
+    finally:
+        close_conn()
@@ -0,0 +1,67 @@
+# services/thumbnails.py
+import hashlib
+import os
+import subprocess
+from pathlib import Path
+import core.paths as paths
+
+# Poster frames (and optional sprite strips) cached on disk under thumbnails/<k[:2]>/,
+# keyed by the store hash of the video, so each video is decoded once, ever.
+THUMB_WIDTH = 160
+SPRITE_TILES = 10
+SPRITE_TILE_WIDTH = 120
+POSTER_AT_S = 3.0           # skip black lead-in frames, but stay near the start
+
+def cache_key(video_path: str, video_hash: str | None = None) -> str:
+    """The store hash when there is one, else path + size + mtime (files outside the store)."""
+    if video_hash:
+        return video_hash
+    st = Path(video_path).stat()
+    return hashlib.blake2b(f"{video_path}|{st.st_size}|{st.st_mtime_ns}".encode(), digest_size=16).hexdigest()
+
+def poster_path(key: str) -> Path:
+    return paths.get_thumb_dir() / key[:2] / f"{key}.jpg"
+
+def sprite_path(key: str) -> Path:
+    return paths.get_thumb_dir() / key[:2] / f"{key}_sprite.jpg"
+
+def _ffmpeg(args: list, out: Path) -> bool:
+    from imageio_ffmpeg import get_ffmpeg_exe
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f"{out.stem}.{os.getpid()}.tmp.jpg")
+    res = subprocess.run([get_ffmpeg_exe(), "-hide_banner", "-v", "error", "-y", *args, str(tmp)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    if res.returncode != 0 or not tmp.exists() or tmp.stat().st_size == 0:
+        tmp.unlink(missing_ok=True)
+        return False
+    os.replace(tmp, out)    # readers never see a half-written JPEG
+    return True
+
+def extract_poster(video_path: str, out: Path, duration_s: float | None = None) -> bool:
+    at = min(POSTER_AT_S, duration_s / 2) if duration_s else 0.0
+    args = ["-an", "-sn", "-frames:v", "1", "-vf", f"scale={THUMB_WIDTH}:-2", "-q:v", "5"]
+    # Input-side seek jumps to the nearest keyframe instead of decoding up to it
+    return (_ffmpeg(["-ss", f"{at:.2f}", "-i", video_path, *args], out)
+            or (at > 0 and _ffmpeg(["-i", video_path, *args], out)))
+
+def extract_sprite(video_path: str, out: Path, duration_s: float) -> bool:
+    """SPRITE_TILES frames spread over the video in one row; keyframes only, so no full decode."""
+    rate = SPRITE_TILES / max(duration_s, 0.1)
+    return _ffmpeg(["-skip_frame", "nokey", "-i", video_path, "-an", "-sn", "-frames:v", "1",
+                    "-vf", f"fps={rate:.6f},scale={SPRITE_TILE_WIDTH}:-2,tile={SPRITE_TILES}x1", "-q:v", "5"], out)
+
+def ensure_poster(video_path: str, video_hash: str | None = None, duration_s: float | None = None) -> Path | None:
+    """Cached poster for a video, extracting it on a miss. Returns None if ffmpeg cannot read the file."""
+    out = poster_path(cache_key(video_path, video_hash))
+    if out.exists() or extract_poster(video_path, out, duration_s):
+        return out
+    return None
+
+def ensure_sprite(video_path: str, video_hash: str | None = None, duration_s: float | None = None) -> Path | None:
+    if not duration_s:
+        return None
+    out = sprite_path(cache_key(video_path, video_hash))
+    if out.exists() or extract_sprite(video_path, out, duration_s):
+        return out
+    return None
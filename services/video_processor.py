@@ -1,187 +1,372 @@
+import functools
 import os
 from pathlib import Path
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-from moviepy import VideoFileClip, ImageClip, CompositeVideoClip
 
-def create_overlay_image(size, data):
-    """
-    Creates a transparent image with the text overlay.
-    data: tuple of (battery_code, battery_no, operator_name)
-    """
-    w, h = size
-    img = Image.new('RGBA', size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Try to load a nice font, fallback to default
-    try:
-        font = ImageFont.truetype("arial.ttf", 24)
-        bold_font = ImageFont.truetype("arialbd.ttf", 24)
-    except IOError:
-        font = ImageFont.load_default()
-        bold_font = font
-
-    lines = [
+def overlay_lines(data):
+    """Overlay text for (battery_code, battery_no, operator_name); shared by the encoder and the player."""
+    return [
         f"Battery code : {data[0]}",
         f"Battery Number : {data[1]}",
         f"Operator Name : {data[2]}"
     ]
-    
-    # Bottom left position
-    # 20px padding from bottom/left
-    line_height = 30
-    start_y = h - (len(lines) * line_height) - 20
-    x = 20
-    
+
+OVERLAY_MARGIN = 20
+OVERLAY_LINE_HEIGHT = 30
+OVERLAY_FONT_SIZE = 24
+
+@functools.lru_cache(maxsize=1)
+def _overlay_font():
+    from PIL import ImageFont  # only encodes need PIL; keeps it off the startup path
+    # Try to load a nice font, fallback to default
+    try:
+        return ImageFont.truetype("arialbd.ttf", OVERLAY_FONT_SIZE), "arialbd.ttf"
+    except IOError:
+        return ImageFont.load_default(), "default"
+
+def create_overlay_image(data):
+    """
+    Creates a transparent image holding just the text box (not a full frame);
+    the filter graph places it bottom-left with overlay=x:y.
+    data: tuple of (battery_code, battery_no, operator_name)
+    """
+    from PIL import Image, ImageDraw
+    font, _ = _overlay_font()
+    lines = overlay_lines(data)
+    measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    width = max(measure.textbbox((0, 0), line, font=font)[2] for line in lines)
+    img = Image.new('RGBA', (width + 2, len(lines) * OVERLAY_LINE_HEIGHT), (0, 0, 0, 0))   # +2: shadow
+    draw = ImageDraw.Draw(img)
     for i, line in enumerate(lines):
-        y = start_y + (i * line_height)
-        
+        y = i * OVERLAY_LINE_HEIGHT
         # Draw shadow
-        draw.text((x+2, y+2), line, font=bold_font, fill=(0, 0, 0, 200))
+        draw.text((2, y + 2), line, font=font, fill=(0, 0, 0, 200))
         # Draw text
-        draw.text((x, y), line, font=bold_font, fill=(255, 255, 255, 255))
-        
+        draw.text((0, y), line, font=font, fill=(255, 255, 255, 255))
     return img
 
-from proglog import ProgressBarLogger
+import signal
+import subprocess
+import threading
 import time
+from collections import deque
+from imageio_ffmpeg import get_ffmpeg_exe
+from services import profiles
+from services.encoders import Encoder, select_encoder, forget, tuned, CPU_ENCODER
+from services.profiles import Profile
+from services.metadata import probe, VideoMetadata
+from core.config_manager import load_config, get_app_data_dir
 
-class EncodeLogger(ProgressBarLogger):
-    def __init__(self, callback=None):
-        super().__init__()
-        self._progress_cb = callback
-        self.start_time = None
-
-    def bars_callback(self, bar, attr, value, old_value=None):
-        if not self._progress_cb: return
-        
-        if self.start_time is None:
-            self.start_time = time.time()
-            
-        total = self.bars[bar]['total']
-        if total > 0:
-            progress = (value / total) * 100
-            
-            # Calculate ETA
-            elapsed = time.time() - self.start_time
-            if progress > 0:
-                eta_seconds = (elapsed / progress) * (100 - progress)
-                # Format ETA
-                if eta_seconds < 60:
-                    eta_str = f"{int(eta_seconds)}s"
-                else:
-                    eta_str = f"{int(eta_seconds//60)}m {int(eta_seconds%60)}s"
-            else:
-                eta_str = "..."
-                
-            self._progress_cb(int(progress), eta_str)
+class EncodeCancelled(Exception):
+    pass
 
-import subprocess
-import re
-from imageio_ffmpeg import get_ffmpeg_exe
+_overlay_lock = threading.Lock()
+
+def overlay_png(data) -> Path:
+    """
+    The text box for data as a PNG, cached on disk keyed by (text, font, size):
+    re-encodes and batches of the same battery never render or write it again.
+    """
+    import hashlib
+    _, font_name = _overlay_font()
+    key = hashlib.blake2b("\n".join([*overlay_lines(data), font_name, str(OVERLAY_FONT_SIZE)]).encode(),
+                          digest_size=16).hexdigest()
+    out = get_app_data_dir() / "overlays" / f"{key}.png"
+    with _overlay_lock:
+        if not out.exists():
+            out.parent.mkdir(parents=True, exist_ok=True)
+            tmp = out.with_name(f"{key}.{os.getpid()}.tmp.png")
+            create_overlay_image(data).save(tmp, format="PNG")
+            os.replace(tmp, out)    # a concurrent encode never reads a half-written PNG
+    return out
+
+def _escape_filter_arg(value: str) -> str:
+    # Two parsers read it: the filter's key=value options, then the filtergraph itself
+    for ch in "\\':":
+        value = value.replace(ch, "\\" + ch)
+    for ch in "\\'[],;":
+        value = value.replace(ch, "\\" + ch)
+    return value
+
+def drawtext_filter(data) -> str:
+    """The same box drawn by ffmpeg's drawtext: no image, no second input."""
+    windows_font = Path(os.environ.get("WINDIR", "C:/Windows")) / "Fonts" / "arialbd.ttf"
+    font = (f"fontfile={_escape_filter_arg(windows_font.as_posix())}" if windows_font.exists()
+            else f"font={_escape_filter_arg('Arial:style=Bold')}")
+    lines = overlay_lines(data)
+    parts = []
+    for i, line in enumerate(lines):
+        y = f"h-{OVERLAY_MARGIN + (len(lines) - i) * OVERLAY_LINE_HEIGHT}"
+        common = f"drawtext={font}:fontsize={OVERLAY_FONT_SIZE}:expansion=none:text={_escape_filter_arg(line)}"
+        parts.append(f"{common}:fontcolor=black@0.78:x={OVERLAY_MARGIN + 2}:y={y}+2")
+        parts.append(f"{common}:fontcolor=white:x={OVERLAY_MARGIN}:y={y}")
+    return ",".join(parts)
+
+_filters: dict[str, set[str]] = {}
+
+def has_filter(ffmpeg_exe: str, name: str) -> bool:
+    """Static builds differ (the bundled Linux one has no drawtext), so ask the binary once."""
+    if ffmpeg_exe not in _filters:
+        try:
+            out = subprocess.run([ffmpeg_exe, "-hide_banner", "-filters"], capture_output=True, encoding="utf-8",
+                                 errors="replace", creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)).stdout
+        except OSError:
+            out = ""
+        _filters[ffmpeg_exe] = {parts[1] for parts in (l.split() for l in out.splitlines()) if len(parts) > 2}
+    return name in _filters[ffmpeg_exe]
+
+def kill_process_tree(process: subprocess.Popen):
+    """Kills ffmpeg and anything it spawned (hardware encoder helpers) right away."""
+    if process.poll() is not None:
+        return
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)   # own process group via start_new_session
+        except ProcessLookupError:
+            pass
+    process.wait()
+
+def format_eta(seconds: float) -> str:
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    return f"{int(seconds//60)}m {int(seconds%60)}s"
+
+def _number(value: str) -> float | None:
+    # ffmpeg writes "N/A" until it has a value, units glued on ("2.1x", "1834.2kbits/s")
+    try:
+        return float(value.rstrip("xkbits/s"))
+    except ValueError:
+        return None
+
+def run_ffmpeg_progress(cmd: list, duration: float, progress_callback=None,
+                        cancel_event: threading.Event | None = None, **extra) -> dict:
+    """
+    Runs ffmpeg with machine-readable `-progress pipe:1` output and reports
+    progress_callback(percent, eta, fps=, speed=, bitrate_kbps=, **extra) once per
+    progress block (~2/s). Returns the final stats; raises with ffmpeg's error text on failure.
+    Setting cancel_event kills the process tree and raises EncodeCancelled.
+    """
+    cmd = [cmd[0], '-hide_banner', '-nostats', '-v', 'error', '-progress', 'pipe:1', *cmd[1:]]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               encoding='utf-8', errors='replace', start_new_session=os.name != "nt",
+                               creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    # stderr drained on the side so a chatty ffmpeg can never block on a full pipe
+    errors = deque(maxlen=20)
+    drain = threading.Thread(target=lambda: errors.extend(process.stderr), daemon=True)
+    drain.start()
+    if cancel_event is not None:
+        # Watches independently of the progress loop, which only wakes when ffmpeg writes
+        def watch():
+            while process.poll() is None:
+                if cancel_event.wait(0.2):
+                    kill_process_tree(process); return
+        threading.Thread(target=watch, daemon=True).start()
+
+    start = time.monotonic()
+    block, stats = {}, {"fps": None, "speed": None, "bitrate_kbps": None, **extra}
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        if key != "progress":
+            block[key] = value; continue
+        out_us = block.get("out_time_us", "N/A")
+        parsed = {"fps": _number(block.get("fps", "N/A")), "speed": _number(block.get("speed", "N/A")),
+                  "bitrate_kbps": _number(block.get("bitrate", "N/A")),
+                  "media_seconds": max(0, int(out_us)) / 1e6 if out_us.lstrip("-").isdigit() else None}
+        # a block can report N/A mid-run; keep the last known value rather than jumping back
+        stats.update({k: v for k, v in parsed.items() if v is not None}, wall_seconds=time.monotonic() - start)
+        done = stats.get("media_seconds", 0.0)
+        block = {}
+        if not progress_callback or not duration: continue
+        if value == "end":
+            progress_callback(100, "0s", **stats); continue
+        percent = min(99, int(done / duration * 100))
+        # speed is media seconds per wall second; before ffmpeg reports it, extrapolate from elapsed time
+        remaining = duration - done
+        if stats["speed"]:
+            eta = format_eta(remaining / stats["speed"])
+        elif done > 0:
+            eta = format_eta(remaining * stats["wall_seconds"] / done)
+        else:
+            eta = "..."
+        progress_callback(percent, eta, **stats)
+    process.wait(); drain.join(1)
+    if cancel_event is not None and cancel_event.is_set():
+        raise EncodeCancelled("Encoding cancelled")
+    if process.returncode != 0:
+        raise Exception(f"FFmpeg failed: {''.join(errors).strip()[-500:] or process.returncode}")
+    stats["wall_seconds"] = time.monotonic() - start
+    return stats
 
 def get_video_metadata(path):
-    clip = VideoFileClip(path)
-    w, h = clip.w, clip.h
-    duration = clip.duration
-    clip.close()
-    return w, h, duration
+    # Header parse (no decoder process); size is post-rotation as ffmpeg's filters see it
+    meta = probe(path)
+    w, h = meta.display_size
+    return w, h, meta.duration
+
+def _encode_with_fallback(ffmpeg_exe: str, encoder: Encoder, build_cmd, duration: float, output_path: str,
+                          progress_callback=None, cancel_event=None, fallback: Encoder | None = None):
+    """Runs build_cmd(encoder); a failed hardware encode is retried once with fallback. Partial output is removed."""
+    try:
+        try:
+            run_ffmpeg_progress(build_cmd(encoder), duration, progress_callback, cancel_event, encoder=encoder.name)
+        except EncodeCancelled:
+            raise
+        except Exception as e:
+            if fallback is None or not encoder.is_hardware: raise
+            # Probe passed but the real job failed (driver/session limits): re-probe next time
+            print(f"{encoder.name} failed ({e}), falling back to CPU...")
+            forget(ffmpeg_exe)
+            run_ffmpeg_progress(build_cmd(fallback), duration, progress_callback, cancel_event, encoder=fallback.name)
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
 
-def process_and_save_video(input_path: str, output_path: str, data: tuple, progress_callback=None):
+def process_and_save_video(input_path: str, output_path: str, data: tuple, progress_callback=None,
+                           cancel_event: threading.Event | None = None, encoder: Encoder | None = None,
+                           profile: Profile | None = None, cut: list[tuple[int, int]] | None = None) -> VideoMetadata:
     """
     Uses direct FFmpeg command for maximum speed.
     Bypasses Python-side frame processing.
+    Returns the metadata of the written file. Raises EncodeCancelled once
+    cancel_event is set; partial output is removed on any failure.
+    profile (default: profiles.for_video) sets the width cap, quality and speed.
+    An explicit encoder (benchmarks) is used as-is, without the CPU fallback.
+    cut: [(start_ms, end_ms)] stretches left out of the output (services.activity idle spans).
     """
     # 1. Get metadata
     w, h, duration = get_video_metadata(input_path)
-    
-    # 2. Calculate target size (limit to 1080p width)
-    target_w = w
-    target_h = h
-    if w > 1920:
-        ratio = 1920 / w
-        target_w = 1920
-        target_h = int(h * ratio)
-        # Ensure even dimensions for encoding
-        if target_h % 2 != 0: target_h -= 1
-    
-    # 3. Create overlay image at TARGET size
-    overlay_img = create_overlay_image((target_w, target_h), data)
-    
-    # Save overlay to temp file
-    import tempfile
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tf:
-        overlay_img.save(tf, format="PNG")
-        overlay_path = tf.name
-        
+    profile = profile or profiles.for_video(duration)
+
+    # 2. Calculate target size (limit to the profile's width)
+    target_w, target_h = _target_size(w, h, profile.max_width)
+
+    ffmpeg_exe = get_ffmpeg_exe()
+    # Probed once per ffmpeg binary and cached on disk, so CPU-only machines
+    # go straight to libx264 instead of failing a hardware pass first
+    if encoder is None:
+        encoder = tuned(select_encoder(ffmpeg_exe), profile.quality, profile.speed)
+        fallback = tuned(CPU_ENCODER, profile.quality, profile.speed)
+    else:
+        fallback = None
+
+    # 3. Overlay: only the small text box is blended, at the bottom-left corner,
+    # either drawn by ffmpeg (config "overlay_mode": "drawtext") or from the cached PNG
+    scale = f"[0:v]scale={target_w}:{target_h}"
+    audio = []
+    if cut:
+        from services.activity import select_expr
+        keep = select_expr(cut)
+        rate = probe(input_path).fps or 30
+        # select leaves the frame rate unset; without fps= the muxer falls back to 25 and drops frames
+        scale = f"[0:v]select='{keep}',setpts=N/({rate}*TB),fps={rate},scale={target_w}:{target_h}"
+        audio = ['-af', f"aselect='{keep}',asetpts=N/SR/TB"]
+        duration = max(0.1, duration - sum(b - a for a, b in cut) / 1000)
+    if load_config().get("overlay_mode") == "drawtext" and has_filter(ffmpeg_exe, "drawtext"):
+        inputs, filter_complex = [], f"{scale},{drawtext_filter(data)}"
+    else:
+        inputs = ['-i', str(overlay_png(data))]
+        filter_complex = f"{scale}[bg];[bg][1:v]overlay={OVERLAY_MARGIN}:H-h-{OVERLAY_MARGIN}"
+
+    def build_cmd(enc):
+        fc = filter_complex + (f",{enc.filter_suffix}" if enc.filter_suffix else "")
+        return [
+            ffmpeg_exe, '-y', *enc.input_args,
+            '-i', input_path,
+            *inputs,
+            '-filter_complex', fc,
+            *audio, '-c:a', 'aac', '-b:a', f"{profile.audio_kbps}k",
+            *enc.args, output_path
+        ]
+
+    _encode_with_fallback(ffmpeg_exe, encoder, build_cmd, duration, output_path,
+                          progress_callback, cancel_event, fallback)
+    return probe(output_path)
+
+def _target_size(w: int, h: int, max_width: int) -> tuple[int, int]:
+    if w <= max_width:
+        return w, h
+    target_h = int(h * max_width / w)
+    # Ensure even dimensions for encoding
+    return max_width - max_width % 2, target_h - target_h % 2
+
+# ---------------- Proxy ----------------
+PROXY_GOP = 15     # a keyframe every ~0.5 s: seeking in the list lands instantly
+
+def needs_proxy(meta: VideoMetadata, profile: Profile) -> bool:
+    return meta.display_size[0] > profile.max_width
+
+def transcode(input_path: str, output_path: str, profile: Profile, progress_callback=None,
+              cancel_event: threading.Event | None = None, gop: int | None = None) -> VideoMetadata:
+    """Re-encodes a library video at profile (no overlay added; a burned-in one is kept as pixels)."""
+    w, h, duration = get_video_metadata(input_path)
+    target_w, target_h = _target_size(w, h, profile.max_width)
     ffmpeg_exe = get_ffmpeg_exe()
-    
-    # 4. Construct FFmpeg command
-    # Filter: Scale input -> Overlay PNG on top
-    # Note: We must scale input video to match the overlay size we just created
-    filter_complex = f"[0:v]scale={target_w}:{target_h}[bg];[bg][1:v]overlay=0:0"
-    
-    # Common args
-    cmd_base = [
-        ffmpeg_exe, '-y',
+
+    def build_cmd(enc):
+        vf = f"scale={target_w}:{target_h}" + (f",{enc.filter_suffix}" if enc.filter_suffix else "")
+        return [ffmpeg_exe, '-y', *enc.input_args, '-i', input_path, '-vf', vf,
+                '-c:a', 'aac', '-b:a', f"{profile.audio_kbps}k", '-movflags', '+faststart',
+                *enc.args, *(['-g', str(gop)] if gop else []), output_path]
+
+    _encode_with_fallback(ffmpeg_exe, tuned(select_encoder(ffmpeg_exe), profile.quality, profile.speed), build_cmd,
+                          duration, output_path, progress_callback, cancel_event,
+                          tuned(CPU_ENCODER, profile.quality, profile.speed))
+    return probe(output_path)
+
+def encode_proxy(input_path: str, output_path: str, profile: Profile | None = None, progress_callback=None,
+                 cancel_event: threading.Event | None = None) -> VideoMetadata:
+    """Small low-bitrate copy of a library video for playback and scrubbing; the master is kept for export."""
+    return transcode(input_path, output_path, profile or profiles.get("preview"), progress_callback,
+                     cancel_event, gop=PROXY_GOP)
+
+
+# ---------------- Stream-copy ingest ----------------
+# Sources that are already H.264 at <=1080p are kept as-is: the overlay is stored
+# with the recording (and as an MP4 comment tag) and drawn by the player instead.
+# The encode profile wins: a source wider than its max_width is scaled down, and the
+# "archive" profile always re-encodes, since it exists to make long recordings small.
+STREAM_COPY_CODECS = {"h264"}
+STREAM_COPY_MAX = (1920, 1080)
+
+def can_stream_copy(meta: VideoMetadata, profile: Profile | None = None) -> bool:
+    long_side, short_side = max(meta.width, meta.height), min(meta.width, meta.height)
+    if profile is not None and (profile.name == "archive" or meta.width > profile.max_width):
+        return False
+    return meta.codec in STREAM_COPY_CODECS and long_side <= STREAM_COPY_MAX[0] and short_side <= STREAM_COPY_MAX[1]
+
+def remux_video(input_path: str, output_path: str, data: tuple, progress_callback=None,
+                cancel_event: threading.Event | None = None) -> VideoMetadata:
+    """Copies the video stream untouched into an MP4 (audio normalised to AAC). Takes seconds, not minutes."""
+    cmd = [
+        get_ffmpeg_exe(), '-y',
         '-i', input_path,
-        '-i', overlay_path,
-        '-filter_complex', filter_complex,
-        '-c:a', 'aac'
+        '-map', '0:v:0', '-map', '0:a:0?',
+        '-c:v', 'copy', '-c:a', 'aac',
+        '-movflags', '+faststart',
+        '-metadata', f"comment={' | '.join(overlay_lines(data))}",
+        output_path
     ]
-    
-    # Encoder args (Try NVENC first)
-    # Using 'g' (GoP size) optimization often helps seeking/speed too
-    nvenc_args = ['-c:v', 'h264_nvenc', '-preset', 'p4', '-rc:v', 'vbr', '-cq:v', '28']
-    cpu_args = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28', '-threads', str(os.cpu_count() or 4)]
-    
-    def run_ffmpeg(args):
-        # Merge base + encoder + output
-        full_cmd = cmd_base + args + [output_path]
-        
-        process = subprocess.Popen(
-            full_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True, # text mode
-            encoding='utf-8',
-            errors='replace' 
-        )
-        
-        # Parse progress from stderr
-        # Duration format in stderr: Duration: 00:00:30.50
-        # Progress format: time=00:00:15.20
-        
-        while True:
-            line = process.stderr.readline()
-            if not line and process.poll() is not None:
-                break
-                
-            if line and progress_callback:
-                # Naive parsing
-                if "time=" in line:
-                    # extract time
-                    match = re.search(r"time=(\d{2}):(\d{2}):(\d{2}\.\d{2})", line)
-                    if match:
-                        h_val, m_val, s_val = map(float, match.groups())
-                        current_seconds = h_val*3600 + m_val*60 + s_val
-                        percent = min(100, int((current_seconds / duration) * 100))
-                        
-                        # ETA calculation is tricky without stored start time in this scope
-                        # Simpler: just show percent and 'Processing...'
-                        # Or pass simple "..." as ETA for now
-                        progress_callback(percent, "...")
-
-        if process.returncode != 0:
-            raise Exception("FFmpeg failed")
-
     try:
-        try:
-            run_ffmpeg(nvenc_args)
-        except Exception as e:
-            print(f"NVENC failed ({e}), falling back to CPU...")
-            run_ffmpeg(cpu_args)
-    finally:
-        # Cleanup temp overlay
-        if os.path.exists(overlay_path):
-            os.remove(overlay_path)
+        run_ffmpeg_progress(cmd, probe(input_path).duration, progress_callback, cancel_event, encoder="copy")
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    return probe(output_path)
+
+def will_stream_copy(input_path: str, profile: Profile | None = None) -> bool:
+    return load_config().get("ingest_mode", "auto") == "auto" and can_stream_copy(probe(input_path), profile)
+
+def ingest_video(input_path: str, output_path: str, data: tuple, progress_callback=None,
+                 cancel_event: threading.Event | None = None, profile: Profile | None = None,
+                 cut: list[tuple[int, int]] | None = None) -> tuple[VideoMetadata, bool]:
+    """
+    Brings a source video into the library. Returns (metadata, overlay_burned).
+    config "ingest_mode": "auto" (default) stream-copies eligible sources,
+    "encode" always burns the overlay in. Cutting (cut spans), a source wider than the
+    profile and the archive profile always encode.
+    """
+    if not cut and will_stream_copy(input_path, profile):
+        return remux_video(input_path, output_path, data, progress_callback, cancel_event), False
+    return process_and_save_video(input_path, output_path, data, progress_callback, cancel_event, profile=profile, cut=cut), True
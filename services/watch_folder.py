@@ -0,0 +1,220 @@
+# services/watch_folder.py
+import datetime
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from core.config_manager import load_config
+from core.db import query, execute, transaction, close_conn
+from services import batch_import, jobs, store
+from services.metadata import probe
+
+# Cameras drop recordings into config "watch_dir" (often a network share). A video is
+# taken once its size and mtime have held still for "watch_settle_s" seconds, by renaming
+# it into .ingesting/: the rename is the claim (Windows refuses it while the writer still
+# has the file open, and a second watcher cannot take the same file). It is then probed,
+# matched by content hash against everything the folder delivered before, and queued as
+# a normal encode job. Fields come from "watch_defaults", then the "watch_pattern" file
+# name pattern, then a sidecar <name>.json. Sources end in imported/, duplicates/ or rejected/.
+# Until its job is queued a taken file has a watch_claims row, written before the rename and
+# kept alive by its watcher: files in .ingesting/ are only picked up again once that goes stale.
+INGESTING, IMPORTED, DUPLICATES, REJECTED = ".ingesting", "imported", "duplicates", "rejected"
+POLL_SECONDS = 10
+SETTLE_SECONDS = 5
+CLAIM_STALE_SECONDS = 900   # hashing a large file on a slow share takes a while
+
+def settings() -> tuple[Path | None, str, dict, float]:
+    """(folder, pattern, default fields, settle seconds); no folder means watching is off."""
+    config = load_config()
+    folder = config.get("watch_dir")
+    try:
+        settle = max(0.0, float(config.get("watch_settle_s", SETTLE_SECONDS)))
+    except (TypeError, ValueError):
+        settle = SETTLE_SECONDS
+    return (Path(folder) if folder else None, config.get("watch_pattern") or batch_import.DEFAULT_PATTERN,
+            config.get("watch_defaults") or {}, settle)
+
+def read_sidecar(video: Path) -> dict:
+    side = video.with_suffix(".json")
+    if not side.exists():
+        return {}
+    data = json.loads(side.read_text(encoding="utf-8-sig"))
+    if not isinstance(data, dict):
+        raise ValueError(f"{side.name}: expected a JSON object")
+    return batch_import.fields_from(data)
+
+def _target(path: Path, folder: Path) -> Path:
+    """Where path would land in folder without overwriting anything there."""
+    dst, n = folder / path.name, 1
+    while dst.exists():
+        dst = folder / f"{path.stem}_{n}{path.suffix}"; n += 1
+    return dst
+
+def _move(path: Path, folder: Path, dst: Path | None = None) -> Path:
+    """Renames path (and its sidecar) into folder, to dst if given, without overwriting anything there."""
+    folder.mkdir(parents=True, exist_ok=True)
+    dst = dst or _target(path, folder)
+    os.rename(path, dst)
+    side = path.with_suffix(".json")
+    if side.exists():
+        try:
+            os.rename(side, dst.with_suffix(".json"))
+        except OSError:
+            pass
+    return dst
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+def _claim(path: Path) -> bool:
+    """Takes (or refreshes) the claim on a file in .ingesting/; False while another watcher's is alive."""
+    stale = (datetime.datetime.now() - datetime.timedelta(seconds=CLAIM_STALE_SECONDS)).isoformat(timespec='seconds')
+    with transaction() as con:
+        return con.execute("""
+            INSERT INTO watch_claims (src_path, owner, heartbeat) VALUES (?, ?, ?)
+            ON CONFLICT(src_path) DO UPDATE SET owner=excluded.owner, heartbeat=excluded.heartbeat
+            WHERE watch_claims.owner=excluded.owner OR watch_claims.heartbeat < ?
+        """, (str(path), OWNER, _now(), stale)).rowcount > 0
+
+def _unclaim(path: Path):
+    execute("DELETE FROM watch_claims WHERE src_path=? AND owner=?", (str(path), OWNER))
+
+class Watcher:
+    """
+    Polls the watch folder on a daemon thread. enqueue takes batch_import items and returns
+    (item, recording_id, job_id) like batch_import.enqueue (the app passes its JobQueue's
+    submit_batch so the pool wakes up). on_event(event, file, detail) with event one of
+    queued / duplicate / rejected / imported. folder, pattern and defaults override config.
+    """
+    def __init__(self, enqueue=None, on_event=None, folder: str | Path | None = None,
+                 pattern: str | None = None, defaults: dict | None = None):
+        self.enqueue = enqueue or batch_import.enqueue
+        self.on_event = on_event
+        self.overrides = (Path(folder) if folder else None, pattern, defaults)
+        self._seen: dict[Path, tuple] = {}     # path -> ((size, mtime_ns), unchanged since)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True); self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        if self._thread: self._thread.join(timeout)
+
+    def _loop(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"Watch folder: {e}")
+                self._stop.wait(POLL_SECONDS)
+        finally:
+            close_conn()
+
+    def _emit(self, event: str, path: Path, detail: str = ""):
+        if self.on_event: self.on_event(event, str(path), detail)
+
+    def settings(self) -> tuple[Path | None, str, dict, float]:
+        folder, pattern, defaults, settle = settings()
+        o_folder, o_pattern, o_defaults = self.overrides
+        return o_folder or folder, o_pattern or pattern, o_defaults if o_defaults is not None else defaults, settle
+
+    def poll(self) -> int:
+        """One pass: settles finished jobs, then takes every file that stopped growing. Returns files queued."""
+        folder, pattern, defaults, settle = self.settings()
+        if folder is None or not folder.is_dir():
+            return 0
+        self._finish()
+        now = time.monotonic()
+        seen, ready = {}, []
+        for path in folder.iterdir():
+            if path.suffix.lower() not in batch_import.VIDEO_SUFFIXES or path.name.startswith("."):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+            last = self._seen.get(path)
+            since = last[1] if last and last[0] == sig else now
+            seen[path] = (sig, since)
+            if st.st_size and now - since >= settle:
+                ready.append(path)
+        self._seen = seen
+        queued = 0
+        for path in sorted(ready):
+            dst = _target(path, folder / INGESTING)
+            if not _claim(dst):
+                continue
+            try:
+                claimed = _move(path, folder / INGESTING, dst)
+            except OSError:
+                _unclaim(dst)
+                continue    # still open by the writer, or another watcher got it first
+            self._seen.pop(path, None)
+            queued += self._ingest(claimed, folder, pattern, defaults)
+        # Taken but never queued, by a watcher that stopped in between (its claim went stale)
+        pending = {r[0] for r in query("SELECT src_path FROM watch_ingest WHERE job_id IS NOT NULL")}
+        if (folder / INGESTING).is_dir():
+            for path in sorted((folder / INGESTING).iterdir()):
+                if path.suffix.lower() not in batch_import.VIDEO_SUFFIXES or str(path) in pending or not _claim(path):
+                    continue
+                if query("SELECT 1 FROM watch_ingest WHERE src_path=? AND job_id IS NOT NULL", (str(path),)):
+                    _unclaim(path); continue    # queued by its owner just before the claim went through
+                queued += self._ingest(path, folder, pattern, defaults)
+        return queued
+
+    def _reject(self, path: Path, folder: Path, reason: str):
+        dst = _move(path, folder / REJECTED)
+        dst.with_name(dst.name + ".error.txt").write_text(reason + "\n", encoding="utf-8")
+        self._emit("rejected", dst, reason)
+
+    def _ingest(self, path: Path, folder: Path, pattern: str, defaults: dict) -> int:
+        """Probes, de-duplicates and queues a claimed file; the claim ends with it either way."""
+        try:
+            try:
+                probe(str(path))
+                fields = read_sidecar(path)
+            except Exception as e:
+                self._reject(path, folder, str(e)); return 0
+            h = store.hash_file(path)
+            _claim(path)    # heartbeat: the hash may have taken minutes
+            if query("SELECT 1 FROM watch_ingest WHERE source_hash=? AND job_id IS NOT NULL", (h,)):
+                self._emit("duplicate", _move(path, folder / DUPLICATES)); return 0
+            items = batch_import.plan_files([path], {path.name.lower(): fields} if fields else None, pattern, defaults)
+            if not items or items[0].error:
+                self._reject(path, folder, items[0].error if items else "Not a video file"); return 0
+            execute("INSERT OR REPLACE INTO watch_ingest (source_hash, src_path, created_at) VALUES (?, ?, ?)",
+                    (h, str(path), _now()))
+            [(_, rec_id, job_id)] = self.enqueue(items)
+            execute("UPDATE watch_ingest SET recording_id=?, job_id=? WHERE source_hash=?", (rec_id, job_id, h))
+            self._emit("queued", path, f"recording {rec_id}")
+            return 1
+        finally:
+            _unclaim(path)
+
+    def _finish(self):
+        """Sources of finished encodes move to imported/; failed or cancelled ones to rejected/ (and may be dropped again)."""
+        rows = query("""
+            SELECT w.source_hash, w.src_path, j.state, j.error FROM watch_ingest w JOIN jobs j ON j.id = w.job_id
+            WHERE w.done_at IS NULL AND j.state IN (?, ?, ?)
+        """, (jobs.DONE, jobs.FAILED, jobs.CANCELLED))
+        for h, src, state, error in rows:
+            src = Path(src); folder = src.parent.parent    # <watch folder>/.ingesting/<file>
+            try:
+                if state == jobs.DONE:
+                    dst = _move(src, folder / IMPORTED) if src.exists() else src
+                    execute("UPDATE watch_ingest SET src_path=?, done_at=? WHERE source_hash=?", (str(dst), _now(), h))
+                    self._emit("imported", dst)
+                else:
+                    execute("DELETE FROM watch_ingest WHERE source_hash=?", (h,))
+                    if src.exists():
+                        self._reject(src, folder, f"Encode failed: {error}" if state == jobs.FAILED else "Encode cancelled")
+            except OSError as e:
+                print(f"Watch folder: could not move {src}: {e}")
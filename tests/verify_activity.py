@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from services import activity
+
+FPS = 4
+
+def samples(*runs):
+    # (seconds, score) runs at FPS samples per second
+    return np.concatenate([np.full(int(seconds * FPS), score, np.float32) for seconds, score in runs])
+
+def spans(scores, **kw):
+    return activity.idle_spans(scores, FPS, threshold=0.005, **kw)
+
+def test_activity():
+    print("Testing idle spans...")
+    # Idle over [2, 17) s, padded by a second on both sides
+    assert spans(samples((2, 0.1), (15, 0), (1, 0.1))) == [(3000, 16000)]
+    # A trailing stretch counts, and exactly min_seconds is enough
+    assert spans(samples((2, 0.1), (10, 0))) == [(3000, 11000)]
+    # So does a leading one; just under min_seconds does not
+    assert spans(samples((12, 0), (1, 0.1), (9.75, 0), (1, 0.1))) == [(1000, 11000)]
+    # Padding that would leave nothing drops the span, a quarter second left is kept
+    assert spans(samples((1, 0.1), (2, 0), (1, 0.1)), min_seconds=1) == []
+    assert spans(samples((1, 0.1), (2.25, 0), (1, 0.1)), min_seconds=1) == [(2000, 2250)]
+    # Scores at the threshold are activity
+    assert spans(samples((20, 0.005))) == []
+    assert spans(np.zeros(0, np.float32)) == []
+
+    print("Testing per-second timeline...")
+    # 10 samples: the last second has only two, padded with stillness
+    t = activity.per_second(np.array([0, 0.1, 0, 0, 0.2, 0, 0, 0, 0.3, 0.05], np.float32), FPS)
+    assert t.dtype == np.float16 and len(t) == 3
+    assert t.tolist() == np.array([0.1, 0.2, 0.3], np.float16).tolist()
+    assert len(activity.per_second(np.zeros(8, np.float32), FPS)) == 2
+
+    print("Testing cut expression...")
+    assert activity.select_expr([(1000, 2500), (4000, 5000)]) == \
+        "not(between(t,1.000,2.500)+between(t,4.000,5.000))"
+
+    print("Testing step events...")
+    q = activity.EVENT_QUIET_SECONDS
+    # Activity after q quiet seconds starts a step; a shorter pause and a trailing stillness do not
+    t = np.array([0.1] + [0] * q + [0.1, 0.1, 0, 0, 0.2] + [0] * (q + 1), np.float32)
+    assert activity.events(t, threshold=0.005) == [(q + 1) * 1000]
+    # Stillness from the start counts
+    assert activity.events(np.array([0] * q + [0.1], np.float32), threshold=0.005) == [q * 1000]
+    # Scene changes: the first second of each run above SCENE_THRESHOLD, merged with a step starting there
+    t = np.array([0.1, 0.6, 0.7, 0.1, 0.6] + [0] * q + [0.6], np.float32)
+    assert activity.events(t, threshold=0.005) == [1000, 4000, (5 + q) * 1000]
+    assert activity.events(np.zeros(0, np.float32), threshold=0.005) == []
+
+    print("Verification passed!")
+
+if __name__ == "__main__":
+    test_activity()
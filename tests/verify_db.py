@@ -0,0 +1,93 @@
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from core import config_manager
+from core import db
+from services.search import search_recordings, match_expression
+
+ROWS = [
+    ("Solar Farm A", "P-2025-001", "L-105", "B-12", "John Doe", "cell 4 misaligned"),
+    ("Solar Farm B", "P-2025-002", "L-106", "B-13", "Jane Roe", ""),
+    ("Depot Stack", "D-2024-310", "L-200", "B-01", "John Smith", "re-torqued"),
+]
+
+def _insert(row, created_at):
+    return db.execute("""
+        INSERT INTO recordings (battery_name, battery_code, log_id, battery_no, operator_name,
+                                remarks, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (*row, created_at))
+
+def test_db():
+    original_path = config_manager.get_data_path()
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        config_manager.set_data_path(tmp.name)
+        db.reset()
+        db.init_db()
+
+        print("Testing connection pool...")
+        assert db.get_conn() is db.get_conn()
+        other = []
+        t = threading.Thread(target=lambda: (other.append(db.get_conn()), db.close_conn()))
+        t.start(); t.join()
+        assert other[0] is not db.get_conn()
+        assert db.query("PRAGMA journal_mode")[0][0] == "wal"
+
+        print("Testing FTS index...")
+        ids = [_insert(r, f"2025-01-0{i+1}T10:00:00") for i, r in enumerate(ROWS)]
+        assert match_expression("  ") is None
+        assert match_expression("P-2025") == '"p"* "2025"*'
+
+        hits = [r[0] for r in search_recordings("p-2025")]
+        assert hits and set(hits) == {ids[0], ids[1]}, hits
+        assert [r[0] for r in search_recordings("joh smi")] == [ids[2]]
+        assert [r[0] for r in search_recordings("john", column="operator_name")] == [ids[2], ids[0]]
+        assert [r[0] for r in search_recordings("")] == ids[::-1]
+
+        print("Testing FTS triggers...")
+        db.execute("UPDATE recordings SET operator_name=? WHERE id=?", ("Ann Lee", ids[0]))
+        assert [r[0] for r in search_recordings("john")] == [ids[2]]
+        assert [r[0] for r in search_recordings("ann")] == [ids[0]]
+        db.execute("DELETE FROM recordings WHERE id=?", (ids[2],))
+        assert search_recordings("depot") == []
+
+        print("Testing stats triggers...")
+        db.execute("UPDATE recordings SET datetime=?, duration_ms=?, video_path=? WHERE id=?",
+                   ("2025-01-02 09:00:00", 90_000, "a.mp4", ids[1]))
+        assert db.query("SELECT total, with_video, footage_ms, latest FROM stats")[0] == (2, 1, 90_000, "2025-01-02 09:00:00")
+        assert db.query("SELECT * FROM stats_operator ORDER BY operator") == [("Ann Lee", 1, 0), ("Jane Roe", 1, 90_000)]
+        assert db.query("SELECT * FROM stats_day ORDER BY day") == [("", 1, 0), ("2025-01-02", 1, 90_000)]
+        db.execute("DELETE FROM recordings WHERE id=?", (ids[1],))
+        assert db.query("SELECT total, with_video, footage_ms, latest FROM stats")[0] == (1, 0, 0, None)
+        assert db.query("SELECT operator FROM stats_operator") == [("Ann Lee",)]
+        version = db.query("SELECT version FROM stats")[0][0]
+        db.execute("UPDATE recordings SET remarks=? WHERE id=?", ("changed", ids[0]))
+        assert db.query("SELECT version FROM stats")[0][0] > version     # dashboard's recent table re-reads
+
+        print("Testing integrity scan...")
+        from services import integrity
+        junk = Path(tmp.name) / "junk.mp4"; junk.write_bytes(b"not a video")
+        db.execute("UPDATE recordings SET video_path=? WHERE id=?", (str(junk), ids[0]))
+        assert integrity.scan() == {"examined": 1, integrity.UNREADABLE: 1}
+        assert integrity.scan()["examined"] == 0, "unchanged file opened again"
+        assert integrity.problems([ids[0]])[ids[0]][0] == integrity.UNREADABLE
+        junk.unlink()
+        assert integrity.scan() == {"examined": 0, integrity.MISSING: 1}
+        db.execute("DELETE FROM recordings WHERE id=?", (ids[0],))
+        assert db.query("SELECT count(*) FROM recording_health")[0][0] == 0
+    finally:
+        db.reset()
+        if original_path is not None:
+            config_manager.set_data_path(original_path)
+        tmp.cleanup()
+
+    print("Verification passed!")
+
+if __name__ == "__main__":
+    test_db()
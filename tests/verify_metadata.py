@@ -0,0 +1,58 @@
+import sys
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from imageio_ffmpeg import get_ffmpeg_exe
+from services import metadata
+
+def make_video(path, extra=()):
+    # 2 second 640x360 @ 25 fps test pattern with a sine audio track
+    subprocess.check_call([
+        get_ffmpeg_exe(), "-v", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc2=s=640x360:r=25:d=2",
+        "-f", "lavfi", "-i", "sine=d=2",
+        "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", *extra, str(path)
+    ])
+
+def test_metadata():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "src.mp4"
+        make_video(src)
+
+        print("Testing MP4 header parse...")
+        meta = metadata.probe(src)
+        print(meta)
+        assert (meta.width, meta.height) == (640, 360)
+        assert meta.codec == "h264" and meta.has_audio
+        assert abs(meta.fps - 25) < 0.01
+        assert 1900 <= meta.duration_ms <= 2100
+        assert meta.bitrate > 0
+
+        print("Testing ffmpeg fallback agrees...")
+        slow = metadata._probe_ffmpeg(src)
+        assert (slow.width, slow.height, slow.codec, slow.has_audio) == (meta.width, meta.height, meta.codec, meta.has_audio)
+        assert abs(slow.duration - meta.duration) < 0.1
+
+        print("Testing rotation...")
+        rotated = Path(tmp) / "rotated.mp4"
+        subprocess.check_call([get_ffmpeg_exe(), "-v", "error", "-y", "-display_rotation", "90",
+                               "-i", str(src), "-c", "copy", str(rotated)])
+        meta = metadata.probe(rotated)
+        assert meta.rotation == metadata._probe_ffmpeg(rotated).rotation == 270
+        assert meta.display_size == (360, 640)
+
+        print("Testing cache invalidation...")
+        assert metadata.probe(src) is metadata.probe(src)
+        make_video(src, ("-t", "1"))
+        os.utime(src, ns=(0, 10**9))
+        assert metadata.probe(src).duration_ms < 1500
+
+    print("Verification passed!")
+
+if __name__ == "__main__":
+    test_metadata()
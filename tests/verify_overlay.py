@@ -1,41 +1,74 @@
 import sys
 import os
+import subprocess
+import numpy as np
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from moviepy import ColorClip
-from services.video_processor import process_and_save_video
+from imageio_ffmpeg import get_ffmpeg_exe
+from core.config_manager import load_config, save_config
+from services.metadata import probe
+from services.video_processor import (process_and_save_video, has_filter, overlay_lines,
+                                      OVERLAY_MARGIN, OVERLAY_LINE_HEIGHT)
 
 def create_dummy_video(path):
-    # Create a 2 second red video
-    # MoviePy 2.0+ might require duration set separately or different init
-    clip = ColorClip(size=(640, 480), color=(255, 0, 0))
-    clip = clip.with_duration(2)
-    clip.write_videofile(path, fps=24)
+    # 2 second red video with a tone, straight from the bundled ffmpeg
+    subprocess.run([get_ffmpeg_exe(), "-v", "error", "-y",
+                    "-f", "lavfi", "-i", "color=c=red:s=640x480:r=24:d=2",
+                    "-f", "lavfi", "-i", "sine=duration=2",
+                    "-pix_fmt", "yuv420p", "-c:v", "libx264", "-c:a", "aac", path], check=True)
+
+def frame(path, w=640, h=480):
+    # One RGB frame from the middle of the video
+    raw = subprocess.run([get_ffmpeg_exe(), "-v", "error", "-ss", "1", "-i", path, "-frames:v", "1",
+                          "-f", "rawvideo", "-pix_fmt", "rgb24", "-"], capture_output=True, check=True).stdout
+    return np.frombuffer(raw, np.uint8).reshape(h, w, 3).astype(np.int16)
+
+def check_overlay(src, dst, data):
+    # The text box sits OVERLAY_MARGIN from the bottom-left corner; nothing else changes
+    before, after = frame(src), frame(dst)
+    box_h = len(overlay_lines(data)) * OVERLAY_LINE_HEIGHT
+    box = (slice(480 - OVERLAY_MARGIN - box_h, 480 - OVERLAY_MARGIN), slice(OVERLAY_MARGIN, OVERLAY_MARGIN + 200))
+    changed = (np.abs(after - before).max(axis=2) > 60)
+    assert changed[box].mean() > 0.05, f"overlay missing from the bottom-left box ({changed[box].mean():.1%} changed)"
+    assert changed[:240].mean() < 0.001, "overlay drawn outside the bottom-left box"
+    assert changed[:, :OVERLAY_MARGIN - 2].mean() < 0.001, "overlay ignores the left margin"
 
 def test_overlay():
     src = "test_src.mp4"
     dst = "test_dst.mp4"
-    
+
     try:
         print("Creating dummy video...")
         create_dummy_video(src)
-        
+
         print("Processing video...")
         data = ("BAT-001", "12345", "John Doe")
-        process_and_save_video(src, dst, data)
-        
-        if os.path.exists(dst):
-            print("Success: Output video created.")
-            # Clean up
-            os.remove(src)
+        meta = process_and_save_video(src, dst, data)
+
+        assert os.path.exists(dst), "Output video not found"
+        out = probe(dst)
+        assert (out.width, out.height) == (640, 480), f"Unexpected size {out.width}x{out.height}"
+        assert out.codec == "h264" and abs(out.duration_ms - 2000) < 200, out
+        assert meta == out
+        check_overlay(src, dst, data)
+        print("Success: Output video created.")
+
+        config = load_config()
+        if has_filter(get_ffmpeg_exe(), "drawtext"):
+            print("Processing video with drawtext...")
             os.remove(dst)
+            try:
+                save_config({**config, "overlay_mode": "drawtext"})
+                process_and_save_video(src, dst, data)
+            finally:
+                save_config(config)
+            check_overlay(src, dst, data)
         else:
-            print("Error: Output video not found.")
-    except Exception:
-        import traceback
-        with open("error.log", "w") as f:
-            traceback.print_exc(file=f)
-        traceback.print_exc()
+            print("Skipping drawtext: this ffmpeg build has no drawtext filter")
+        print("Verification passed!")
+    finally:
+        for p in (src, dst):
+            if os.path.exists(p): os.remove(p)
 
 if __name__ == "__main__":
     test_overlay()
@@ -0,0 +1,83 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from core import config_manager
+from core import db
+from services import store
+
+def _recording(path, h):
+    return db.execute("INSERT INTO recordings (battery_name, video_path, video_hash) VALUES (?, ?, ?)",
+                      ("Stack", str(path), h))
+
+def test_store():
+    original_path = config_manager.get_data_path()
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        config_manager.set_data_path(tmp.name)
+        db.reset()
+        db.init_db()
+        src = Path(tmp.name) / "upload.mp4"
+        src.write_bytes(b"\x00\x00\x00\x18ftypmp42" + bytes(range(256)) * 4096)
+
+        print("Testing deduplication...")
+        h1, p1 = store.put(src, move=False)
+        h2, p2 = store.put(src, move=False)
+        assert h1 == h2 == store.hash_file(src) and p1 == p2
+        assert p1 == store.blob_path(h1) and p1.read_bytes() == src.read_bytes()
+        assert len(list(p1.parent.iterdir())) == 1
+
+        print("Testing reference counts...")
+        a, b = _recording(p1, h1), _recording(p2, h2)
+        assert db.query("SELECT refcount FROM blobs WHERE hash=?", (h1,))[0][0] == 2
+        assert not store.release(h1)
+        db.execute("DELETE FROM recordings WHERE id=?", (a,))
+        assert not store.release(h1) and p1.exists()
+        db.execute("DELETE FROM recordings WHERE id=?", (b,))
+        assert store.release(h1) and not p1.exists()
+        assert db.query("SELECT COUNT(*) FROM blobs")[0][0] == 0
+
+        print("Testing archive round trip...")
+        from services import archive
+        h, hot = store.put(src, move=False)
+        ids = [_recording(hot, h), _recording(hot, h)]
+        cold_dir = Path(tmp.name) / "cold"
+        def state():
+            return (db.query("SELECT tier, path, archive_codec FROM blobs WHERE hash=?", (h,))[0],
+                    {r[0] for r in db.query(f"SELECT video_path FROM recordings WHERE id IN ({','.join('?' * len(ids))})", ids)})
+        assert archive.archive_blob(h, hot, cold_dir) == "copy"
+        cold = cold_dir / h[:2] / f"{h}.mp4"
+        assert state() == ((archive.COLD, str(cold), "copy"), {str(cold)})
+        assert cold.read_bytes() == src.read_bytes() and not hot.exists()
+        assert [p.name for p in cold.parent.iterdir()] == [cold.name]    # no temp file left
+        assert archive.restore(h) == hot
+        tier, path, _ = state()[0]
+        assert (tier, path) == (archive.HOT, str(hot)) and state()[1] == {str(hot)}
+        assert hot.read_bytes() == src.read_bytes() and not cold.exists()
+        # Archived re-encoded before: goes back as is, keeping that codec
+        db.execute("UPDATE blobs SET archive_codec='hevc' WHERE hash=?", (h,))
+        reencode, archive._reencode = archive._reencode, lambda *a, **kw: (_ for _ in ()).throw(AssertionError("re-encoded"))
+        try:
+            assert archive.archive_blob(h, hot, cold_dir, "av1") == "hevc"
+        finally:
+            archive._reencode = reencode
+        assert state() == ((archive.COLD, str(cold), "hevc"), {str(cold)}) and not hot.exists()
+        # Lost race: the blob moved meanwhile, so nothing the DB points at is touched
+        stale = Path(tmp.name) / "stale.mp4"; stale.write_bytes(src.read_bytes())
+        assert archive.archive_blob(h, stale, cold_dir) is None
+        assert cold.read_bytes() == src.read_bytes() and stale.exists() and state()[0][1] == str(cold)
+        assert [p.name for p in cold.parent.iterdir()] == [cold.name]
+        assert archive.restore(h) == hot and not archive.is_archived(h)
+    finally:
+        db.reset()
+        if original_path is not None:
+            config_manager.set_data_path(original_path)
+        tmp.cleanup()
+
+    print("Verification passed!")
+
+if __name__ == "__main__":
+    test_store()
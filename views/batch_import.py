@@ -0,0 +1,159 @@
+# views/batch_import.py
+import os
+import time
+from pathlib import Path
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QPushButton, QLabel,
+                               QFileDialog, QSpinBox, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox)
+from core.config_manager import load_config
+from services import jobs, batch_import
+from views.jobs_panel import JobQueue
+
+class BatchImportDialog(QDialog):
+    """Import a folder of clips: metadata from a CSV manifest and/or the file names, encoded in parallel."""
+    HEADERS = ["File", "Battery Name", "Battery Code", "Battery No.", "Status"]
+    STATUS_COL = 4
+
+    def __init__(self, queue: JobQueue, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import Folder")
+        self.resize(900, 600)
+        self.queue = queue
+        self.items: list[batch_import.BatchItem] = []
+        self._rows: dict[int, int] = {}        # job_id -> table row
+        self._sizes: dict[int, int] = {}       # job_id -> source bytes
+        self._progress: dict[int, tuple[int, float]] = {}   # job_id -> (percent, media seconds)
+        self._states: dict[int, str] = {}
+        self._started = None
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        self.folderEdit = QLineEdit(); self.csvEdit = QLineEdit()
+        self.csvEdit.setPlaceholderText("Optional: CSV with a 'file' column plus battery fields")
+        form.addRow("Folder", self._with_browse(self.folderEdit, self._choose_folder))
+        form.addRow("Manifest", self._with_browse(self.csvEdit, self._choose_csv))
+        self.patternEdit = QLineEdit(load_config().get("batch_filename_pattern", batch_import.DEFAULT_PATTERN))
+        self.patternEdit.setToolTip("Fields: " + ", ".join("{%s}" % f for f in batch_import.FIELDS))
+        form.addRow("File name pattern", self.patternEdit)
+        self.nameEdit = QLineEdit(); self.nameEdit.setPlaceholderText("Used when the manifest/file name has none")
+        self.operatorEdit = QLineEdit(); self.operatorEdit.setPlaceholderText("Used when the manifest/file name has none")
+        form.addRow("Battery Name", self.nameEdit)
+        form.addRow("Operator", self.operatorEdit)
+        self.spinWorkers = QSpinBox(); self.spinWorkers.setRange(1, max(4, os.cpu_count() or 1))
+        self.spinWorkers.setValue(queue.pool.workers)
+        form.addRow("Parallel encodes", self.spinWorkers)
+        layout.addLayout(form)
+
+        self.table = QTableWidget(); self.table.setColumnCount(len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table, 1)
+
+        self.lblSummary = QLabel(); self.lblSummary.setStyleSheet("color: #46464F;")
+        layout.addWidget(self.lblSummary)
+
+        row = QHBoxLayout(); row.addStretch(1)
+        self.btnPreview = QPushButton("Preview"); self.btnPreview.setProperty("class", "tonal")
+        self.btnImport = QPushButton("Import"); self.btnImport.setProperty("class", "primary")
+        self.btnClose = QPushButton("Close"); self.btnClose.setProperty("class", "text")
+        for b in (self.btnPreview, self.btnImport, self.btnClose):
+            b.setCursor(Qt.PointingHandCursor); row.addWidget(b)
+        layout.addLayout(row)
+        self.btnImport.setEnabled(False)
+
+        self.btnPreview.clicked.connect(self._preview)
+        self.btnImport.clicked.connect(self._import)
+        self.btnClose.clicked.connect(self.accept)
+        queue.progress.connect(self._on_progress)
+        queue.stateChanged.connect(self._on_state)
+        self.timer = QTimer(self); self.timer.setInterval(1000); self.timer.timeout.connect(self._update_summary)
+
+    def _with_browse(self, edit, handler):
+        row = QHBoxLayout(); row.addWidget(edit, 1)
+        b = QPushButton("Browse..."); b.setProperty("class", "tonal"); b.setCursor(Qt.PointingHandCursor)
+        b.clicked.connect(handler); row.addWidget(b)
+        return row
+
+    def _choose_folder(self):
+        d = QFileDialog.getExistingDirectory(self, "Folder with videos", self.folderEdit.text() or str(Path.home()))
+        if not d: return
+        self.folderEdit.setText(d)
+        csvs = list(Path(d).glob("*.csv"))
+        if len(csvs) == 1 and not self.csvEdit.text(): self.csvEdit.setText(str(csvs[0]))
+        self._preview()
+
+    def _choose_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Manifest", self.folderEdit.text() or str(Path.home()), "CSV (*.csv)")
+        if path: self.csvEdit.setText(path); self._preview()
+
+    # ---- plan
+    def _preview(self):
+        folder = Path(self.folderEdit.text().strip())
+        if not folder.is_dir():
+            QMessageBox.warning(self, "Folder", "Please choose a folder with videos."); return
+        try:
+            manifest = batch_import.read_manifest(self.csvEdit.text().strip()) if self.csvEdit.text().strip() else None
+            self.items = batch_import.plan(folder, manifest, self.patternEdit.text().strip() or None,
+                                           {"battery_name": self.nameEdit.text().strip(),
+                                            "operator_name": self.operatorEdit.text().strip()})
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", str(e)); return
+        self.table.setRowCount(len(self.items))
+        for i, item in enumerate(self.items):
+            f = item.fields
+            for c, text in enumerate([item.path.name, f.get("battery_name", ""), f.get("battery_code", ""),
+                                      f.get("battery_no", ""), item.error or "Ready"]):
+                cell = QTableWidgetItem(text)
+                if item.error: cell.setForeground(QColor("#b91c1c"))
+                self.table.setItem(i, c, cell)
+        ready = sum(1 for i in self.items if not i.error)
+        self.lblSummary.setText(f"{ready} of {len(self.items)} videos ready to import")
+        self.btnImport.setEnabled(ready > 0)
+
+    # ---- run
+    def _import(self):
+        self.queue.set_workers(self.spinWorkers.value())
+        queued = self.queue.submit_batch(self.items)
+        rows = {id(item): i for i, item in enumerate(self.items)}
+        for item, _, job_id in queued:
+            self._rows[job_id] = rows[id(item)]
+            self._sizes[job_id] = item.path.stat().st_size
+            self._states.setdefault(job_id, jobs.PENDING)
+            self.table.item(self._rows[job_id], self.STATUS_COL).setText("Queued")
+        for b in (self.btnPreview, self.btnImport): b.setEnabled(False)
+        self._started = time.monotonic(); self.timer.start(); self._update_summary()
+
+    def _on_progress(self, job_id: int, percent: int, eta: str, stats: dict):
+        row = self._rows.get(job_id)
+        if row is None: return
+        self._progress[job_id] = (percent, stats.get("media_seconds") or 0.0)
+        self.table.item(row, self.STATUS_COL).setText(f"Encoding {percent}%  ·  {eta} left")
+
+    def _on_state(self, job_id: int, state: str, message: str):
+        row = self._rows.get(job_id)
+        if row is None: return
+        self._states[job_id] = state
+        label = {jobs.RUNNING: "Encoding", jobs.DONE: "Done", jobs.FAILED: f"Failed: {message}",
+                 jobs.CANCELLED: "Cancelled"}.get(state, "Queued")
+        cell = self.table.item(row, self.STATUS_COL); cell.setText(label)
+        if state == jobs.FAILED: cell.setForeground(QColor("#b91c1c"))
+        if state == jobs.DONE: self._progress[job_id] = (100, self._progress.get(job_id, (0, 0.0))[1])
+        self._update_summary()
+
+    def _update_summary(self):
+        if self._started is None: return
+        elapsed = max(time.monotonic() - self._started, 0.001)
+        states = list(self._states.values())
+        finished = sum(s in (jobs.DONE, jobs.FAILED, jobs.CANCELLED) for s in states)
+        # Throughput over the whole batch: source bytes and media seconds processed per wall second
+        done_bytes = sum(self._sizes[j] * p / 100 for j, (p, _) in self._progress.items())
+        media = sum(m for _, m in self._progress.values())
+        text = (f"{states.count(jobs.DONE)}/{len(states)} done"
+                + (f"  ·  {states.count(jobs.FAILED)} failed" if jobs.FAILED in states else "")
+                + f"  ·  {done_bytes / elapsed / 1e6:.1f} MB/s  ·  {media / elapsed:.1f}x realtime"
+                + f"  ·  {int(elapsed // 60):02d}:{int(elapsed % 60):02d} elapsed")
+        self.lblSummary.setText(text)
+        if finished == len(states): self.timer.stop()
@@ -1,4 +1,5 @@
 # views/dashboard.py
+import datetime
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QSizePolicy, QSpacerItem,
     QTableWidget, QTableWidgetItem, QHeaderView, QGridLayout
@@ -15,10 +16,16 @@ def _kpi_card(title: str, value: str, icon_name: str = None) -> QFrame:
     v = QVBoxLayout(card); v.setContentsMargins(24, 24, 24, 24); v.setSpacing(8)
     t = QLabel(title); t.setStyleSheet("font-size: 14px; font-weight: 600; color: #46464F;")
     val = QLabel(value); val.setStyleSheet("font-size: 32px; font-weight: 800; color: #1B1B1F;")
-    v.addWidget(t); v.addWidget(val); v.addStretch(1)
+    sub = QLabel(""); sub.setStyleSheet("font-size: 12px; color: #46464F;")
+    v.addWidget(t); v.addWidget(val); v.addWidget(sub); v.addStretch(1)
+    card.value, card.sub = val, sub     # refresh() updates these in place
     return card
 
 class DashboardView(QWidget):
+    KPIS = [("total", "Total Recordings"), ("latest", "Last Recording"), ("with_video", "Entries with Video"),
+            ("footage", "Footage"), ("per_day", "Recordings Today"), ("operator", "Top Operator")]
+    RECENT_DAYS = 30
+
     def __init__(self):
         super().__init__()
         root = QVBoxLayout(self); root.setContentsMargins(12,8,12,12); root.setSpacing(24)
@@ -28,10 +35,15 @@ class DashboardView(QWidget):
         header.setStyleSheet("font-size: 24px; font-weight: 700; color: #1B1B1F;")
         root.addWidget(header)
 
-        # KPI Grid
+        # KPI Grid: built once, values updated in place by refresh()
         self.grid = QGridLayout(); self.grid.setSpacing(24)
+        self.cards = {}
+        for i, (key, title) in enumerate(self.KPIS):
+            self.cards[key] = _kpi_card(title, "-")
+            self.grid.addWidget(self.cards[key], i // 3, i % 3)
         root.addLayout(self.grid)
-        
+        self._version = None
+
         # Recent Activity Table
         lblRecent = QLabel("Recent Activity")
         lblRecent.setStyleSheet("font-size: 18px; font-weight: 600; color: #1B1B1F; margin-top: 12px;")
@@ -55,25 +67,39 @@ class DashboardView(QWidget):
         self.refresh()
 
     def refresh(self):
-        # 1. Stats
-        total = query("SELECT COUNT(*) FROM recordings")[0][0]
-        latest = query("SELECT IFNULL(MAX(datetime), '-') FROM recordings")[0][0]
-        with_video = query("SELECT COUNT(*) FROM recordings WHERE video_path IS NOT NULL AND length(video_path)>0")[0][0]
+        # 1. Stats: one row maintained by triggers (core.db._stats_tables); nothing to do if unchanged
+        total, with_video, footage_ms, latest, version = query(
+            "SELECT total, with_video, footage_ms, latest, version FROM stats WHERE id=1")[0]
+        today = datetime.date.today()
+        if (version, today) == self._version:
+            return
+        self._version = (version, today)
+        since = (today - datetime.timedelta(days=self.RECENT_DAYS - 1)).isoformat()
+        today_count = query("SELECT ifnull(SUM(recordings), 0) FROM stats_day WHERE day=?", (today.isoformat(),))[0][0]
+        recent, active_days = query("SELECT ifnull(SUM(recordings), 0), COUNT(*) FROM stats_day WHERE day>=? AND day<=?",
+                                    (since, today.isoformat()))[0]
+        top = query("SELECT operator, recordings, footage_ms FROM stats_operator WHERE operator!='' "
+                    "ORDER BY recordings DESC LIMIT 1")
+        operators = query("SELECT COUNT(*) FROM stats_operator WHERE operator!=''")[0][0]
 
-        # Clear grid
-        while self.grid.count():
-            item = self.grid.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-
-        self.grid.addWidget(_kpi_card("Total Recordings", str(total)), 0, 0)
-        self.grid.addWidget(_kpi_card("Last Recording", str(latest)), 0, 1)
-        self.grid.addWidget(_kpi_card("Entries with Video", str(with_video)), 0, 2)
+        self._set("total", str(total), f"{recent} in the last {self.RECENT_DAYS} days")
+        self._set("latest", str(latest or "-"))
+        self._set("with_video", str(with_video), f"{with_video / total:.0%} of all recordings" if total else "")
+        self._set("footage", f"{footage_ms / 3_600_000:.1f} h",
+                  f"{footage_ms / with_video / 60_000:.1f} min per video" if with_video else "")
+        self._set("per_day", str(today_count),
+                  f"{recent / active_days:.1f} per recording day (last {self.RECENT_DAYS} days)" if active_days else "")
+        if top:
+            name, count, op_ms = top[0]
+            self._set("operator", name, f"{count} recordings, {op_ms / 3_600_000:.1f} h  ·  {operators} operators")
+        else:
+            self._set("operator", "-")
 
         # 2. Table
         rows = query("""
             SELECT battery_name, battery_code, battery_no, operator_name, datetime, remarks
             FROM recordings
-            ORDER BY datetime(created_at) DESC
+            ORDER BY ifnull(created_at,'') DESC, id DESC
             LIMIT 10
         """)
         
@@ -84,3 +110,7 @@ class DashboardView(QWidget):
                 item = QTableWidgetItem(str(val) if val else "")
                 item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
                 self.table.setItem(r_idx, c_idx, item)
+
+    def _set(self, key: str, value: str, sub: str = ""):
+        card = self.cards[key]
+        card.value.setText(value); card.sub.setText(sub)
@@ -8,6 +8,8 @@ import shutil
 import datetime
 from models.recording import Recording
 from core.db import execute
+from services.metadata import probe
+from services import store
 
 class EditRecordingDialog(QDialog):
     def __init__(self, parent, recording: Recording):
@@ -65,35 +67,39 @@ class EditRecordingDialog(QDialog):
     def _save(self):
         # 1. Update DB
         now = datetime.datetime.now().isoformat(timespec='seconds')
-        
-        # Handle video replacement
-        final_video_path = self.recording.video_path
-        if self.new_video_path:
-            # Copy new video to a stable location or overwrite?
-            # Strategy: Copy to same dir as old one, or just update path if it's external.
-            # Ideally, we keep it in the app's managed folder if possible, but for now let's just use the path
-            # or copy it if we want to be safe. Let's just update the path to the new location for simplicity
-            # unless we want to enforce a specific storage structure.
-            # User request said "re-upload", implying replacing the content.
-            final_video_path = str(self.new_video_path)
-
+        fields = (
+            self.batteryName.text().strip(),
+            self.batteryCode.text().strip(),
+            self.logId.text().strip(),
+            self.batteryNo.text().strip(),
+            self.operatorName.text().strip(),
+            self.remarks.toPlainText().strip(),
+            now,
+        )
+        update = """
+            UPDATE recordings SET
+                battery_name=?, battery_code=?, log_id=?, battery_no=?,
+                operator_name=?, remarks=?, updated_at=?{video}
+            WHERE id=?
+        """
         try:
-            execute("""
-                UPDATE recordings SET
-                    battery_name=?, battery_code=?, log_id=?, battery_no=?,
-                    operator_name=?, remarks=?, video_path=?, updated_at=?
-                WHERE id=?
-            """, (
-                self.batteryName.text().strip(),
-                self.batteryCode.text().strip(),
-                self.logId.text().strip(),
-                self.batteryNo.text().strip(),
-                self.operatorName.text().strip(),
-                self.remarks.toPlainText().strip(),
-                str(final_video_path),
-                now,
-                self.recording.id
-            ))
+            if not self.new_video_path:
+                execute(update.format(video=""), (*fields, self.recording.id))
+                self.accept(); return
+            try:
+                duration_ms = probe(self.new_video_path).duration_ms
+            except (OSError, ValueError):
+                duration_ms = None
+            # Re-upload goes into the content-addressed store; re-uploading the same file costs no disk.
+            # A raw camera file carries no overlay: the player draws it and export offers the burn-in.
+            try:
+                final_hash, _ = store.put(self.new_video_path, move=False, claim=lambda h, path: execute(
+                    update.format(video=", video_path=?, video_hash=?, duration_ms=?, overlay_burned=0"),
+                    (*fields, str(path), h, duration_ms, self.recording.id)))
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to copy video: {e}"); return
+            if final_hash != self.recording.video_hash:
+                store.release(self.recording.video_hash)
             self.accept()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to update recording: {e}")
@@ -0,0 +1,122 @@
+# views/jobs_panel.py
+from PySide6.QtCore import Qt, QObject, Signal, QCoreApplication
+from PySide6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QPushButton)
+
+from core.config_manager import load_config, save_config
+from services import jobs
+
+class JobQueue(QObject):
+    """Qt face of services.jobs.JobPool: worker callbacks re-emitted as (queued) signals."""
+    progress = Signal(int, int, str, object)    # job_id, percent, eta, stats (fps, speed, bitrate_kbps, encoder)
+    stateChanged = Signal(int, str, str)  # job_id, state, message
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = jobs.JobPool(on_progress=lambda j, p, eta, **kw: self.progress.emit(j, p, eta, kw),
+                                 on_state=self.stateChanged.emit)
+        self.pool.start()
+        if QCoreApplication.instance():
+            QCoreApplication.instance().aboutToQuit.connect(lambda: self.pool.stop(timeout=1))
+
+    def submit(self, recording_values: tuple, src: str, dst: str, data: tuple) -> int:
+        rec_id, job_id = jobs.enqueue_encode(recording_values, src, dst, data)
+        self.pool.notify()
+        self.stateChanged.emit(job_id, jobs.PENDING, "")
+        return job_id
+
+    def submit_batch(self, items) -> list[tuple]:
+        """Queues services.batch_import items in one transaction; returns (item, recording_id, job_id)."""
+        from services import batch_import
+        queued = batch_import.enqueue(items)
+        self.pool.notify()
+        for _, _, job_id in queued: self.stateChanged.emit(job_id, jobs.PENDING, "")
+        return queued
+
+    def set_workers(self, workers: int):
+        """Parallel encodes, applied at once and remembered in config.json."""
+        self.pool.resize(workers)
+        config = load_config(); config["encode_workers"] = self.pool.workers; save_config(config)
+
+    def cancel(self, job_id: int):
+        self.pool.cancel(job_id)
+
+    def retry(self, job_id: int):
+        jobs.retry(job_id); self.pool.notify()
+        self.stateChanged.emit(job_id, jobs.PENDING, "")
+
+class JobsPanel(QFrame):
+    """Recent encode jobs with live progress; failed jobs can be retried."""
+    HEADERS = ["Battery Code", "Battery No.", "Status", "Progress", ""]
+    STATE_LABELS = {jobs.PENDING: "Queued", jobs.RUNNING: "Encoding", jobs.DONE: "Done", jobs.FAILED: "Failed",
+                    jobs.CANCELLED: "Cancelled"}
+
+    def __init__(self, queue: JobQueue):
+        super().__init__(); self.setObjectName("Card")
+        self.queue = queue
+        l = QVBoxLayout(self); l.setContentsMargins(20, 20, 20, 20); l.setSpacing(12)
+
+        head = QHBoxLayout()
+        lbl = QLabel("Encoding Queue")
+        lbl.setStyleSheet("font-size: 18px; font-weight: 700; color: #3448A3;")
+        self.btnRetry = QPushButton("Retry Failed"); self.btnRetry.setProperty("class", "text")
+        self.btnRetry.setCursor(Qt.PointingHandCursor); self.btnRetry.clicked.connect(self._retry_failed)
+        head.addWidget(lbl); head.addStretch(1); head.addWidget(self.btnRetry)
+        l.addLayout(head)
+
+        self.table = QTableWidget(); self.table.setColumnCount(len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionMode(QTableWidget.NoSelection)
+        self.table.setFocusPolicy(Qt.NoFocus)
+        self.table.setFixedHeight(180)
+        l.addWidget(self.table)
+
+        self.lblThroughput = QLabel(); self.lblThroughput.setStyleSheet("color: #6B7280;")
+        l.addWidget(self.lblThroughput)
+
+        self._rows: dict[int, int] = {}  # job_id -> table row
+        self._jobs: list[jobs.Job] = []
+        queue.stateChanged.connect(lambda *_: self.refresh())
+        queue.progress.connect(self._on_progress)
+        self.refresh()
+
+    def refresh(self):
+        self._jobs = jobs.recent_jobs()
+        self._rows = {j.id: i for i, j in enumerate(self._jobs)}
+        self.table.setRowCount(len(self._jobs))
+        for i, j in enumerate(self._jobs):
+            overlay = j.payload.get("overlay", ["", "", ""])
+            status = self.STATE_LABELS.get(j.state, j.state)
+            progress = "100%" if j.state == jobs.DONE else ""
+            cells = [overlay[0], overlay[1], status, progress]
+            for c, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if j.state == jobs.FAILED and j.error: item.setToolTip(j.error)
+                self.table.setItem(i, c, item)
+            self.table.removeCellWidget(i, 4)
+            if j.state in (jobs.PENDING, jobs.RUNNING):
+                btn = QPushButton("Cancel"); btn.setProperty("class", "text"); btn.setCursor(Qt.PointingHandCursor)
+                btn.clicked.connect(lambda _=False, job_id=j.id: self.queue.cancel(job_id))
+                self.table.setCellWidget(i, 4, btn)
+        self.btnRetry.setVisible(any(j.state == jobs.FAILED for j in self._jobs))
+        self.lblThroughput.setText("   ".join(
+            f"{enc}: {speed or 0:.1f}x realtime, {fps or 0:.0f} fps avg ({n} jobs)"
+            for enc, n, fps, speed, _ in jobs.encoder_throughput()))
+
+    def _on_progress(self, job_id: int, percent: int, eta: str, stats: dict):
+        row = self._rows.get(job_id)
+        if row is None: return
+        text = f"{percent}%  ·  {eta} left"
+        if stats.get("speed"): text += f"  ·  {stats['speed']:.1f}x"
+        self.table.item(row, 3).setText(text)
+        if stats.get("fps"):
+            self.table.item(row, 3).setToolTip(f"{stats.get('encoder')}: {stats['fps']:.0f} fps, "
+                                               f"{stats.get('bitrate_kbps') or 0:.0f} kb/s")
+
+    def _retry_failed(self):
+        for j in self._jobs:
+            if j.state == jobs.FAILED: self.queue.retry(j.id)
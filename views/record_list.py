@@ -1,17 +1,18 @@
 # views/record_list.py
 from pathlib import Path
+from dataclasses import replace
 from PySide6.QtCore import (
-    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QUrl, QSize,
+    Qt, QAbstractTableModel, QModelIndex, QUrl, QSize,
     QTimer, QEvent, Signal, QThread
 )
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QComboBox, QLineEdit,
     QFrame, QPushButton, QStyle, QMessageBox, QSlider, QSizePolicy, QScrollArea,
-    QFileDialog, QGraphicsOpacityEffect, QProgressDialog, QHeaderView
+    QFileDialog, QGraphicsOpacityEffect, QProgressDialog, QHeaderView, QSpinBox, QApplication, QMenu
 )
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PySide6.QtMultimediaWidgets import QVideoWidget
-from PySide6.QtGui import QKeySequence, QAction
+from PySide6.QtGui import QKeySequence, QAction, QColor
 import threading
 
 from core.db import query
@@ -19,9 +20,12 @@ from core.settings import get_snapshot_dir, set_snapshot_dir
 from models.recording import Recording
 from models.recording import Recording
 from services.media import snapshot_filename
-from services.media import snapshot_filename
-from services.video_processor import process_and_save_video
+from services.search import RecordingQuery, fetch_page
+from services import activity, archive, integrity, jobs, store
 from views.edit_dialog import EditRecordingDialog
+from views.search_controller import SearchController
+from views.thumbnail_cache import ThumbnailCache, ThumbnailDelegate
+from widgets.activity_slider import ActivitySlider
 from core.db import execute
 
 
@@ -29,34 +33,78 @@ from core.db import execute
 
 # ---------------- Table model ----------------
 class RecordingTableModel(QAbstractTableModel):
-    HEADERS = ["ID","Battery Name","Battery Code","Log ID","Battery No.","Operator","Date/Time","Remarks","Video","Duration (s)"]
-    def __init__(self): super().__init__(); self.rows:list[Recording]=[]; self.refresh()
+    """Lazily paged: rows arrive PAGE_SIZE at a time through fetchMore; sorting and filtering run in SQL."""
+    HEADERS = ["ID","Battery Name","Battery Code","Log ID","Battery No.","Operator","Date/Time","Remarks","Video","Duration (s)","Preview"]
+    COLUMNS = ["id","battery_name","battery_code","log_id","battery_no","operator_name","datetime","remarks","video_path","duration_ms",None]
+    THUMB_COL = 10
+    BADGE_COL = 1    # first visible text column; Video (8) is hidden
+    def __init__(self, thumbs: ThumbnailCache | None = None):
+        super().__init__(); self.rows:list[Recording]=[]
+        self.health:dict[int,tuple]={}   # recording id -> (status, detail, checked_at), problems only
+        self.query=RecordingQuery(); self._cursor=None; self._exhausted=True
+        self.thumbs=thumbs
+        if thumbs: thumbs.ready.connect(self._thumb_ready)
+        self.refresh()
     def refresh(self, text: str = ""):
-        self.beginResetModel(); self.rows.clear()
-        if text:
-            t=f"%{text.lower()}%"
-            rows = query("""
-                SELECT id,battery_name,battery_code,log_id,battery_no,operator_name,
-                       datetime,remarks,video_path,duration_ms,created_at
-                FROM recordings
-                WHERE lower(battery_name) LIKE ? OR lower(battery_code) LIKE ?
-                   OR lower(log_id) LIKE ? OR lower(battery_no) LIKE ?
-                   OR lower(operator_name) LIKE ? OR lower(remarks) LIKE ?
-                ORDER BY datetime(created_at) DESC
-            """, (t,t,t,t,t,t))
-        else:
-            rows = query("""
-                SELECT id,battery_name,battery_code,log_id,battery_no,operator_name,
-                       datetime,remarks,video_path,duration_ms,created_at
-                FROM recordings ORDER BY datetime(created_at) DESC
-            """)
-        for r in rows: self.rows.append(Recording(*r))
+        self.set_query(replace(self.query, search=text))
+    def set_filter(self, text: str, column: str | None):
+        self.set_query(replace(self.query, filter=text, filter_column=column))
+    def set_query(self, q: RecordingQuery):
+        self.beginResetModel()
+        self.query=q
+        rows, self._cursor = fetch_page(q)
+        self.rows=[Recording(*r) for r in rows]; self._exhausted=self._cursor is None
+        self.health=integrity.problems([r.id for r in self.rows])
         self.endResetModel()
-    def rowCount(self, parent=QModelIndex()): return len(self.rows)
+    def canFetchMore(self, parent=QModelIndex()): return not parent.isValid() and not self._exhausted
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted: return
+        rows, cursor = fetch_page(self.query, self._cursor)
+        if not rows: self._cursor=None; self._exhausted=True; return
+        first=len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first+len(rows)-1)
+        self.rows.extend(Recording(*r) for r in rows); self._cursor=cursor; self._exhausted=cursor is None
+        self.health.update(integrity.problems([r.id for r in self.rows[first:]]))
+        self.endInsertRows()
+    def apply_results(self, q: RecordingQuery, rows, cursor):
+        """Swap in a new first page, emitting only the row removals/inserts that differ."""
+        new=[Recording(*r) for r in rows]; old=self.rows
+        n=min(len(old),len(new)); head=0
+        while head<n and old[head].id==new[head].id: head+=1
+        tail=0
+        while tail<n-head and old[-1-tail].id==new[-1-tail].id: tail+=1
+        self.query=q; self._cursor=cursor; self._exhausted=cursor is None
+        if len(old)-tail>head:
+            self.beginRemoveRows(QModelIndex(), head, len(old)-tail-1); del self.rows[head:len(old)-tail]; self.endRemoveRows()
+        if len(new)-tail>head:
+            self.beginInsertRows(QModelIndex(), head, len(new)-tail-1); self.rows[head:head]=new[head:len(new)-tail]; self.endInsertRows()
+        # Kept rows may still have changed contents
+        self.rows[:]=new; self.health=integrity.problems([r.id for r in new])
+        if self.rows: self.dataChanged.emit(self.index(0,0), self.index(len(self.rows)-1, self.columnCount()-1))
+    def sort(self, column, order=Qt.AscendingOrder):
+        key = self.COLUMNS[column] if 0<=column<len(self.COLUMNS) else None
+        self.set_query(replace(self.query, sort=key, descending=(order==Qt.DescendingOrder)))
+    def rowCount(self, parent=QModelIndex()): return 0 if parent.isValid() else len(self.rows)
     def columnCount(self, parent=QModelIndex()): return len(self.HEADERS)
     def data(self, idx, role=Qt.DisplayRole):
         if not idx.isValid(): return None
         r=self.rows[idx.row()]; c=idx.column()
+        if c==self.THUMB_COL:
+            if not self.thumbs: return None
+            if role==Qt.DecorationRole: return self.thumbs.pixmap(r)
+            if role==Qt.ToolTipRole: return self.thumbs.tooltip(r)
+            return None
+        bad=self.health.get(r.id)
+        if bad and c==self.BADGE_COL:
+            status, detail, checked = bad
+            if role==Qt.DecorationRole:
+                icon=QStyle.SP_MessageBoxWarning if status==integrity.MISSING else QStyle.SP_MessageBoxCritical
+                return QApplication.style().standardIcon(icon)
+            if role==Qt.ToolTipRole:
+                label={integrity.MISSING:"Video file missing",integrity.UNREADABLE:"Video file unreadable",
+                       integrity.HASH_MISMATCH:"Video file changed on disk",integrity.CORRUPT:"Video file corrupt"}[status]
+                return f"{label}\n{detail}\nChecked {checked}"
+        if bad and role==Qt.ForegroundRole: return QColor("#b91c1c")
         if role in (Qt.DisplayRole, Qt.EditRole):
             m=[r.id,r.battery_name,r.battery_code,r.log_id,r.battery_no,r.operator_name,
                r.datetime,r.remarks,Path(r.video_path).name if r.video_path else "",
@@ -67,6 +115,118 @@ class RecordingTableModel(QAbstractTableModel):
         if o==Qt.Horizontal and role==Qt.DisplayRole: return self.HEADERS[s]
         return super().headerData(s,o,role)
     def recording_at(self,row:int)->Recording|None: return self.rows[row] if 0<=row<len(self.rows) else None
+    def reload_health(self):
+        """Re-read file health for the loaded rows (after a scan)."""
+        self.health=integrity.problems([r.id for r in self.rows])
+        if self.rows: self.dataChanged.emit(self.index(0,0), self.index(len(self.rows)-1, self.columnCount()-1))
+    def _thumb_ready(self, key: str):
+        for i, r in enumerate(self.rows):
+            if ThumbnailCache.key(r)==key:
+                ix=self.index(i,self.THUMB_COL); self.dataChanged.emit(ix, ix, [Qt.DecorationRole])
+
+
+# ---------------- Snapshot worker ----------------
+class SnapshotWorker(QThread):
+    finished = Signal(bool, object)   # success, list[Path] | error message
+
+    def __init__(self, items, count=1):
+        super().__init__()
+        self.items = items; self.count = count
+
+    def run(self):
+        try:
+            from services.snapshots import export_snapshots
+            saved = export_snapshots(self.items, self.count)
+            if not saved: raise Exception("No frame at this position")
+            self.finished.emit(True, saved)
+        except Exception as e:
+            self.finished.emit(False, str(e))
+
+class RestoreWorker(QThread):
+    finished = Signal(bool, object)   # success, restored Path | error message
+
+    def __init__(self, video_hash: str):
+        super().__init__()
+        self.video_hash = video_hash
+
+    def run(self):
+        from core.db import close_conn
+        try:
+            from services.archive import restore
+            path = restore(self.video_hash)
+            if path is None: raise Exception("The archived video is no longer available")
+            self.finished.emit(True, path)
+        except Exception as e:
+            self.finished.emit(False, str(e))
+        finally:
+            close_conn()
+
+
+class ScanWorker(QThread):
+    progress = Signal(int, int)       # done, total
+    finished = Signal(bool, object)   # success, counts | error message
+
+    def __init__(self, decode: bool):
+        super().__init__()
+        self.decode = decode; self.cancel_event = threading.Event()
+
+    def cancel(self): self.cancel_event.set()
+
+    def run(self):
+        from core.db import close_conn
+        try:
+            counts = integrity.scan(decode=self.decode, progress_callback=self.progress.emit, cancel_event=self.cancel_event)
+            self.finished.emit(True, counts)
+        except Exception as e:
+            self.finished.emit(False, str(e))
+        finally:
+            close_conn()
+
+
+class ActivityWorker(QThread):
+    finished = Signal(int, bool)    # recording id, success
+
+    def __init__(self, rec: Recording):
+        super().__init__()
+        self.rec = rec
+
+    def run(self):
+        from core.db import close_conn
+        try:
+            activity.analyze_recording(self.rec.id, self.rec.video_path)
+            self.finished.emit(self.rec.id, True)
+        except Exception as e:
+            print(f"Activity analysis of recording {self.rec.id} failed: {e}")
+            self.finished.emit(self.rec.id, False)
+        finally:
+            close_conn()
+
+def next_event(events: list[int], pos: int, direction: int) -> int | None:
+    """Jump target after (direction 1) or before (-1) pos; going back skips the step just started."""
+    if direction > 0: return next((t for t in events if t > pos + 500), None)
+    return next((t for t in reversed(events) if t < pos - 1500), None)
+
+JUMP_TIP = "Activity over time; Ctrl+\u2192 / Ctrl+\u2190 jump to the next / previous step"
+
+
+# ---------------- Battery info overlay ----------------
+class InfoOverlay(QLabel):
+    """Bottom-left battery details over the video, for stream-copied recordings without a burned-in overlay."""
+    def __init__(self, host: QWidget):
+        super().__init__(host)
+        self.setStyleSheet("color:white; font-weight:700; font-size:16px; background: rgba(0,0,0,0.35); padding:6px 10px; border-radius:6px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hide(); host.installEventFilter(self)
+    def show_for(self, rec: Recording | None):
+        if rec is None or rec.overlay_burned: self.hide(); return
+        from services.video_processor import overlay_lines
+        self.setText("\n".join(overlay_lines((rec.battery_code, rec.battery_no, rec.operator_name))))
+        self.adjustSize(); self._place(); self.show(); self.raise_()
+    def _place(self):
+        self.move(20, self.parentWidget().height() - self.height() - 20)
+    def eventFilter(self, obj, event):
+        if event.type()==QEvent.Resize: self._place()
+        return False
 
 
 # ---------------- Fullscreen overlay window ----------------
@@ -74,7 +234,8 @@ class FullscreenWindow(QFrame):
     """Borderless top-level with overlay controls that auto-hide; calls on_exit when closing."""
     HIDE_MS = 2000
 
-    def __init__(self, player: QMediaPlayer, back_to: QVideoWidget, on_exit):
+    def __init__(self, player: QMediaPlayer, back_to: QVideoWidget, on_exit, rec: Recording | None = None,
+                 timeline=None, events: list[int] | None = None):
         super().__init__(None, Qt.Window | Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.player = player
@@ -85,7 +246,8 @@ class FullscreenWindow(QFrame):
         self.video = QVideoWidget(); lay.addWidget(self.video, 1)
         self.player.setVideoOutput(self.video)
 
-        # Info Overlay - removed from here, moved to __init__ to be sibling
+        # Info Overlay (only for recordings without a burned-in overlay)
+        self.info = InfoOverlay(self.video); self.info.show_for(rec)
 
         # Transparent overlay
         self.overlay = QFrame(self)
@@ -106,7 +268,9 @@ class FullscreenWindow(QFrame):
 
         bottom = QHBoxLayout()
         self.tLeft = QLabel("00:00"); self.tLeft.setStyleSheet("color:white; font-weight:700;")
-        self.seek = QSlider(Qt.Horizontal); self.seek.setRange(0,0)
+        self.seek = ActivitySlider(); self.seek.setRange(0,0); self.seek.set_activity(timeline)
+        self.events = events or []
+        if self.events: self.seek.setToolTip(JUMP_TIP)
         self.tRight = QLabel("00:00"); self.tRight.setStyleSheet("color:white; font-weight:700;")
         bottom.addWidget(self.tLeft); bottom.addWidget(self.seek,1); bottom.addWidget(self.tRight)
         ov.addLayout(bottom)
@@ -129,6 +293,9 @@ class FullscreenWindow(QFrame):
     def keyPressEvent(self, e):
         if e.key() in (Qt.Key_Escape, Qt.Key_F11): self.close()
         elif e.key()==Qt.Key_Space: self._toggle()
+        elif e.key() in (Qt.Key_Right, Qt.Key_Left) and e.modifiers() & Qt.ControlModifier:
+            target = next_event(self.events, self.player.position(), 1 if e.key()==Qt.Key_Right else -1)
+            if target is not None: self.player.setPosition(target); self._reveal_overlay()
         else: super().keyPressEvent(e)
     def closeEvent(self, e):
         try:
@@ -178,14 +345,25 @@ class RecordListView(QFrame):
         top.addWidget(QLabel("Quick Filter:"))
         self.field = QComboBox(); self.field.addItems(["All","Battery Name","Battery Code","Log ID","Battery no.","Operator"])
         self.filterEdit = QLineEdit(); self.filterEdit.setPlaceholderText("Type to filter…"); self.filterEdit.setClearButtonEnabled(True)
-        top.addWidget(self.field); top.addWidget(self.filterEdit,1); outer.addLayout(top)
+        self.btnCheck = QPushButton("Check Files"); self.btnCheck.setProperty("class","tonal")
+        self.btnCheck.setToolTip("Look for missing or damaged video files")
+        menu = QMenu(self.btnCheck)
+        menu.addAction("Quick check (files present and readable)", lambda: self._check_files(False))
+        menu.addAction("Full check (decode every frame)", lambda: self._check_files(True))
+        self.btnCheck.setMenu(menu)
+        top.addWidget(self.field); top.addWidget(self.filterEdit,1); top.addWidget(self.btnCheck); outer.addLayout(top)
 
         # Table
-        self.model = RecordingTableModel()
-        self.proxy = QSortFilterProxyModel(); self.proxy.setSourceModel(self.model)
-        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive); self.proxy.setFilterKeyColumn(-1)
-        self.table = QTableView(); self.table.setModel(self.proxy)
-        self.table.setSortingEnabled(True); self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.thumbs = ThumbnailCache(self)
+        self.model = RecordingTableModel(self.thumbs)
+        self.search_ctl = SearchController(self.model.query, self)
+        self.search_ctl.results.connect(self.model.apply_results)
+        self.table = QTableView(); self.table.setModel(self.model)
+        # Sorting goes through the search controller (off the GUI thread) rather than setSortingEnabled.
+        # -1 = model default order (newest first / best match) until a header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.DescendingOrder)
+        self.table.horizontalHeader().setSortIndicatorShown(True); self.table.horizontalHeader().setSectionsClickable(True)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
         self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.verticalHeader().setVisible(False); self.table.horizontalHeader().setStretchLastSection(False)
         self.table.setMinimumHeight(220); outer.addWidget(self.table)
@@ -199,12 +377,20 @@ class RecordListView(QFrame):
         
         # Resize modes
         # 1=BatName, 2=BatCode, 3=LogID, 4=BatNo, 5=Op, 6=Date
+        # Interactive + one resize per refresh: ResizeToContents re-measures on every fetched page
         for c in (1,2,3,4,5,6):
-            h.setSectionResizeMode(c, QHeaderView.ResizeToContents)
+            h.setSectionResizeMode(c, QHeaderView.Interactive)
         
         # 7=Remarks (Stretch)
         h.setSectionResizeMode(7, QHeaderView.Stretch)
 
+        # 10=Preview, shown first; posters come from the thumbnail cache, never the player
+        self.table.setItemDelegateForColumn(self.model.THUMB_COL, ThumbnailDelegate(self.table))
+        h.moveSection(self.model.THUMB_COL, 0)
+        h.setSectionResizeMode(self.model.THUMB_COL, QHeaderView.Fixed)
+        self.table.setColumnWidth(self.model.THUMB_COL, ThumbnailDelegate.SIZE.width() + 8)
+        self.table.verticalHeader().setDefaultSectionSize(ThumbnailDelegate.SIZE.height() + 6)
+
         # Embedded player
         playerCard = QFrame(); playerCard.setObjectName("Card")
         playerCard.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -212,22 +398,31 @@ class RecordListView(QFrame):
         self.videoWidget = QVideoWidget()
         self.videoWidget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         pv.addWidget(self.videoWidget)
+        self.infoOverlay = InfoOverlay(self.videoWidget)
 
         row = QHBoxLayout()
         self.btnToggle = QPushButton(); self.btnToggle.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
         self.btnToggle.setFixedSize(QSize(40,34)); self.btnToggle.setProperty("class","tonal")
         self.btnStop = QPushButton(self.style().standardIcon(QStyle.SP_MediaStop), ""); self.btnStop.setFixedSize(QSize(36,32)); self.btnStop.setProperty("class","tonal")
-        self.seek = QSlider(Qt.Horizontal); self.seek.setRange(0,0)
+        self.seek = ActivitySlider(); self.seek.setRange(0,0)
         self.tLeft = QLabel("00:00"); self.tRight = QLabel("00:00")
 
 
         row.addWidget(self.btnToggle); row.addWidget(self.btnStop); row.addSpacing(8)
         row.addWidget(self.tLeft); row.addWidget(self.seek,1); row.addWidget(self.tRight)
+        self.btnSkipIdle = QPushButton("Skip idle"); self.btnSkipIdle.setCheckable(True)
+        self.btnSkipIdle.setChecked(activity.idle_mode()==activity.MARK)
+        self.btnSkipIdle.setProperty("class","tonal"); self.btnSkipIdle.setVisible(False)
+        self.btnSkipIdle.setToolTip("Jump over stretches where nothing moves")
+        row.addWidget(self.btnSkipIdle)
         
         # Controls
         self.btnSnap = QPushButton("Snapshot")
         self.btnSnap.setProperty("class","primary")
         self.btnSnap.setCursor(Qt.PointingHandCursor)
+        self.btnSnap.setToolTip("Save the current frame at full resolution")
+        self.spinBurst = QSpinBox(); self.spinBurst.setRange(1, 30); self.spinBurst.setPrefix("× ")
+        self.spinBurst.setToolTip("Frames per snapshot (burst around the current position)")
         
         self.btnDownload = QPushButton()
         self.btnDownload.setIcon(self.style().standardIcon(QStyle.SP_DialogSaveButton))
@@ -264,6 +459,7 @@ class RecordListView(QFrame):
 
         row.addStretch(1)
         row.addWidget(self.btnSnap)
+        row.addWidget(self.spinBurst)
         row.addWidget(self.btnDownload)
         row.addWidget(self.btnFull)
         row.addWidget(self.btnSaveTo)
@@ -279,6 +475,8 @@ class RecordListView(QFrame):
 
         # Wire
         self.filterEdit.textChanged.connect(self._apply_filter)
+        self.field.currentTextChanged.connect(self._apply_filter)
+        self.table.horizontalHeader().sortIndicatorChanged.connect(self._sort)
         self.table.clicked.connect(self._load_current)
         self.table.selectionModel().selectionChanged.connect(self._load_current)
         self.btnToggle.clicked.connect(self._toggle)
@@ -299,6 +497,10 @@ class RecordListView(QFrame):
 
         # Spacebar toggles
         act = QAction(self); act.setShortcut(QKeySequence(Qt.Key_Space)); act.triggered.connect(self._toggle); self.addAction(act)
+        # Ctrl+Right / Ctrl+Left jump between steps (services.activity events)
+        for key, direction in ((Qt.Key_Right, 1), (Qt.Key_Left, -1)):
+            act = QAction(self); act.setShortcut(QKeySequence(Qt.CTRL | key))
+            act.triggered.connect(lambda _=False, d=direction: self._jump(d)); self.addAction(act)
 
         # Errors
         if hasattr(self.player, "errorOccurred"):
@@ -308,19 +510,41 @@ class RecordListView(QFrame):
             )
 
         self.current_path: Path|None = None
+        self.current_rec: Recording|None = None
+        self.idle: list[tuple[int,int]] = []     # skippable stretches of the current video (ms)
+        self.timeline = None; self.events: list[int] = []
+        self.analyzer: ActivityWorker|None = None; self._analyze_next: Recording|None = None
+        self.snapper: SnapshotWorker|None = None
+        self.restorer: RestoreWorker|None = None
+        self.scanner: ScanWorker|None = None
         self.full: FullscreenWindow|None = None
 
     # ---- filtering
-    def _apply_filter(self, text: str):
-        mapping={"All":-1,"Battery Name":1,"Battery Code":2,"Log ID":3,"Battery no.":4,"Operator":5}
-        self.proxy.setFilterKeyColumn(mapping.get(self.field.currentText(), -1))
-        self.proxy.setFilterFixedString(text)
+    def _apply_filter(self, *_):
+        mapping={"All":None,"Battery Name":"battery_name","Battery Code":"battery_code","Log ID":"log_id",
+                 "Battery no.":"battery_no","Operator":"operator_name"}
+        self.search_ctl.submit(replace(self.search_ctl.query, filter=self.filterEdit.text(),
+                                       filter_column=mapping.get(self.field.currentText())))
+
+    def _sort(self, column: int, order):
+        key = self.model.COLUMNS[column] if 0<=column<len(self.model.COLUMNS) else None
+        self.search_ctl.submit(replace(self.search_ctl.query, sort=key, descending=(order==Qt.DescendingOrder)), delay=0)
+
+    def search(self, text: str):
+        """Debounced, off-thread global search; keeps the player and unchanged rows as they are."""
+        self.search_ctl.submit(replace(self.search_ctl.query, search=text))
+
+    def requery(self):
+        """Re-run the current query in the background (rows changed elsewhere)."""
+        self.search_ctl.submit(self.search_ctl.query, delay=0)
 
     def refresh(self, search: str = ""):
-        self.model.refresh(search); self.table.resizeColumnsToContents()
+        self.search_ctl.cancel()
+        self.search_ctl.query = replace(self.search_ctl.query, search=search)
+        self.model.set_query(self.search_ctl.query); self.table.resizeColumnsToContents()
         self.player.stop(); self.seek.setRange(0,0); self.tLeft.setText("00:00"); self.tRight.setText("00:00")
         self.current_path=None
-        self.current_path=None
+        self.current_rec=None; self.infoOverlay.show_for(None)
 
     def eventFilter(self, obj, event):
         return super().eventFilter(obj, event)
@@ -329,14 +553,99 @@ class RecordListView(QFrame):
     def _load_current(self, *_):
         idx=self.table.currentIndex()
         if not idx.isValid(): return
-        rec=self.model.recording_at(self.proxy.mapToSource(idx).row())
-        if not rec or not rec.video_path or not Path(rec.video_path).exists():
+        rec=self.model.recording_at(idx.row())
+        if rec and not rec.video_path:
+            job = jobs.job_for_recording(rec.id)
+            if job and job.state in (jobs.PENDING, jobs.RUNNING):
+                QMessageBox.information(self,"Encoding","This recording's video is still being encoded."); return
+            if job and job.state == jobs.FAILED:
+                QMessageBox.warning(self,"Encoding failed",f"The video could not be encoded:\n{job.error}"); return
+        if not rec: return
+        # Plays the small proxy when there is one (quick scrubbing); snapshots and export use the master
+        proxy = store.proxy_path(rec.video_hash) if rec.video_hash else None
+        proxy = proxy if proxy and proxy.exists() else None
+        if not proxy and archive.is_archived(rec.video_hash):
+            self._restore(rec); return
+        if not rec.video_path or not Path(rec.video_path).exists():
+            if rec.video_path:
+                integrity.mark(rec.id, rec.video_path, integrity.MISSING, rec.video_path); self.model.reload_health()
             QMessageBox.warning(self,"Missing","Video file not found on disk."); return
         self.current_path=Path(rec.video_path)
-        
-        self.player.setSource(QUrl.fromLocalFile(str(self.current_path)))
+        self.current_rec=rec; self.infoOverlay.show_for(rec)
+        self._show_activity(rec)
+        self.player.setSource(QUrl.fromLocalFile(str(proxy or self.current_path)))
         self.player.play()
 
+    # ---- activity timeline
+    def _show_activity(self, rec: Recording):
+        """Heat strip, jump targets and skip marks; analysed once in the background when missing."""
+        self.idle = activity.idle_for(rec.id); self.btnSkipIdle.setVisible(bool(self.idle))
+        self.timeline = activity.timeline_for(rec.id)
+        self.events = activity.events(self.timeline) if self.timeline is not None else []
+        self.seek.set_activity(self.timeline); self.seek.setToolTip(JUMP_TIP if self.events else "")
+        if self.timeline is None and rec.video_path: self._analyze(rec)
+
+    def _analyze(self, rec: Recording):
+        if self.analyzer is not None and self.analyzer.isRunning():
+            self._analyze_next = rec; return
+        self.analyzer = ActivityWorker(rec)
+        self.analyzer.finished.connect(self._on_analyzed)
+        self.analyzer.start()
+
+    def _on_analyzed(self, rec_id: int, success: bool):
+        cur = self.current_rec
+        if success and cur and cur.id == rec_id: self._show_activity(cur)
+        pending, self._analyze_next = self._analyze_next, None
+        if pending and cur and pending.id == cur.id and pending.id != rec_id: self._analyze(pending)
+
+    def _jump(self, direction: int):
+        target = next_event(self.events, self.player.position(), direction)
+        if target is not None: self.player.setPosition(target)
+
+    def _restore(self, rec: Recording):
+        """Archived recordings are copied back from cold storage, then played."""
+        if self.restorer is not None and self.restorer.isRunning(): return
+        self.pdRestore = QProgressDialog("Restoring video from the archive...", None, 0, 0, self)
+        self.pdRestore.setWindowModality(Qt.WindowModal); self.pdRestore.setMinimumDuration(300)
+        self.restorer = RestoreWorker(rec.video_hash)
+        self.restorer.finished.connect(lambda ok, result: self._on_restored(ok, result, rec))
+        self.restorer.start()
+
+    def _on_restored(self, success: bool, result, rec: Recording):
+        self.pdRestore.close()
+        if not success:
+            QMessageBox.warning(self,"Archive",f"Could not restore the video:\n{result}"); return
+        rec.video_path = str(result)
+        cur = self._get_current_recording()
+        if cur and cur.id == rec.id: self._load_current()
+
+    # ---- library integrity
+    def _check_files(self, decode: bool):
+        """Unchanged files are not opened again, so repeat checks are quick."""
+        if self.scanner is not None and self.scanner.isRunning(): return
+        self.pdScan = QProgressDialog("Checking video files...", "Cancel", 0, 0, self)
+        self.pdScan.setWindowModality(Qt.WindowModal); self.pdScan.setMinimumDuration(300); self.pdScan.setAutoClose(False)
+        self.scanner = ScanWorker(decode)
+        self.scanner.progress.connect(lambda done, total: (self.pdScan.setMaximum(total), self.pdScan.setValue(done)))
+        self.scanner.finished.connect(self._on_checked)
+        self.pdScan.canceled.connect(self.scanner.cancel)
+        self.scanner.start()
+
+    def _on_checked(self, success: bool, result):
+        self.pdScan.close()
+        self.model.reload_health()
+        if not success:
+            QMessageBox.critical(self,"Check Files",f"The check failed:\n{result}"); return
+        if self.scanner.cancel_event.is_set(): return
+        bad = {s: result.get(s, 0) for s in integrity.BAD if result.get(s)}
+        names = {integrity.MISSING:"missing", integrity.UNREADABLE:"unreadable",
+                 integrity.HASH_MISMATCH:"changed on disk", integrity.CORRUPT:"corrupt"}
+        if bad:
+            QMessageBox.warning(self,"Check Files","Problems found:\n" + "\n".join(f"{n} {names[s]}" for s, n in bad.items())
+                                + "\n\nAffected recordings are marked in the list.")
+        else:
+            QMessageBox.information(self,"Check Files",f"All {sum(result.values()) - result['examined']} recordings are fine.")
+
     # ---- transport/time
     def _toggle(self):
         if self.player.playbackState()==QMediaPlayer.PlayingState: self.player.pause()
@@ -347,7 +656,11 @@ class RecordListView(QFrame):
     def _on_dur(self, ms:int):
         self.seek.setRange(0, ms if ms>0 else 0); self.tRight.setText(self._fmt(ms))
     def _on_pos(self, ms:int):
-        if not self.seek.isSliderDown(): self.seek.setValue(ms)
+        if not self.seek.isSliderDown():
+            self.seek.setValue(ms)
+            if self.btnSkipIdle.isChecked() and self.player.playbackState()==QMediaPlayer.PlayingState:
+                end = next((b for a, b in self.idle if a <= ms < b - 500), None)
+                if end is not None: self.player.setPosition(end); return
         self.tLeft.setText(self._fmt(ms))
     def _fmt(self, ms:int):
         s=max(0,ms)//1000; m,s=divmod(s,60); h,m=divmod(m,60)
@@ -364,7 +677,8 @@ class RecordListView(QFrame):
         if not self.current_path: 
             return
         # create and show
-        self.full = FullscreenWindow(self.player, self.videoWidget, on_exit=self._on_fullscreen_closed)
+        self.full = FullscreenWindow(self.player, self.videoWidget, on_exit=self._on_fullscreen_closed, rec=self.current_rec,
+                                     timeline=self.timeline, events=self.events)
         
         # Pass data to fullscreen overlay
         self.full.showFullScreen()
@@ -377,16 +691,20 @@ class RecordListView(QFrame):
     def _snapshot(self):
         if not self.current_path:
             QMessageBox.information(self,"No video","Select and play a recording first."); return
-        # Use whichever widget is currently active and valid
-        target = self.videoWidget
-        if self.full is not None and self.full.isVisible():
-            target = self.full.video
-        pix = target.grab()
-        if pix.isNull():
-            QMessageBox.critical(self,"Error","Could not capture frame."); return
-        out = snapshot_filename(self.current_path.stem)
-        if pix.save(str(out)): QMessageBox.information(self,"Saved",f"Snapshot saved to:\n{out}")
-        else: QMessageBox.critical(self,"Error","Failed to save snapshot.")
+        if self.snapper is not None and self.snapper.isRunning(): return
+        # Decoded from the file at native resolution, not grabbed from the widget
+        pos = self.player.position()
+        out = snapshot_filename(f"{self.current_path.stem}_t{pos//60000:02d}-{pos//1000%60:02d}.{pos%1000:03d}")
+        self.btnSnap.setEnabled(False)
+        self.snapper = SnapshotWorker([(str(self.current_path), pos, out)], self.spinBurst.value())
+        self.snapper.finished.connect(self._on_snapshot)
+        self.snapper.start()
+
+    def _on_snapshot(self, success: bool, result):
+        self.btnSnap.setEnabled(True)
+        if not success: QMessageBox.critical(self,"Error",f"Failed to save snapshot:\n{result}"); return
+        where = result[0] if len(result)==1 else f"{result[0].parent}\n({len(result)} frames)"
+        QMessageBox.information(self,"Saved",f"Snapshot saved to:\n{where}")
 
     def _choose_snapshot_dir(self):
         start = get_snapshot_dir() or Path.home()
@@ -402,7 +720,7 @@ class RecordListView(QFrame):
         
         idx=self.table.currentIndex()
         if not idx.isValid(): return
-        rec=self.model.recording_at(self.proxy.mapToSource(idx).row())
+        rec=self.model.recording_at(idx.row())
         if not rec: return
 
         # Ask for save location
@@ -410,7 +728,16 @@ class RecordListView(QFrame):
         out_path, _ = QFileDialog.getSaveFileName(self, "Save Video", str(Path.home() / default_name), "MP4 Video (*.mp4)")
         if not out_path: return
 
-        # Just copy the file since it already has overlay
+        if not rec.overlay_burned:
+            res = QMessageBox.question(self, "Export",
+                "This recording was stored without the battery details burned in.\n\n"
+                "Burn them into the exported video? (Re-encodes the video, which takes longer.)",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+            if res == QMessageBox.Cancel: return
+            if res == QMessageBox.Yes:
+                self._export_burned(rec, out_path); return
+
+        # Just copy the file (overlay burned in, or not wanted)
         try:
             import shutil
             shutil.copy2(self.current_path, out_path)
@@ -418,11 +745,28 @@ class RecordListView(QFrame):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save video:\n{e}")
 
+    def _export_burned(self, rec: Recording, out_path: str):
+        from views.record_new import VideoSaveWorker
+        self.pd = QProgressDialog("Burning overlay into video...", "Cancel", 0, 100, self)
+        self.pd.setWindowModality(Qt.WindowModal); self.pd.setMinimumDuration(0); self.pd.setAutoClose(False)
+        self.pd.setValue(0); self.pd.show()
+        self.exporter = VideoSaveWorker(str(self.current_path), out_path, (rec.battery_code, rec.battery_no, rec.operator_name))
+        self.exporter.progress.connect(lambda p, eta: (self.pd.setValue(p), self.pd.setLabelText(f"Burning overlay into video...\nTime remaining: {eta}")))
+        self.exporter.finished.connect(self._on_export_finished)
+        self.pd.canceled.connect(self.exporter.cancel)
+        self.exporter.start()
+
+    def _on_export_finished(self, success: bool, msg: str):
+        self.pd.close()
+        if not success and not msg: return  # cancelled
+        if success: QMessageBox.information(self, "Success", f"Video saved to:\n{msg}")
+        else: QMessageBox.critical(self, "Error", f"Failed to save video:\n{msg}")
+
     # ---- edit / delete
     def _get_current_recording(self) -> Recording | None:
         idx = self.table.currentIndex()
         if not idx.isValid(): return None
-        return self.model.recording_at(self.proxy.mapToSource(idx).row())
+        return self.model.recording_at(idx.row())
 
     def _edit_recording(self):
         rec = self._get_current_recording()
@@ -430,7 +774,7 @@ class RecordListView(QFrame):
         
         dlg = EditRecordingDialog(self, rec)
         if dlg.exec():
-            self.refresh(self.filterEdit.text())
+            self.refresh(self.search_ctl.query.search)
             # Restore selection if possible? For now just refresh is enough
             QMessageBox.information(self, "Updated", "Recording updated successfully.")
 
@@ -444,10 +788,11 @@ class RecordListView(QFrame):
         if res == QMessageBox.Yes:
             try:
                 execute("DELETE FROM recordings WHERE id=?", (rec.id,))
-                # Optional: Delete video file? 
-                # For safety, maybe just keep the file or ask user. 
-                # Let's just delete the record for now to avoid data loss accidents.
-                self.refresh(self.filterEdit.text())
+                # Store videos are refcounted; the file goes only when no other recording shares it.
+                # Files outside the store (no video_hash) are never deleted.
+                if self.current_rec and self.current_rec.id == rec.id: self.player.setSource(QUrl())
+                store.release(rec.video_hash)
+                self.refresh(self.search_ctl.query.search)
                 QMessageBox.information(self, "Deleted", "Recording deleted.")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to delete: {e}")
@@ -1,16 +1,15 @@
 # views/record_new.py
 import datetime
+import threading
 from pathlib import Path
 from PySide6.QtCore import Qt, QThread, Signal, QSize
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QFormLayout, QLineEdit, QTextEdit,
                                QPushButton, QHBoxLayout, QFileDialog, QDateTimeEdit, QMessageBox, 
                                QFrame, QProgressDialog, QGridLayout, QScrollArea, QSizePolicy, QStyle)
 from PySide6.QtGui import QPixmap, QIcon
-from core.db import execute
 import core.paths as paths
 from core.paths import ASSETS_DIR
-from services.media import copy_video_into_library
-from services.video_processor import process_and_save_video
+from views.jobs_panel import JobQueue, JobsPanel
 
 class VideoSaveWorker(QThread):
     finished = Signal(bool, str)
@@ -21,20 +20,31 @@ class VideoSaveWorker(QThread):
         self.src = src
         self.dst = dst
         self.data = data
+        self.metadata = None # VideoMetadata of the output once finished
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Kills the ffmpeg process tree; partial output and the overlay PNG are removed."""
+        self.cancel_event.set()
 
     def run(self):
+        from services.video_processor import process_and_save_video, EncodeCancelled
         try:
             # Lambda to emit progress signal (accepts **kwargs to ignore 'message' or other unexpected args)
             cb = lambda p, eta, **kwargs: self.progress.emit(p, eta)
-            process_and_save_video(self.src, self.dst, self.data, progress_callback=cb)
+            self.metadata = process_and_save_video(self.src, self.dst, self.data, progress_callback=cb,
+                                                   cancel_event=self.cancel_event)
             self.finished.emit(True, self.dst)
+        except EncodeCancelled:
+            self.finished.emit(False, "")
         except Exception as e:
             self.finished.emit(False, str(e))
 
 class RecordNewView(QFrame):
-    def __init__(self, on_saved=None):
+    def __init__(self, queue: JobQueue, on_saved=None):
         super().__init__()
         self.setObjectName("RecordNewView")
+        self.queue = queue
         self.on_saved = on_saved
         
         # Main Layout
@@ -67,6 +77,10 @@ class RecordNewView(QFrame):
         # 6. Actions
         self._setup_actions()
         
+        # 7. Background encode queue
+        self.layout.addWidget(JobsPanel(self.queue))
+        self.layout.addStretch(1)
+        
         # Wrapper for centering
         wrapper = QWidget()
         wl = QHBoxLayout(wrapper); wl.setContentsMargins(0,0,0,0)
@@ -172,6 +186,13 @@ class RecordNewView(QFrame):
 
     def _setup_actions(self):
         row = QHBoxLayout(); row.setSpacing(16)
+
+        self.importBtn = QPushButton("Import Folder...")
+        self.importBtn.setProperty("class", "tonal")
+        self.importBtn.setCursor(Qt.PointingHandCursor)
+        self.importBtn.setToolTip("Queue a whole folder of clips, with details from a CSV or the file names")
+        self.importBtn.clicked.connect(self._import_folder)
+        row.addWidget(self.importBtn)
         row.addStretch(1)
         
         self.clearBtn = QPushButton("Clear Form")
@@ -189,7 +210,6 @@ class RecordNewView(QFrame):
         row.addWidget(self.saveBtn)
         
         self.layout.addLayout(row)
-        self.layout.addStretch(1)
 
     def _add_field(self, grid, row, col, label, widget):
         l = QLabel(label)
@@ -206,6 +226,12 @@ class RecordNewView(QFrame):
                                               "Video Files (*.mp4 *.mov *.avi *.mkv)")
         if path: self.videoPathEdit.setText(path)
 
+    def _import_folder(self):
+        from views.batch_import import BatchImportDialog
+        dlg = BatchImportDialog(self.queue, self)
+        dlg.exec(); dlg.deleteLater()
+        if self.on_saved: self.on_saved()
+
     def _clear(self):
         self.batteryName.clear(); self.batteryCode.clear(); self.logId.clear()
         self.batteryNo.clear(); self.operatorName.clear(); self.remarks.clear()
@@ -233,30 +259,6 @@ class RecordNewView(QFrame):
             self.operatorName.text().strip()
         )
 
-        # Progress Dialog
-        self.pd = QProgressDialog("Processing video...", "Cancel", 0, 100, self)
-        self.pd.setWindowModality(Qt.WindowModal)
-        self.pd.setMinimumDuration(0)
-        self.pd.setValue(0)
-        self.pd.setAutoClose(False) # Keep open until finished
-        self.pd.show()
-
-        # Worker
-        self.worker = VideoSaveWorker(str(src), str(dst), data)
-        self.worker.progress.connect(self._on_progress)
-        self.worker.finished.connect(lambda s, m: self._on_save_finished(s, m, dst))
-        self.worker.start()
-
-    def _on_progress(self, percent, eta):
-        self.pd.setValue(percent)
-        self.pd.setLabelText(f"Processing and compressing video...\nTime remaining: {eta}")
-
-    def _on_save_finished(self, success, msg, dst_path):
-        self.pd.close()
-        if not success:
-            QMessageBox.critical(self, "Error", f"Failed to process video:\n{msg}")
-            return
-
         values = (
             self.batteryName.text().strip(),
             self.batteryCode.text().strip(),
@@ -265,14 +267,11 @@ class RecordNewView(QFrame):
             self.operatorName.text().strip(),
             self.dtEdit.dateTime().toString("yyyy-MM-dd HH:mm:ss"),
             self.remarks.toPlainText().strip(),
-            str(dst_path), None, datetime.datetime.now().isoformat(timespec='seconds')
+            datetime.datetime.now().isoformat(timespec='seconds')
         )
-        execute("""
-            INSERT INTO recordings (battery_name, battery_code, log_id, battery_no, operator_name,
-                                    datetime, remarks, video_path, duration_ms, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, values)
+        # Row + encode job are persisted together; workers fill in video_path when the encode lands
+        self.queue.submit(values, str(src), str(dst), data)
 
         if self.on_saved: self.on_saved()
         self._clear()
-        QMessageBox.information(self, "Saved", "Recording saved successfully.")
+        QMessageBox.information(self, "Queued", "Recording saved. The video is being encoded in the background.")
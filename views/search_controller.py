@@ -0,0 +1,80 @@
+# views/search_controller.py
+import sqlite3
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot, Qt, QCoreApplication
+
+from core.db import get_conn, close_conn
+from services.search import RecordingQuery, fetch_page
+
+class _SearchWorker(QObject):
+    """Runs first-page queries on the search thread; drops generations that went stale."""
+    done = Signal(int, object, object, object)  # generation, query, rows, cursor
+
+    def __init__(self, controller):
+        super().__init__()
+        self._controller = controller
+
+    def _stale(self, gen):
+        return gen != self._controller.generation
+
+    @Slot(int, object)
+    def run(self, gen, q):
+        if self._stale(gen): return
+        con = get_conn()
+        # Abort the running statement as soon as a newer search is submitted
+        con.set_progress_handler(lambda: int(self._stale(gen)), 1000)
+        try:
+            rows, cursor = fetch_page(q)
+        except sqlite3.OperationalError:
+            return  # interrupted
+        finally:
+            con.set_progress_handler(None, 0)
+        if not self._stale(gen):
+            self.done.emit(gen, q, rows, cursor)
+
+class SearchController(QObject):
+    """
+    Debounces query changes and runs them on a worker thread.
+    Every submit() starts a new generation; only the newest generation's rows are
+    emitted through `results`, older in-flight queries are interrupted.
+    """
+    DEBOUNCE_MS = 250
+    results = Signal(object, object, object)  # query, rows, cursor
+    _request = Signal(int, object)
+
+    def __init__(self, query: RecordingQuery, parent=None):
+        super().__init__(parent)
+        self.query = query
+        self.generation = 0
+
+        self._timer = QTimer(self); self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+
+        self._thread = QThread(self)
+        self._worker = _SearchWorker(self); self._worker.moveToThread(self._thread)
+        self._request.connect(self._worker.run)
+        self._worker.done.connect(self._on_done)
+        self._thread.finished.connect(close_conn, Qt.DirectConnection)
+        self._thread.start()
+        if QCoreApplication.instance():
+            QCoreApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    def submit(self, q: RecordingQuery, delay: int = DEBOUNCE_MS):
+        self.query = q
+        self.generation += 1
+        self._timer.start(delay)
+
+    def cancel(self):
+        """Forget pending and in-flight work (a synchronous refresh superseded it)."""
+        self.generation += 1
+        self._timer.stop()
+
+    def shutdown(self):
+        self.cancel()
+        self._thread.quit(); self._thread.wait()
+
+    def _dispatch(self):
+        self._request.emit(self.generation, self.query)
+
+    def _on_done(self, gen, q, rows, cursor):
+        if gen == self.generation:
+            self.results.emit(q, rows, cursor)
@@ -1,9 +1,22 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QHBoxLayout, QMessageBox, QSpacerItem, QSizePolicy
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QFrame, QHBoxLayout, QMessageBox, QSpacerItem,
+                               QSizePolicy, QComboBox, QCheckBox, QSpinBox, QLineEdit, QFileDialog, QFormLayout)
+from PySide6.QtCore import Qt, QThread, Signal
+from core.config_manager import load_config, save_config
 from core.settings import APP, ORG, VERSION
 from core.updater import UpdateChecker
 from core.style import H1, BODY
 
+class ArchiveWorker(QThread):
+    finished = Signal(dict)
+
+    def run(self):
+        from core.db import close_conn
+        from services import archive
+        try:
+            self.finished.emit(archive.run())
+        finally:
+            close_conn()
+
 class SettingsView(QWidget):
     def __init__(self, check_update_callback):
         super().__init__()
@@ -57,8 +70,57 @@ class SettingsView(QWidget):
         cl.addLayout(btn_layout)
         
         layout.addWidget(card)
+        layout.addWidget(self._encoding_card())
+        layout.addWidget(self._archive_card())
+        layout.addWidget(self._watch_card())
         layout.addStretch()
 
+    PROFILE_CHOICES = [("auto", "Automatic (archive long recordings, review quality otherwise)"),
+                       ("archive", "Archive — 720p, smallest files"),
+                       ("review", "Review — 1080p, high quality"),
+                       ("preview", "Preview — 360p, drafts only")]
+
+    IDLE_CHOICES = [("off", "Keep as recorded"),
+                    ("mark", "Keep, and skip them during playback"),
+                    ("cut", "Cut them out when encoding (smaller files)")]
+
+    def _encoding_card(self):
+        card = QFrame(); card.setObjectName("Card")
+        cl = QVBoxLayout(card)
+        title = QLabel("Encoding")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #1a1a1a;")
+        cl.addWidget(title)
+        config = load_config()
+        row = QHBoxLayout(); row.addWidget(QLabel("Profile for new recordings"))
+        self.cmbProfile = QComboBox()
+        for key, label in self.PROFILE_CHOICES: self.cmbProfile.addItem(label, key)
+        self.cmbProfile.setCurrentIndex(max(0, self.cmbProfile.findData(config.get("encode_profile", "auto"))))
+        row.addWidget(self.cmbProfile, 1); cl.addLayout(row)
+        hint = QLabel("H.264 camera files that already fit the profile are stored as recorded, without re-encoding, "
+                      "and the overlay is drawn by the player. Wider files are scaled down, and the Archive profile "
+                      "always re-encodes to keep files small.")
+        hint.setWordWrap(True); hint.setStyleSheet("color: #666;")
+        cl.addWidget(hint)
+        self.chkProxy = QCheckBox("Also make a small proxy for quick playback and scrubbing (the full video is kept for export)")
+        self.chkProxy.setChecked(bool(config.get("make_proxy", False)))
+        cl.addWidget(self.chkProxy)
+        row = QHBoxLayout(); row.addWidget(QLabel("Stretches where nothing moves"))
+        self.cmbIdle = QComboBox()
+        for key, label in self.IDLE_CHOICES: self.cmbIdle.addItem(label, key)
+        self.cmbIdle.setCurrentIndex(max(0, self.cmbIdle.findData(config.get("idle_segments", "off"))))
+        row.addWidget(self.cmbIdle, 1); cl.addLayout(row)
+        self.cmbProfile.currentIndexChanged.connect(self._save_encoding)
+        self.chkProxy.toggled.connect(self._save_encoding)
+        self.cmbIdle.currentIndexChanged.connect(self._save_encoding)
+        return card
+
+    def _save_encoding(self, *_):
+        config = load_config()
+        config["encode_profile"] = self.cmbProfile.currentData()
+        config["make_proxy"] = self.chkProxy.isChecked()
+        config["idle_segments"] = self.cmbIdle.currentData()
+        save_config(config)
+
     def _check_update(self):
         self.btnCheck.setEnabled(False)
         self.statusLabel.setText("Checking...")
@@ -77,3 +139,113 @@ class SettingsView(QWidget):
 
     def _on_no_update(self):
         self.statusLabel.setText("You are up to date.")
+
+    ARCHIVE_CODECS = [("copy", "Keep as is (move only)"), ("hevc", "Re-encode to HEVC (about half the size)"),
+                      ("av1", "Re-encode to AV1 (smallest, slow)")]
+
+    def _archive_card(self):
+        card = QFrame(); card.setObjectName("Card")
+        cl = QVBoxLayout(card)
+        title = QLabel("Archive")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #1a1a1a;")
+        cl.addWidget(title)
+        config = load_config()
+        form = QFormLayout()
+        self.spinArchiveDays = QSpinBox(); self.spinArchiveDays.setRange(0, 3650)
+        self.spinArchiveDays.setSpecialValueText("Off"); self.spinArchiveDays.setSuffix(" days")
+        self.spinArchiveDays.setValue(int(config.get("archive_after_days", 0) or 0))
+        form.addRow("Move recordings older than", self.spinArchiveDays)
+        row = QHBoxLayout()
+        self.archiveDirEdit = QLineEdit(config.get("archive_dir", "")); self.archiveDirEdit.setReadOnly(True)
+        btnBrowse = QPushButton("Browse..."); btnBrowse.clicked.connect(self._choose_archive_dir)
+        row.addWidget(self.archiveDirEdit, 1); row.addWidget(btnBrowse)
+        form.addRow("Archive folder", row)
+        self.cmbArchiveCodec = QComboBox()
+        for key, label in self.ARCHIVE_CODECS: self.cmbArchiveCodec.addItem(label, key)
+        self.cmbArchiveCodec.setCurrentIndex(max(0, self.cmbArchiveCodec.findData(config.get("archive_codec", "copy"))))
+        form.addRow("Archived videos", self.cmbArchiveCodec)
+        cl.addLayout(form)
+        row = QHBoxLayout()
+        self.btnArchive = QPushButton("Archive Now"); self.btnArchive.setFixedWidth(150)
+        self.btnArchive.clicked.connect(self._archive_now)
+        self.archiveStatus = QLabel("Archived videos are copied back automatically when played.")
+        self.archiveStatus.setStyleSheet("color: #666;")
+        row.addWidget(self.btnArchive); row.addWidget(self.archiveStatus); row.addStretch()
+        cl.addLayout(row)
+        self.spinArchiveDays.valueChanged.connect(self._save_archive)
+        self.cmbArchiveCodec.currentIndexChanged.connect(self._save_archive)
+        return card
+
+    def _choose_archive_dir(self):
+        d = QFileDialog.getExistingDirectory(self, "Archive folder", self.archiveDirEdit.text())
+        if d: self.archiveDirEdit.setText(d); self._save_archive()
+
+    def _save_archive(self, *_):
+        config = load_config()
+        config["archive_after_days"] = self.spinArchiveDays.value()
+        config["archive_dir"] = self.archiveDirEdit.text()
+        config["archive_codec"] = self.cmbArchiveCodec.currentData()
+        save_config(config)
+
+    def _archive_now(self):
+        if not self.spinArchiveDays.value() or not self.archiveDirEdit.text():
+            QMessageBox.information(self, "Archive", "Choose an age and an archive folder first."); return
+        self.btnArchive.setEnabled(False); self.archiveStatus.setText("Archiving...")
+        self.archiver = ArchiveWorker()
+        self.archiver.finished.connect(self._on_archived)
+        self.archiver.start()
+
+    def _on_archived(self, summary: dict):
+        self.btnArchive.setEnabled(True)
+        text = f"Archived {summary['archived']} videos, {summary['bytes_freed'] / 1e9:.2f} GB freed"
+        self.archiveStatus.setText(text + (f", {summary['failed']} failed" if summary["failed"] else ""))
+
+    def _watch_card(self):
+        card = QFrame(); card.setObjectName("Card")
+        cl = QVBoxLayout(card)
+        title = QLabel("Watch Folder")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #1a1a1a;")
+        cl.addWidget(title)
+        config = load_config()
+        defaults = config.get("watch_defaults") or {}
+        form = QFormLayout()
+        row = QHBoxLayout()
+        self.watchDirEdit = QLineEdit(config.get("watch_dir", "")); self.watchDirEdit.setReadOnly(True)
+        self.watchDirEdit.setPlaceholderText("Off")
+        btnBrowse = QPushButton("Browse..."); btnBrowse.clicked.connect(self._choose_watch_dir)
+        btnOff = QPushButton("Stop Watching"); btnOff.clicked.connect(lambda: (self.watchDirEdit.clear(), self._save_watch()))
+        row.addWidget(self.watchDirEdit, 1); row.addWidget(btnBrowse); row.addWidget(btnOff)
+        form.addRow("Folder", row)
+        self.watchPatternEdit = QLineEdit(config.get("watch_pattern", ""))
+        self.watchPatternEdit.setPlaceholderText("{battery_code}_{battery_no}")
+        form.addRow("File name pattern", self.watchPatternEdit)
+        self.watchBatteryEdit = QLineEdit(defaults.get("battery_name", ""))
+        form.addRow("Battery name", self.watchBatteryEdit)
+        self.watchOperatorEdit = QLineEdit(defaults.get("operator_name", ""))
+        form.addRow("Operator", self.watchOperatorEdit)
+        cl.addLayout(form)
+        hint = QLabel("New videos are queued for encoding once fully written. A <video>.json next to a file "
+                      "overrides its fields. Files end up in the imported, duplicates or rejected subfolders.")
+        hint.setWordWrap(True); hint.setStyleSheet("color: #666;")
+        cl.addWidget(hint)
+        for edit in (self.watchPatternEdit, self.watchBatteryEdit, self.watchOperatorEdit):
+            edit.editingFinished.connect(self._save_watch)
+        return card
+
+    def _choose_watch_dir(self):
+        d = QFileDialog.getExistingDirectory(self, "Watch folder", self.watchDirEdit.text())
+        if d: self.watchDirEdit.setText(d); self._save_watch()
+
+    def _save_watch(self, *_):
+        from services.batch_import import pattern_regex
+        pattern = self.watchPatternEdit.text().strip()
+        try:
+            if pattern: pattern_regex(pattern)
+        except ValueError as e:
+            QMessageBox.warning(self, "Watch Folder", str(e)); return
+        config = load_config()
+        config["watch_dir"] = self.watchDirEdit.text()
+        config["watch_pattern"] = pattern
+        config["watch_defaults"] = {"battery_name": self.watchBatteryEdit.text().strip(),
+                                    "operator_name": self.watchOperatorEdit.text().strip()}
+        save_config(config)
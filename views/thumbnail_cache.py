@@ -0,0 +1,105 @@
+# views/thumbnail_cache.py
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PySide6.QtCore import Qt, QObject, Signal, QSize, QRect, QCoreApplication
+from PySide6.QtGui import QImage, QPixmap, QPainter, QColor
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+from core.config_manager import load_config
+from models.recording import Recording
+from services import thumbnails
+
+class ThumbnailCache(QObject):
+    """
+    Poster pixmaps for recordings: an in-memory LRU in front of the on-disk cache.
+    Misses are extracted (first time only) and decoded on a small thread pool,
+    then announced through `ready`; the GUI thread only converts QImage -> QPixmap.
+    """
+    ready = Signal(str)                 # cache key (see key())
+    _loaded = Signal(str, object)       # worker -> GUI thread: key, QImage | None
+    MAX_PIXMAPS = 500
+    WORKERS = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pixmaps: "OrderedDict[str, QPixmap]" = OrderedDict()
+        self._pending: set[str] = set()
+        self._failed: set[str] = set()
+        # Sprite strips cost a keyframe pass over the whole file, so they are opt-in
+        self._sprites = bool(load_config().get("thumbnail_sprites", False))
+        self._pool = ThreadPoolExecutor(self.WORKERS, thread_name_prefix="thumbnail")
+        self._loaded.connect(self._on_loaded)
+        if QCoreApplication.instance():
+            QCoreApplication.instance().aboutToQuit.connect(lambda: self._pool.shutdown(wait=False, cancel_futures=True))
+
+    @staticmethod
+    def key(rec: Recording) -> str:
+        return rec.video_hash or rec.video_path
+
+    def pixmap(self, rec: Recording) -> QPixmap | None:
+        """The poster if it is in memory; otherwise schedules a load and returns None."""
+        if not rec.video_path: return None
+        k = self.key(rec)
+        pm = self._pixmaps.get(k)
+        if pm is not None:
+            self._pixmaps.move_to_end(k); return pm
+        if k not in self._pending and k not in self._failed:
+            self._pending.add(k)
+            self._pool.submit(self._load, k, rec.video_path, rec.video_hash, (rec.duration_ms or 0) / 1000 or None)
+        return None
+
+    def tooltip(self, rec: Recording) -> str | None:
+        if not self._sprites or not rec.video_path: return None
+        try:
+            p = thumbnails.sprite_path(thumbnails.cache_key(rec.video_path, rec.video_hash))
+        except OSError:
+            return None
+        return f'<img src="{p.as_posix()}">' if p.exists() else None
+
+    def _load(self, k: str, video_path: str, video_hash: str | None, duration_s: float | None):
+        image = None
+        try:
+            if Path(video_path).exists():
+                path = thumbnails.ensure_poster(video_path, video_hash, duration_s)
+                if path: image = QImage(str(path))
+        except OSError:
+            pass
+        self._loaded.emit(k, image if image is not None and not image.isNull() else None)
+        if image is not None and self._sprites:
+            try:
+                thumbnails.ensure_sprite(video_path, video_hash, duration_s)
+            except OSError:
+                pass
+
+    def _on_loaded(self, k: str, image):
+        self._pending.discard(k)
+        if image is None:
+            self._failed.add(k); return
+        self._pixmaps[k] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.MAX_PIXMAPS:
+            self._pixmaps.popitem(last=False)
+        self.ready.emit(k)
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Draws the DecorationRole pixmap letterboxed in the cell, or a grey placeholder while it loads."""
+    SIZE = QSize(96, 54)
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        r = option.rect.adjusted(4, 3, -4, -3)
+        pm = index.data(Qt.DecorationRole)
+        painter.save()
+        if isinstance(pm, QPixmap) and not pm.isNull():
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            size = pm.size().scaled(r.size(), Qt.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height()); target.moveCenter(r.center())
+            painter.drawPixmap(target, pm)
+        else:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen); painter.setBrush(QColor("#E5E7EB"))
+            painter.drawRoundedRect(r, 4, 4)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return self.SIZE + QSize(8, 6)
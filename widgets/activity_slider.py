@@ -0,0 +1,50 @@
+# widgets/activity_slider.py
+import numpy as np
+from PySide6.QtWidgets import QSlider, QStyle, QStyleOptionSlider
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtCore import Qt, QRect
+
+class ActivitySlider(QSlider):
+    """Seek slider (milliseconds) with a per-second activity heat strip painted behind the groove."""
+    STRIP_HEIGHT = 10
+    FULL_SCALE = 0.25       # activity score drawn at full heat
+
+    def __init__(self, parent=None):
+        super().__init__(Qt.Horizontal, parent)
+        self._strip: QImage | None = None
+        self._seconds = 0
+
+    def set_activity(self, timeline: np.ndarray | None):
+        """One score per second (services.activity timeline); None clears the strip."""
+        if timeline is None or not len(timeline):
+            self._strip, self._seconds = None, 0
+        else:
+            v = np.clip(np.asarray(timeline, np.float32) / self.FULL_SCALE, 0, 1)
+            # transparent -> amber -> red, one pixel per second, stretched when painted
+            alpha = (40 + 215 * v).astype(np.uint32)
+            green = (190 * (1 - v)).astype(np.uint32)
+            argb = np.ascontiguousarray(((alpha << 24) | (0xF0 << 16) | (green << 8) | 0x20)[None, :])
+            self._strip = QImage(argb.tobytes(), len(v), 1, len(v) * 4, QImage.Format_ARGB32).copy()
+            self._seconds = len(v)
+        self.update()
+
+    def paintEvent(self, e):
+        if self._strip is None:
+            return super().paintEvent(e)
+        # Groove, then the strip over it, then the handle on top
+        opt = QStyleOptionSlider(); self.initStyleOption(opt)
+        style = self.style()
+        groove = style.subControlRect(QStyle.CC_Slider, opt, QStyle.SC_SliderGroove, self)
+        handle = style.subControlRect(QStyle.CC_Slider, opt, QStyle.SC_SliderHandle, self)
+        p = QPainter(self)
+        opt.subControls = QStyle.SC_SliderGroove
+        style.drawComplexControl(QStyle.CC_Slider, opt, p, self)
+        # The handle's centre travels groove width minus one handle: line the seconds up with it
+        left, span = groove.left() + handle.width() // 2, groove.width() - handle.width()
+        covered = min(1.0, self._seconds * 1000 / self.maximum()) if self.maximum() > 0 else 1.0
+        p.setRenderHint(QPainter.SmoothPixmapTransform)
+        p.drawImage(QRect(left, groove.center().y() - self.STRIP_HEIGHT // 2, max(1, int(span * covered)),
+                          self.STRIP_HEIGHT), self._strip)
+        opt.subControls = QStyle.SC_SliderHandle
+        style.drawComplexControl(QStyle.CC_Slider, opt, p, self)
+        p.end()